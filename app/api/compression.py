@@ -0,0 +1,169 @@
+"""
+Compressão das respostas (gzip ou brotli, conforme Accept-Encoding)
+Respostas pequenas, já comprimidas ou em SSE passam sem alteração
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # dependência opcional: sem brotli, apenas gzip
+    brotli = None
+
+
+class _Encoder:
+    """Compressor incremental de um corpo (gzip via zlib ou brotli)"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: formato gzip (cabeçalho + CRC)
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas com brotli (se instalado e aceito) ou gzip
+
+    - Corpos completos menores que `minimum_size` não são comprimidos
+    - Respostas em streaming (ex: listas grandes com FAST_JSON_ENABLED) são
+      comprimidas à medida que os blocos chegam
+    - text/event-stream não é comprimido: o compressor reteria os eventos do SSE
+    - Toda resposta que poderia ser comprimida leva `Vary: Accept-Encoding`, mesmo
+      quando sai sem compressão (corpo pequeno ou cliente sem gzip/br), para que
+      caches não sirvam a versão de um cliente para outro
+    """
+
+    EXCLUDED_MEDIA_TYPES = ("text/event-stream",)
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_with_vary(message: Message) -> None:
+                if message["type"] == "http.response.start" and self._compressible(Headers(raw=message["headers"])):
+                    self._add_vary(message)
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        start_message: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                compressible = self._compressible(Headers(raw=message["headers"]))
+                if compressible:
+                    self._add_vary(message)
+                passthrough = not compressible or message["status"] in (204, 304)
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                # Primeiro bloco: decide se comprime
+                start, start_message = start_message, None
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["content-length"]
+                if not more_body:
+                    compressed = encoder.compress(body) + encoder.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(start)
+
+            chunk = encoder.compress(body)
+            if not more_body:
+                chunk += encoder.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, headers: Headers) -> bool:
+        """Resposta que seria comprimida se o cliente aceitasse (não comprimida nem SSE)"""
+        media_type = headers.get("content-type", "").split(";")[0].strip()
+        return "content-encoding" not in headers and media_type not in self.EXCLUDED_MEDIA_TYPES
+
+    @staticmethod
+    def _add_vary(message: Message) -> None:
+        headers = MutableHeaders(raw=list(message["headers"]))
+        headers.add_vary_header("Accept-Encoding")
+        message["headers"] = headers.raw
+
+    @staticmethod
+    def _negotiate(accept_encoding: str) -> Optional[str]:
+        """Codificação preferida entre as aceitas (br > gzip); q=0 recusa"""
+        accepted = set()
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            if not name:
+                continue
+            if _q_value(params) == 0:
+                continue
+            accepted.add(name.strip())
+        if brotli is not None and ("br" in accepted or "*" in accepted):
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+
+def _q_value(params: str) -> float:
+    """Peso q de uma codificação do Accept-Encoding (1.0 se ausente ou inválido)"""
+    for param in params.split(";"):
+        key, _, value = param.strip().partition("=")
+        if key == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 1.0
+    return 1.0
@@ -3,13 +3,47 @@ Dependências para injeção nos endpoints
 Facilita testes e manutenção
 """
 
+import secrets
 from typing import Optional
-from app.services.database import DatabaseService
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.services.database import AsyncDatabaseService
+from app.services.postgres import PostgresDatabaseService
 from app.services.openai_service import OpenAIService
+from app.services.cache import TTLCache
+from app.services.report_cache import ReportCache
+from app.services.analytics_snapshot import AnalyticsSnapshotStore, numpy_available
+from app.services.metrics import CACHE_ENTRIES, registry, update_cache_hit_ratio
+from app.core.events import EventsService, CachedEventsService
+from app.core.data_version import DataVersionTracker
+from app.core.reports import ReportsService
+from app.core.ingest import IngestionService
+from app.core.report_jobs import ReportJobQueue
 from app.config import settings
 
-# Instância global do serviço de banco
-db_service = DatabaseService()
+
+def _create_db_service() -> AsyncDatabaseService:
+    """Cria o serviço de banco conforme DATABASE_BACKEND"""
+    if settings.DATABASE_BACKEND == "postgres":
+        return PostgresDatabaseService()
+    return AsyncDatabaseService()
+
+
+# Instância global do serviço de banco (assíncrono, com pool de conexões compartilhado)
+db_service = _create_db_service()
+
+# Cache global das leituras do dashboard (compartilhado entre requisições)
+response_cache = TTLCache(
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CACHE_TTL_SECONDS
+)
+
+# Versão dos dados: base dos ETags; ao mudar, o cache de respostas é descartado
+data_version_tracker = DataVersionTracker(
+    db_service,
+    check_interval_seconds=settings.DATA_VERSION_CHECK_SECONDS
+)
+data_version_tracker.on_change(response_cache.invalidate)
 
 # Instância global do serviço OpenAI (None se não configurado)
 openai_service: Optional[OpenAIService] = None
@@ -19,13 +53,117 @@ if settings.OPENAI_API_KEY:
     except Exception:
         openai_service = None
 
+# Cache persistente dos relatórios gerados (None se desabilitado)
+report_cache: Optional[ReportCache] = None
+if settings.REPORT_CACHE_ENABLED:
+    try:
+        report_cache = ReportCache(
+            settings.REPORT_CACHE_PATH,
+            max_entries=settings.REPORT_CACHE_MAX_ENTRIES
+        )
+    except Exception as e:
+        print(f"Erro ao abrir cache de relatórios: {e}")
+        report_cache = None
+
+# Snapshot analítico em mmap (None se desabilitado ou sem numpy)
+analytics_snapshots: Optional[AnalyticsSnapshotStore] = None
+if settings.ANALYTICS_SNAPSHOT_ENABLED:
+    if numpy_available():
+        analytics_snapshots = AnalyticsSnapshotStore(
+            settings.ANALYTICS_SNAPSHOT_PATH,
+            version_provider=data_version_tracker.current
+        )
+    else:
+        print("ANALYTICS_SNAPSHOT_ENABLED requer numpy; snapshot analítico desabilitado")
+
+def _collect_cache_metrics() -> None:
+    """Ocupação e taxa de acerto dos caches, atualizadas a cada coleta de /metrics"""
+    CACHE_ENTRIES.set(response_cache.stats()["size"], cache="response")
+    if report_cache is not None:
+        CACHE_ENTRIES.set(report_cache.stats()["size"], cache="report")
+    for cache in ("response", "report"):
+        update_cache_hit_ratio(cache)
 
-def get_db_service() -> DatabaseService:
-    """Retorna instância do DatabaseService"""
+
+registry.on_collect(_collect_cache_metrics)
+
+# Fila de jobs de relatório (workers iniciados no startup da aplicação)
+report_jobs = ReportJobQueue(
+    lambda: ReportsService(db_service, openai_service, report_cache, analytics_snapshots),
+    workers=settings.REPORT_JOB_WORKERS,
+    max_pending=settings.REPORT_JOB_MAX_PENDING,
+    retention_seconds=settings.REPORT_JOB_RETENTION_SECONDS
+)
+
+
+def get_db_service() -> AsyncDatabaseService:
+    """Retorna instância do AsyncDatabaseService"""
     return db_service
 
 
+def get_response_cache() -> TTLCache:
+    """Retorna o cache de respostas do dashboard"""
+    return response_cache
+
+
+def get_events_service() -> EventsService:
+    """Retorna EventsService (com cache, se CACHE_ENABLED)"""
+    if settings.CACHE_ENABLED:
+        return CachedEventsService(
+            db_service, response_cache, analytics_snapshots, version_tracker=data_version_tracker
+        )
+    return EventsService(db_service, analytics_snapshots)
+
+
+_ingest_bearer = HTTPBearer(auto_error=False)
+
+
+def verify_ingest_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_ingest_bearer)
+) -> None:
+    """
+    Exige `Authorization: Bearer <INGEST_API_KEY>` nas rotas de escrita
+
+    503 se a ingestão não estiver configurada (token ou service key ausentes),
+    401 se o token não for enviado ou não conferir.
+    """
+    if not settings.INGEST_API_KEY or not settings.SUPABASE_SERVICE_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="Ingestão não disponível. "
+                   "Configure INGEST_API_KEY e SUPABASE_SERVICE_KEY no arquivo .env"
+        )
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.INGEST_API_KEY.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Token de ingestão inválido",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+def get_ingestion_service() -> IngestionService:
+    """Retorna IngestionService"""
+    return IngestionService(db_service)
+
+
 def get_openai_service() -> Optional[OpenAIService]:
     """Retorna instância do OpenAIService ou None se não configurado"""
     return openai_service
 
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """Retorna o cache de relatórios ou None se desabilitado"""
+    return report_cache
+
+
+def get_report_jobs() -> ReportJobQueue:
+    """Retorna a fila de jobs de relatório"""
+    return report_jobs
+
+
+def get_analytics_snapshots() -> Optional[AnalyticsSnapshotStore]:
+    """Retorna o snapshot analítico ou None se desabilitado"""
+    return analytics_snapshots
@@ -0,0 +1,67 @@
+"""
+ETag / If-None-Match para as leituras de eventos e métricas
+Respostas são identificadas pela versão dos dados + rota + filtros canônicos
+"""
+
+import hashlib
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from app.core.data_version import DataVersionTracker
+from app.services.cache import make_cache_key
+from app.services.metrics import capture_db_errors
+
+
+class DataVersionETagMiddleware(BaseHTTPMiddleware):
+    """
+    Adiciona ETag às respostas GET das rotas configuradas e responde 304 quando
+    o cliente já tem a versão atual (If-None-Match), sem executar a rota.
+
+    Se a versão dos dados não puder ser obtida, a requisição segue sem ETag. Respostas
+    montadas com valores padrão por falha no banco (as rotas respondem 503) também
+    não recebem ETag, para que o cliente não as revalide depois que o banco voltar.
+    """
+
+    def __init__(self, app, tracker: DataVersionTracker, path_prefixes: Tuple[str, ...]):
+        super().__init__(app)
+        self.tracker = tracker
+        self.path_prefixes = path_prefixes
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if request.method != "GET" or not request.url.path.startswith(self.path_prefixes):
+            return await call_next(request)
+
+        version = await self.tracker.current()
+        if version is None:
+            return await call_next(request)
+
+        etag = self._compute_etag(version, request)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if self._matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        with capture_db_errors() as errors:
+            response = await call_next(request)
+        if response.status_code == 200 and not errors:
+            response.headers.update(headers)
+        return response
+
+    @staticmethod
+    def _compute_etag(version: str, request: Request) -> str:
+        """ETag fraco derivado da versão dos dados, da rota e dos filtros canônicos"""
+        key = make_cache_key(request.url.path, **dict(request.query_params))
+        digest = hashlib.sha1(f"{version}:{key!r}".encode("utf-8")).hexdigest()[:20]
+        return f'W/"{digest}"'
+
+    @staticmethod
+    def _matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Compara If-None-Match (lista separada por vírgula ou '*') com o ETag atual"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Comparação fraca: ignora o prefixo W/
+        opaque = etag.removeprefix("W/")
+        return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
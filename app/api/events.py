@@ -3,11 +3,14 @@ Rotas de eventos e métricas
 Todas as rotas da API estão aqui (simplificado para MVP)
 """
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
-from app.api.deps import get_db_service
-from app.services.database import DatabaseService
-from app.core.events import EventsService
+from typing import Literal, Optional
+from app.api.deps import get_events_service, get_response_cache, verify_ingest_token
+from app.api.responses import json_response
+from app.core.events import DataUnavailableError, EventsService, strict_read
+from app.services.cache import TTLCache
+from app.config import settings
 
 router = APIRouter()
 
@@ -16,38 +19,54 @@ router = APIRouter()
 async def list_events(
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de eventos a retornar"),
     offset: int = Query(0, ge=0, description="Número de eventos a pular"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor da resposta anterior)"),
+    count: Optional[Literal["exact", "planned", "estimated"]] = Query(
+        None, description="Modo de contagem do total (padrão: EVENTS_COUNT_MODE)"
+    ),
     sport: Optional[str] = Query(None, description="Filtrar por esporte (corrida, triathlon, ciclismo, vôlei, futebol)"),
     event_type: Optional[str] = Query(None, description="Filtrar por tipo de evento (prova, treino)"),
     location: Optional[str] = Query(None, description="Filtrar por localização (busca parcial)"),
     date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
-    db: DatabaseService = Depends(get_db_service)
+    events_service: EventsService = Depends(get_events_service)
 ):
     """
     Lista eventos com paginação e filtros
     
     - **limit**: Número máximo de eventos (1-1000, padrão: 100)
     - **offset**: Número de eventos a pular (padrão: 0)
+    - **cursor**: `next_cursor` da página anterior; quando informado, `offset` é ignorado
+    - **count**: `exact`, `planned` ou `estimated` (estimativa do planejador, para tabelas grandes)
     - **sport**: Filtrar por esporte
     - **event_type**: Filtrar por tipo de evento (prova/treino)
     - **location**: Filtrar por localização (busca parcial)
     - **date_from**: Data inicial (YYYY-MM-DD)
     - **date_to**: Data final (YYYY-MM-DD)
     
-    Retorna lista de eventos ordenados por data (mais recentes primeiro)
+    Retorna lista de eventos ordenados por data (mais recentes primeiro) e
+    `next_cursor` para buscar a próxima página (null na última). Página e total saem
+    da mesma consulta; em páginas por cursor o total não é recalculado (`total` = null). A paginação por
+    cursor tem o mesmo custo em qualquer profundidade e não repete/pula eventos
+    quando novos eventos são inseridos.
     """
     try:
-        events_service = EventsService(db)
-        result = events_service.list_events(
+        result = await strict_read(
+            events_service.list_events,
             limit=limit, 
             offset=offset,
             sport=sport,
             event_type=event_type,
             location=location,
             date_from=date_from,
-            date_to=date_to
+            date_to=date_to,
+            cursor=cursor,
+            count=count or settings.EVENTS_COUNT_MODE
         )
-        return result
+        return json_response(result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar eventos: {str(e)}")
 
@@ -55,7 +74,7 @@ async def list_events(
 @router.get("/events/{event_id}")
 async def get_event(
     event_id: str,
-    db: DatabaseService = Depends(get_db_service)
+    events_service: EventsService = Depends(get_events_service)
 ):
     """
     Busca detalhes de um evento específico
@@ -65,8 +84,7 @@ async def get_event(
     Retorna informações completas do evento (nome, data, localização, etc)
     """
     try:
-        events_service = EventsService(db)
-        event = events_service.get_event_details(event_id)
+        event = await strict_read(events_service.get_event_details, event_id)
         
         if not event:
             raise HTTPException(status_code=404, detail=f"Evento {event_id} não encontrado")
@@ -74,6 +92,41 @@ async def get_event(
         return event
     except HTTPException:
         raise
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar evento: {str(e)}")
+
+
+@router.get("/events/{event_id}/full")
+async def get_event_full(
+    event_id: str,
+    include: Optional[str] = Query(None, description="Blocos extras separados por vírgula: persons, demographics"),
+    events_service: EventsService = Depends(get_events_service)
+):
+    """
+    Retorna evento, marcas e produtos em uma única resposta
+    
+    - **event_id**: UUID do evento
+    - **include**: blocos opcionais (`persons`, `demographics`)
+    
+    As consultas são feitas em paralelo; substitui as chamadas separadas a
+    `/events/{id}`, `/events/{id}/brands` e `/events/{id}/products`.
+    """
+    try:
+        includes = [i.strip() for i in include.split(",") if i.strip()] if include else []
+        result = await strict_read(events_service.get_event_full, event_id, includes)
+        
+        if not result:
+            raise HTTPException(status_code=404, detail=f"Evento {event_id} não encontrado")
+        
+        return json_response(result)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar evento: {str(e)}")
 
@@ -81,7 +134,7 @@ async def get_event(
 @router.get("/events/{event_id}/brands")
 async def get_event_brands(
     event_id: str,
-    db: DatabaseService = Depends(get_db_service)
+    events_service: EventsService = Depends(get_events_service)
 ):
     """
     Retorna resumo de marcas de um evento
@@ -92,18 +145,21 @@ async def get_event_brands(
     Inclui: brand, brand_share_percent, persons_with_brand, total_items
     """
     try:
-        # Verificar se evento existe
-        events_service = EventsService(db)
-        event = events_service.get_event_details(event_id)
+        # Verificar se evento existe e buscar marcas em paralelo
+        event, brands = await strict_read(
+            asyncio.gather,
+            events_service.get_event_details(event_id),
+            events_service.get_event_brands(event_id)
+        )
         
         if not event:
             raise HTTPException(status_code=404, detail=f"Evento {event_id} não encontrado")
         
-        # Buscar marcas
-        brands = events_service.get_event_brands(event_id)
         return {"event_id": event_id, "brands": brands}
     except HTTPException:
         raise
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar marcas do evento: {str(e)}")
 
@@ -111,7 +167,7 @@ async def get_event_brands(
 @router.get("/events/{event_id}/products")
 async def get_event_products(
     event_id: str,
-    db: DatabaseService = Depends(get_db_service)
+    events_service: EventsService = Depends(get_events_service)
 ):
     """
     Retorna resumo de produtos de um evento
@@ -122,22 +178,64 @@ async def get_event_products(
     Inclui: product_type, product_share_percent, persons_with_product, total_items
     """
     try:
-        # Verificar se evento existe
-        events_service = EventsService(db)
-        event = events_service.get_event_details(event_id)
+        # Verificar se evento existe e buscar produtos em paralelo
+        event, products = await strict_read(
+            asyncio.gather,
+            events_service.get_event_details(event_id),
+            events_service.get_event_products(event_id)
+        )
         
         if not event:
             raise HTTPException(status_code=404, detail=f"Evento {event_id} não encontrado")
         
-        # Buscar produtos
-        products = events_service.get_event_products(event_id)
         return {"event_id": event_id, "products": products}
     except HTTPException:
         raise
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar produtos do evento: {str(e)}")
 
 
+@router.get("/dashboard")
+async def get_dashboard(
+    sport: Optional[str] = Query(None, description="Filtrar por esporte (múltiplos valores separados por vírgula)"),
+    event_type: Optional[str] = Query(None, description="Filtrar por tipo de evento (prova, treino)"),
+    location: Optional[str] = Query(None, description="Filtrar por localização"),
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    brand: Optional[str] = Query(None, description="Filtrar a série temporal por marca"),
+    page_size: int = Query(10, ge=1, le=100, description="Eventos na primeira página da listagem"),
+    events_service: EventsService = Depends(get_events_service)
+):
+    """
+    Retorna todos os dados da página inicial do dashboard em uma requisição
+    
+    - **metrics**: mesmos KPIs de `/metrics/dashboard`
+    - **brand_time_series**: mesmos dados de `/metrics/brands/timeseries`
+    - **sport_distribution**: eventos por esporte (sport, events, percentage), sobre todos os eventos filtrados
+    - **events**: primeira página de `/events` (com `next_cursor` para as seguintes)
+    
+    KPIs, distribuição e série saem de uma única consulta ao banco, que resolve os
+    filtros uma vez; a primeira página é buscada em paralelo.
+    """
+    try:
+        return json_response(await strict_read(
+            events_service.get_dashboard,
+            sport=sport,
+            event_type=event_type,
+            location=location,
+            date_from=date_from,
+            date_to=date_to,
+            brand=brand,
+            page_size=page_size
+        ))
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar dados do dashboard: {str(e)}")
+
+
 @router.get("/metrics/dashboard")
 async def get_dashboard_metrics(
     sport: Optional[str] = Query(None, description="Filtrar por esporte"),
@@ -145,7 +243,7 @@ async def get_dashboard_metrics(
     location: Optional[str] = Query(None, description="Filtrar por localização"),
     date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
-    db: DatabaseService = Depends(get_db_service)
+    events_service: EventsService = Depends(get_events_service)
 ):
     """
     Retorna KPIs agregados para o dashboard com filtros
@@ -164,8 +262,8 @@ async def get_dashboard_metrics(
     - **date_to**: Data final (YYYY-MM-DD)
     """
     try:
-        events_service = EventsService(db)
-        metrics = events_service.get_dashboard_metrics(
+        metrics = await strict_read(
+            events_service.get_dashboard_metrics,
             sport=sport,
             event_type=event_type,
             location=location,
@@ -173,6 +271,8 @@ async def get_dashboard_metrics(
             date_to=date_to
         )
         return metrics
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar métricas do dashboard: {str(e)}")
 
@@ -185,7 +285,7 @@ async def get_brands_time_series(
     date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
     brand: Optional[str] = Query(None, description="Filtrar por marca (múltiplos valores separados por vírgula)"),
-    db: DatabaseService = Depends(get_db_service)
+    events_service: EventsService = Depends(get_events_service)
 ):
     """
     Retorna dados temporais de marcas agrupados por mês com filtros
@@ -205,8 +305,8 @@ async def get_brands_time_series(
     - **brand**: Filtrar por marca (múltiplos valores separados por vírgula)
     """
     try:
-        events_service = EventsService(db)
-        time_series = events_service.get_brand_time_series(
+        time_series = await strict_read(
+            events_service.get_brand_time_series,
             sport=sport,
             event_type=event_type,
             location=location,
@@ -214,6 +314,82 @@ async def get_brands_time_series(
             date_to=date_to,
             brand=brand
         )
-        return {"data": time_series}
+        return json_response({"data": time_series})
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar dados temporais de marcas: {str(e)}")
+
+
+@router.get("/metrics/cube")
+async def get_cube(
+    dims: Optional[str] = Query(
+        None, description="Dimensões de agrupamento separadas por vírgula "
+                          "(month, sport, event_type, location, brand, product_type, gender, age_bucket)"
+    ),
+    sport: Optional[str] = Query(None, description="Filtrar por esporte (múltiplos valores separados por vírgula)"),
+    event_type: Optional[str] = Query(None, description="Filtrar por tipo de evento (prova, treino)"),
+    location: Optional[str] = Query(None, description="Filtrar por localização (busca parcial)"),
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD, arredondada para o mês)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    brand: Optional[str] = Query(None, description="Filtrar por marca (múltiplos valores separados por vírgula)"),
+    product_type: Optional[str] = Query(None, description="Filtrar por tipo de produto"),
+    gender: Optional[str] = Query(None, description="Filtrar por gênero (M, F, Outro)"),
+    age_bucket: Optional[str] = Query(None, description="Filtrar por faixa etária (18-25, 26-35, 36-45, 46+)"),
+    events_service: EventsService = Depends(get_events_service)
+):
+    """
+    Itens e pessoas para qualquer combinação de filtros, a partir do cubo pré-agregado
+    
+    Agrupa por `dims` e filtra por qualquer dimensão. Retorna:
+    - dimensions: dimensões usadas no agrupamento
+    - rows: um objeto por grupo (valores das dimensões, `items` e `persons`)
+    - totals: soma de `items` e `persons`
+    
+    `persons` é null quando não é somável (marca sem um tipo de produto fixo: uma
+    pessoa pode usar vários itens da mesma marca). O cubo é atualizado junto com os
+    resumos (`refresh_dirty_summaries()`, chamado ao fim de cada ingestão).
+    """
+    try:
+        return json_response(await strict_read(
+            events_service.get_cube,
+            dims=dims,
+            sport=sport,
+            event_type=event_type,
+            location=location,
+            date_from=date_from,
+            date_to=date_to,
+            brand=brand,
+            product_type=product_type,
+            gender=gender,
+            age_bucket=age_bucket
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DataUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar cubo analítico: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(cache: TTLCache = Depends(get_response_cache)):
+    """
+    Retorna estatísticas do cache de leituras do dashboard
+    
+    - size / maxsize: entradas em uso e capacidade
+    - hits / misses / hit_ratio: eficácia do cache
+    """
+    return cache.stats()
+
+
+@router.post("/cache/invalidate", dependencies=[Depends(verify_ingest_token)])
+async def invalidate_cache(cache: TTLCache = Depends(get_response_cache)):
+    """
+    Invalida o cache de leituras do dashboard
+    
+    Usar após atualizar os resumos para servir dados novos imediatamente.
+    Exige o mesmo token da ingestão (`Authorization: Bearer <INGEST_API_KEY>`).
+    """
+    removed = cache.invalidate()
+    return {"invalidated": removed}
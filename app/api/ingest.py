@@ -0,0 +1,60 @@
+"""
+Rotas de ingestão de resultados de detecção
+Recebe pessoas e itens de um evento em NDJSON (streaming) vindos do pipeline de visão computacional
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.api.deps import get_ingestion_service, get_response_cache, verify_ingest_token
+from app.core.ingest import IngestionService
+from app.schemas.ingest import IngestResponse
+from app.services.cache import TTLCache
+
+router = APIRouter()
+
+
+@router.post(
+    "/events/{event_id}/ingest",
+    response_model=IngestResponse,
+    dependencies=[Depends(verify_ingest_token)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def ingest_event(
+    event_id: str,
+    request: Request,
+    ingestion: IngestionService = Depends(get_ingestion_service),
+    cache: TTLCache = Depends(get_response_cache)
+):
+    """
+    Ingestão em massa de pessoas e itens detectados em um evento
+
+    Exige `Authorization: Bearer <INGEST_API_KEY>`. Corpo em NDJSON (uma linha JSON
+    por registro), lido em streaming:
+
+    ```
+    {"type": "person", "person_id": "…", "cpf": "12345678901", "age": 32, "gender": "F", "photo_count": 4}
+    {"type": "item", "person_id": "…", "product_type": "tênis", "brand": "Nike", "product_name": "Pegasus 40"}
+    ```
+
+    - Marcas, tipos de produto e gênero seguem as constraints do banco; linhas inválidas
+      são rejeitadas (contagem e primeiras linhas em `rejected`/`errors`) sem interromper a carga
+    - Upsert em lotes, idempotente em (event_id, person_id) e (event_id, person_id, product_type):
+      reenviar o arquivo não duplica dados
+    - O evento fica `processing` durante a carga e `completed` ao final, com contadores e
+      resumos atualizados; se a gravação falhar, fica `failed` (o envio pode ser repetido)
+    """
+    try:
+        result = await ingestion.ingest_event(event_id, request.stream())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na ingestão do evento: {str(e)}")
+
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Evento {event_id} não encontrado")
+
+    # Os resumos mudaram: não esperar a próxima verificação da versão dos dados
+    cache.invalidate()
+    return result
@@ -0,0 +1,76 @@
+"""
+Métricas no formato do Prometheus
+Middleware de latência por rota e endpoint GET /metrics para o scraper
+"""
+
+import time
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import HTTP_REQUEST_DURATION, registry
+
+router = APIRouter()
+
+
+class MetricsMiddleware:
+    """
+    Histograma de latência das requisições HTTP por método, rota e status
+
+    A rota é o template (`/api/events/{event_id}`), não o caminho, para manter a
+    cardinalidade baixa. Middleware ASGI puro: a latência inclui os middlewares
+    internos (ETag, CORS) e, em respostas em streaming, o envio do corpo.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=self._route_template(scope),
+                status=status
+            )
+
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        """Template da rota atendida; respostas geradas antes do roteamento (ex: 304) são casadas aqui"""
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+
+        app = scope.get("app")
+        routes = getattr(getattr(app, "router", None), "routes", [])
+        for candidate in routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                path: Optional[str] = getattr(candidate, "path", None)
+                if path:
+                    return path
+        return "unmatched"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métricas do processo no formato de exposição do Prometheus (text/plain 0.0.4)"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
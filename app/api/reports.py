@@ -3,17 +3,28 @@ Rotas de geração de relatórios com LLM
 Endpoints para gerar relatórios de Market Share, Segmentação e Métricas de Evento
 """
 
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException
-from app.api.deps import get_db_service, get_openai_service
-from app.services.database import DatabaseService
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.api.deps import (
+    get_analytics_snapshots,
+    get_db_service,
+    get_openai_service,
+    get_report_cache,
+    get_report_jobs,
+)
+from app.services.database import AsyncDatabaseService
 from app.services.openai_service import OpenAIService
+from app.services.report_cache import ReportCache
+from app.services.analytics_snapshot import AnalyticsSnapshotStore
 from app.core.reports import ReportsService
+from app.core.report_jobs import ReportJob, ReportJobQueue, QueueFullError
 from app.schemas.reports import (
     GenerateReportRequest,
     GenerateReportResponse,
-    MarketShareFilters,
-    AudienceSegmentationFilters,
-    EventMetricsFilters,
+    ReportJobResponse,
 )
 
 router = APIRouter()
@@ -22,8 +33,10 @@ router = APIRouter()
 @router.post("/reports/generate", response_model=GenerateReportResponse)
 async def generate_report(
     request: GenerateReportRequest,
-    db: DatabaseService = Depends(get_db_service),
-    openai: OpenAIService = Depends(get_openai_service)
+    db: AsyncDatabaseService = Depends(get_db_service),
+    openai: OpenAIService = Depends(get_openai_service),
+    report_cache: Optional[ReportCache] = Depends(get_report_cache),
+    snapshots: Optional[AnalyticsSnapshotStore] = Depends(get_analytics_snapshots)
 ):
     """
     Gera um relatório usando LLM com base nos filtros fornecidos
@@ -66,26 +79,8 @@ async def generate_report(
         )
     
     try:
-        reports_service = ReportsService(db, openai)
-        
-        if request.type == "market_share":
-            filters = MarketShareFilters(**request.filters)
-            return reports_service.generate_market_share_report(filters)
-        
-        elif request.type == "audience_segmentation":
-            filters = AudienceSegmentationFilters(**request.filters)
-            return reports_service.generate_audience_segmentation_report(filters)
-        
-        elif request.type == "event_metrics":
-            filters = EventMetricsFilters(**request.filters)
-            return reports_service.generate_event_metrics_report(filters)
-        
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Tipo de relatório inválido: {request.type}. "
-                       f"Tipos válidos: market_share, audience_segmentation, event_metrics"
-            )
+        reports_service = ReportsService(db, openai, report_cache, snapshots)
+        return await reports_service.generate_report(request)
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -98,6 +93,124 @@ async def generate_report(
         )
 
 
+@router.post("/reports/stream")
+async def stream_report(
+    request: GenerateReportRequest,
+    db: AsyncDatabaseService = Depends(get_db_service),
+    openai: OpenAIService = Depends(get_openai_service),
+    report_cache: Optional[ReportCache] = Depends(get_report_cache),
+    snapshots: Optional[AnalyticsSnapshotStore] = Depends(get_analytics_snapshots)
+):
+    """
+    Gera um relatório em streaming (Server-Sent Events)
+    
+    Mesmo corpo de `POST /reports/generate`. Eventos enviados, nesta ordem:
+    
+    - `meta`: tipo, título, filtros aplicados e contagens (eventos, atletas, itens)
+    - `delta`: trechos do conteúdo (`{"content": "..."}`), à medida que a LLM gera
+    - `done`: tokens (estimados no streaming), modelo, tempo de geração e `cached`
+    - `error`: enviado no lugar dos demais se a geração falhar no meio do stream
+    """
+    if openai is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de geração de relatórios não disponível. "
+                   "Configure OPENAI_API_KEY no arquivo .env"
+        )
+    
+    reports_service = ReportsService(db, openai, report_cache, snapshots)
+    try:
+        filters = reports_service.parse_filters(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(
+        _sse_stream(reports_service.stream_report(filters)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _sse_stream(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    """Formata os eventos do relatório como SSE"""
+    # Comentário inicial: libera os headers e o primeiro byte antes da coleta de dados
+    yield ": stream iniciado\n\n"
+    try:
+        async for event, data in events:
+            yield _sse_event(event, data)
+    except Exception as e:
+        print(f"Erro no streaming de relatório: {e}")
+        yield _sse_event("error", {"detail": str(e)})
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+@router.post("/reports/jobs", response_model=ReportJobResponse, status_code=202)
+async def submit_report_job(
+    request: GenerateReportRequest,
+    jobs: ReportJobQueue = Depends(get_report_jobs),
+    openai: OpenAIService = Depends(get_openai_service)
+):
+    """
+    Enfileira a geração de um relatório e retorna imediatamente o ID do job
+    
+    Mesmo corpo de `POST /reports/generate`; filtros inválidos retornam 400 na hora.
+    Acompanhe o andamento com `GET /reports/jobs/{job_id}` até o status `done`
+    (com o relatório em `result`) ou `failed` (com a mensagem em `error`).
+    """
+    if openai is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de geração de relatórios não disponível. "
+                   "Configure OPENAI_API_KEY no arquivo .env"
+        )
+    
+    try:
+        job = jobs.submit(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return _job_response(job, jobs)
+
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    jobs: ReportJobQueue = Depends(get_report_jobs)
+):
+    """
+    Retorna o estado de um job de relatório
+    
+    Status possíveis: `queued`, `running`, `done`, `failed`.
+    Jobs finalizados ficam disponíveis por REPORT_JOB_RETENTION_SECONDS.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    return _job_response(job, jobs)
+
+
+def _job_response(job: ReportJob, jobs: ReportJobQueue) -> ReportJobResponse:
+    """Converte o estado interno do job para o schema de resposta"""
+    return ReportJobResponse(
+        job_id=job.id,
+        type=job.request.type,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        queue_position=jobs.position(job.id) if job.status == "queued" else None,
+        result=job.result,
+        error=job.error
+    )
+
+
 @router.get("/reports/status")
 async def get_reports_status(
     openai: OpenAIService = Depends(get_openai_service)
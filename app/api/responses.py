@@ -0,0 +1,101 @@
+"""
+Serialização rápida das respostas grandes (FAST_JSON_ENABLED)
+Usa orjson sem passar pelo jsonable_encoder e transmite listas grandes em blocos
+"""
+
+import json
+from typing import Any, Iterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: sem orjson usa o json da biblioteca padrão
+    orjson = None
+
+from app.config import settings
+
+
+# Itens por bloco ao transmitir uma lista grande
+STREAM_BATCH_SIZE = 256
+
+
+def _default(value: Any) -> Any:
+    """Tipos que o orjson não serializa sozinho (Decimal, modelos Pydantic...): mesma conversão do FastAPI"""
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSON compacto em UTF-8 com as mesmas chaves, valores e ordem do JSONResponse do FastAPI
+
+    Com orjson o texto pode não ser byte a byte igual: a grafia de alguns floats muda
+    (ex: 1e+16 vira 1e16) e NaN/Infinity saem como null, onde o json da biblioteca
+    padrão levantaria ValueError.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSONResponse serializado com orjson"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def iter_json(content: Any, min_items: int) -> Iterator[bytes]:
+    """
+    Codifica `content` em blocos: listas com `min_items` ou mais itens (no topo ou
+    como valor de um objeto) saem em lotes de STREAM_BATCH_SIZE itens
+    """
+    if isinstance(content, list) and len(content) >= min_items:
+        yield b"["
+        for start in range(0, len(content), STREAM_BATCH_SIZE):
+            batch = dumps(content[start:start + STREAM_BATCH_SIZE])[1:-1]
+            yield batch if start == 0 else b"," + batch
+        yield b"]"
+    elif isinstance(content, dict) and _has_large_list(content, min_items):
+        yield b"{"
+        for index, (key, value) in enumerate(content.items()):
+            prefix = (b"," if index else b"") + dumps(str(key)) + b":"
+            if _has_large_list(value, min_items):
+                yield prefix
+                yield from iter_json(value, min_items)
+            else:
+                yield prefix + dumps(value)
+        yield b"}"
+    else:
+        yield dumps(content)
+
+
+def _has_large_list(content: Any, min_items: int) -> bool:
+    if isinstance(content, list):
+        return len(content) >= min_items
+    if isinstance(content, dict):
+        return any(_has_large_list(value, min_items) for value in content.values())
+    return False
+
+
+def json_response(content: Any) -> Any:
+    """
+    Resposta de uma rota com listas potencialmente grandes
+
+    Com FAST_JSON_ENABLED, serializa com orjson (sem jsonable_encoder) e, se houver
+    uma lista com JSON_STREAM_MIN_ITEMS itens ou mais, transmite o corpo em blocos.
+    Desabilitado, devolve o conteúdo para o caminho padrão do FastAPI. Os dados são
+    os mesmos nos dois casos, mas o texto não é byte a byte igual (ver dumps).
+    """
+    if not settings.FAST_JSON_ENABLED:
+        return content
+    if _has_large_list(content, settings.JSON_STREAM_MIN_ITEMS):
+        return StreamingResponse(
+            iter_json(content, settings.JSON_STREAM_MIN_ITEMS), media_type="application/json"
+        )
+    return FastJSONResponse(content)
@@ -0,0 +1,62 @@
+"""
+Rastreamento de consultas por requisição
+Cabeçalho Server-Timing, resumo das chamadas e aviso de padrões N+1
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.tracing import RequestTrace, current_trace
+
+
+class QueryTraceMiddleware:
+    """
+    Registra as chamadas ao banco e à LLM de cada requisição (app/services/tracing.py)
+
+    - `Server-Timing` com o tempo somado de banco e LLM e o total da requisição
+      (em respostas em streaming, apenas o que ocorreu antes do início do envio)
+    - Aviso quando uma requisição faz mais de `max_queries_per_table` consultas à
+      mesma tabela/RPC (indício de N+1), com o resumo das chamadas
+    - Com `log_summary`, o resumo de todas as requisições
+    """
+
+    def __init__(self, app: ASGIApp, max_queries_per_table: int = 10, log_summary: bool = False):
+        self.app = app
+        self.max_queries_per_table = max_queries_per_table
+        self.log_summary = log_summary
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope["path"])
+        token = current_trace.set(trace)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing((time.perf_counter() - start) * 1000))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(token)
+            self._report(trace, (time.perf_counter() - start) * 1000)
+
+    def _report(self, trace: RequestTrace, total_ms: float) -> None:
+        """Avisa sobre N+1 e imprime o resumo"""
+        repeated = {
+            target: count
+            for target, count in trace.queries_per_target().items()
+            if count > self.max_queries_per_table
+        }
+        if repeated:
+            tables = ", ".join(f"{target} ({count}x)" for target, count in repeated.items())
+            print(f"Aviso: possível N+1 em {trace.method} {trace.path}: {tables}")
+        if repeated or self.log_summary:
+            print(trace.summary(total_ms))
@@ -18,6 +18,12 @@ class Settings(BaseSettings):
     
     # Database (opcional - usando API REST principalmente)
     DATABASE_URL: Optional[str] = None
+    # Backend de acesso a dados: "supabase" (PostgREST) ou "postgres" (conexão direta via DATABASE_URL)
+    DATABASE_BACKEND: str = "supabase"
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    # Linhas por página nas leituras em massa via PostgREST (deve ser <= max-rows do PostgREST)
+    DATABASE_PAGE_SIZE: int = 1000
     
     # API
     API_HOST: str = "0.0.0.0"
@@ -25,11 +31,57 @@ class Settings(BaseSettings):
     API_TITLE: str = "Midiaz B2B - Event Brand Report API"
     API_VERSION: str = "1.0.0"
     
+    # Contagem do total na listagem de eventos: "exact", "planned" ou "estimated"
+    EVENTS_COUNT_MODE: str = "exact"
+    
+    # Ingestão NDJSON (POST /api/events/{id}/ingest): linhas por lote e lotes simultâneos
+    INGEST_BATCH_SIZE: int = 1000
+    INGEST_CONCURRENCY: int = 4
+    # Token exigido em Authorization: Bearer pela rota de ingestão (sem ele a rota responde 503)
+    INGEST_API_KEY: Optional[str] = None
+    
+    # Cache em memória das leituras do dashboard
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 512
+    
+    # ETag nas leituras (derivado da versão dos dados no banco)
+    ETAG_ENABLED: bool = True
+    DATA_VERSION_CHECK_SECONDS: float = 5
+    
+    # Métricas no formato do Prometheus em GET /metrics
+    METRICS_ENABLED: bool = True
+    
+    # Rastreamento de consultas por requisição (Server-Timing e aviso de N+1)
+    QUERY_TRACE_ENABLED: bool = False
+    QUERY_TRACE_MAX_PER_TABLE: int = 10
+    QUERY_TRACE_LOG_SUMMARY: bool = False
+    
+    # Serialização e compressão das respostas grandes (listas de eventos, dashboard, cubo)
+    FAST_JSON_ENABLED: bool = False  # orjson (se instalado) e listas grandes transmitidas em blocos
+    JSON_STREAM_MIN_ITEMS: int = 500  # itens a partir dos quais uma lista é transmitida em blocos
+    RESPONSE_COMPRESSION_ENABLED: bool = False  # brotli (se instalado) ou gzip, via Accept-Encoding
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024  # bytes; respostas menores não são comprimidas
+    
     # OpenAI
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"
     OPENAI_MAX_TOKENS: int = 1000
     
+    # Cache persistente dos relatórios gerados (SQLite local)
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_PATH: str = ".cache/reports.sqlite3"
+    REPORT_CACHE_MAX_ENTRIES: int = 500
+    
+    # Fila de jobs de relatório (POST /api/reports/jobs)
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_MAX_PENDING: int = 100
+    REPORT_JOB_RETENTION_SECONDS: int = 3600
+    
+    # Snapshot analítico colunar (requer numpy; gerado com `python -m app.services.analytics_snapshot`)
+    ANALYTICS_SNAPSHOT_ENABLED: bool = False
+    ANALYTICS_SNAPSHOT_PATH: str = ".cache/analytics"
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
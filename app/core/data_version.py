@@ -0,0 +1,59 @@
+"""
+Rastreamento da versão dos dados
+Consulta o token de versão do banco com baixa frequência e avisa quando ele muda
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional
+from app.services.database import AsyncDatabaseService
+
+
+class DataVersionTracker:
+    """
+    Mantém o token de versão dos dados (get_data_version) em memória
+
+    O banco é consultado no máximo uma vez a cada `check_interval_seconds`,
+    independente do número de requisições. Quando o token muda, os callbacks
+    registrados são chamados (ex: invalidar o cache de respostas).
+    """
+
+    def __init__(self, db_service: AsyncDatabaseService, check_interval_seconds: float = 5):
+        self.db = db_service
+        self.check_interval_seconds = check_interval_seconds
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._on_change: List[Callable[[], None]] = []
+
+    def on_change(self, callback: Callable[[], None]) -> None:
+        """Registra um callback chamado quando a versão muda"""
+        self._on_change.append(callback)
+
+    async def current(self) -> Optional[str]:
+        """Versão atual dos dados (None se não for possível obtê-la)"""
+        if self._is_fresh():
+            return self._version
+
+        async with self._lock:
+            # Outra requisição pode ter atualizado enquanto esperávamos o lock
+            if self._is_fresh():
+                return self._version
+
+            version = await self.db.get_data_version()
+            self._checked_at = time.monotonic()
+
+            if version is not None and version != self._version:
+                previous = self._version
+                self._version = version
+                if previous is not None:
+                    for callback in self._on_change:
+                        callback()
+            return self._version
+
+    def _is_fresh(self) -> bool:
+        """True se o banco foi consultado há menos de check_interval_seconds (mesmo sem sucesso)"""
+        return (
+            self._checked_at > 0
+            and time.monotonic() - self._checked_at < self.check_interval_seconds
+        )
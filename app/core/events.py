@@ -3,19 +3,67 @@ Lógica de negócio para eventos e métricas
 Camada que orquestra serviços e aplica regras de negócio
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from collections import defaultdict
-from datetime import datetime
-from app.services.database import DatabaseService
+from datetime import date, timedelta
+from app.services.database import AsyncDatabaseService
+from app.services.cache import TTLCache, make_cache_key
+from app.services.analytics_snapshot import AnalyticsSnapshotStore
+from app.services.metrics import capture_db_errors, record_cache_lookup
+from app.core.data_version import DataVersionTracker
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+# Blocos opcionais de GET /events/{id}/full
+EVENT_FULL_INCLUDES = {"persons", "demographics"}
+
+# Dimensões do cubo analítico: nome na API -> coluna no banco
+CUBE_DIMENSIONS = {
+    "month": "month",
+    "sport": "sport",
+    "event_type": "event_type",
+    "location": "event_location",
+    "brand": "brand",
+    "product_type": "product_type",
+    "gender": "gender",
+    "age_bucket": "age_bucket",
+}
+# Existem só no cubo de itens (pessoas não se somam entre marcas/produtos)
+CUBE_ITEM_DIMENSIONS = {"brand", "product_type"}
+
+
+class DataUnavailableError(Exception):
+    """Uma consulta ao banco falhou e o resultado seria montado com valores padrão"""
+
+
+async def strict_read(fetch: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    Executa fetch(*args, **kwargs) e falha com DataUnavailableError se alguma consulta
+    ao banco falhou no caminho (o serviço de banco converte erros em listas vazias e zeros)
+    
+    fetch é chamado dentro da captura para que tarefas criadas por ele (ex: asyncio.gather)
+    também sejam observadas.
+    """
+    with capture_db_errors() as errors:
+        value = await fetch(*args, **kwargs)
+    if errors:
+        raise DataUnavailableError(f"Banco de dados indisponível ({', '.join(sorted(set(errors)))})")
+    return value
 
 
 class EventsService:
     """Serviço de lógica de negócio para eventos"""
     
-    def __init__(self, db_service: DatabaseService):
+    def __init__(
+        self,
+        db_service: AsyncDatabaseService,
+        snapshots: Optional[AnalyticsSnapshotStore] = None
+    ):
         self.db = db_service
+        self.snapshots = snapshots
     
-    def list_events(
+    async def list_events(
         self, 
         limit: int = 100, 
         offset: int = 0,
@@ -23,62 +71,123 @@ class EventsService:
         event_type: Optional[str] = None,
         location: Optional[str] = None,
         date_from: Optional[str] = None,
-        date_to: Optional[str] = None
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact"
     ) -> Dict[str, Any]:
         """
         Lista eventos com paginação e filtros
         Retorna eventos ordenados por data (mais recentes primeiro)
+        
+        Página e total vêm da mesma consulta; `count` escolhe o modo de contagem
+        ("exact", "planned" ou "estimated" - os dois últimos evitam contar tabelas grandes).
+        Com `cursor` (o `next_cursor` da página anterior) a página começa logo após
+        o último evento já visto, sem depender de offset; nesse caso o total não é
+        recalculado (`total` = None - use o da primeira página). Levanta ValueError
+        se o cursor for inválido.
         """
-        events = self.db.get_events(
-            limit=limit, 
-            offset=offset,
-            sport=sport,
-            event_type=event_type,
-            location=location,
-            date_from=date_from,
-            date_to=date_to
-        )
-        total = self.db.count_events(
+        after = decode_cursor(cursor) if cursor else None
+        
+        # Um evento a mais indica se existe próxima página
+        events, total = await self.db.get_events_page(
+            limit=limit + 1, 
+            offset=0 if after else offset,
             sport=sport,
             event_type=event_type,
             location=location,
             date_from=date_from,
-            date_to=date_to
+            date_to=date_to,
+            after=after,
+            count=None if after else count
         )
         
+        has_more = len(events) > limit
+        events = events[:limit]
+        next_cursor = None
+        if has_more and events:
+            last = events[-1]
+            next_cursor = encode_cursor(last["event_date"], last["id"])
+        
         return {
             "events": events,
             "total": total,
             "limit": limit,
             "offset": offset,
-            "has_more": (offset + limit) < total
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
     
-    def get_event_details(self, event_id: str) -> Optional[Dict[str, Any]]:
+    async def get_event_details(self, event_id: str) -> Optional[Dict[str, Any]]:
         """
         Busca detalhes completos de um evento
         Inclui informações básicas do evento
         """
-        event = self.db.get_event_by_id(event_id)
+        event = await self.db.get_event_by_id(event_id)
         return event
     
-    def get_event_brands(self, event_id: str) -> List[Dict[str, Any]]:
+    async def get_event_brands(self, event_id: str) -> List[Dict[str, Any]]:
         """
         Retorna resumo de marcas de um evento
         Ordenado por brand_share_percent (maior para menor)
         """
-        brands = self.db.get_brand_summary(event_id)
+        brands = await self.db.get_brand_summary(event_id)
         return brands
     
-    def get_event_products(self, event_id: str) -> List[Dict[str, Any]]:
+    async def get_event_products(self, event_id: str) -> List[Dict[str, Any]]:
         """
         Retorna resumo de produtos de um evento
         Ordenado por product_share_percent (maior para menor)
         """
-        products = self.db.get_product_summary(event_id)
+        products = await self.db.get_product_summary(event_id)
         return products
     
-    def get_dashboard_metrics(
+    async def get_event_full(
+        self, event_id: str, include: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Evento, marcas e produtos em um único documento
+        
+        As consultas rodam em paralelo (a latência é a da mais lenta). `include` aceita
+        "persons" (lista de pessoas) e "demographics" (distribuição de gênero e idade);
+        as pessoas são buscadas uma única vez para ambos. Com um snapshot analítico
+        atualizado, a demografia vem dele e as pessoas só são buscadas se pedidas.
+        Retorna None se o evento não existir.
+        """
+        include = set(include or [])
+        unknown = include - EVENT_FULL_INCLUDES
+        if unknown:
+            raise ValueError(
+                f"include inválido: {', '.join(sorted(unknown))}. "
+                f"Valores válidos: {', '.join(sorted(EVENT_FULL_INCLUDES))}"
+            )
+        
+        snapshot = None
+        if "demographics" in include and self.snapshots:
+            snapshot = await self.snapshots.get()
+        
+        fetches = [
+            self.db.get_event_by_id(event_id),
+            self.db.get_brand_summary(event_id),
+            self.db.get_product_summary(event_id),
+        ]
+        fetch_persons = "persons" in include or ("demographics" in include and snapshot is None)
+        if fetch_persons:
+            columns = "*" if "persons" in include else "gender, age"
+            fetches.append(self.db.get_persons_by_events([event_id], columns=columns))
+        
+        event, brands, products, *rest = await asyncio.gather(*fetches)
+        if not event:
+            return None
+        
+        result = {"event": event, "brands": brands, "products": products}
+        if "persons" in include:
+            result["persons"] = rest[0]
+        if "demographics" in include:
+            counts = snapshot.person_counts([event_id]) if snapshot else self._count_persons(rest[0])
+            result["demographics"] = self._summarize_demographics(counts)
+        return result
+    
+    async def get_dashboard_metrics(
         self,
         sport: Optional[str] = None,
         event_type: Optional[str] = None,
@@ -89,7 +198,7 @@ class EventsService:
         """
         Retorna KPIs agregados para o dashboard com filtros
         """
-        metrics = self.db.get_dashboard_metrics(
+        metrics = await self.db.get_dashboard_metrics(
             sport=sport,
             event_type=event_type,
             location=location,
@@ -98,7 +207,56 @@ class EventsService:
         )
         return metrics
     
-    def get_brand_time_series(
+    async def get_dashboard(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        page_size: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Dados da página inicial do dashboard em uma única chamada
+        
+        Duas consultas em paralelo: o resumo (get_dashboard_summary), que resolve os
+        filtros uma vez no banco para KPIs, distribuição por esporte (sobre todos os
+        eventos filtrados) e itens por mês e marca; e a primeira página da listagem,
+        com o total.
+        """
+        filters = dict(
+            sport=sport, event_type=event_type, location=location,
+            date_from=date_from, date_to=date_to
+        )
+        summary, (page, total) = await asyncio.gather(
+            self.db.get_dashboard_summary(
+                **filters, brand=brand, use_month_rollup=self._is_month_aligned(date_from, date_to)
+            ),
+            self.db.get_events_page(limit=page_size, count="exact", **filters)
+        )
+        
+        total = total or 0
+        has_more = total > page_size
+        next_cursor = None
+        if has_more and page:
+            next_cursor = encode_cursor(page[-1]["event_date"], page[-1]["id"])
+        
+        return {
+            "metrics": summary["metrics"],
+            "brand_time_series": self._format_brand_time_series(summary["brand_months"]),
+            "sport_distribution": self._sport_distribution(summary["sport_distribution"]),
+            "events": {
+                "events": page,
+                "total": total,
+                "limit": page_size,
+                "offset": 0,
+                "has_more": has_more,
+                "next_cursor": next_cursor
+            }
+        }
+    
+    async def get_brand_time_series(
         self,
         sport: Optional[str] = None,
         event_type: Optional[str] = None,
@@ -114,41 +272,57 @@ class EventsService:
         - date: mês no formato "Jan", "Fev", etc.
         - nike, adidas, mizuno, etc.: total de itens por marca
         """
+        # Com datas em limites de mês, o rollup mensal já responde agrupado;
+        # caso contrário, é preciso partir dos dados por evento para respeitar o corte exato
+        if self._is_month_aligned(date_from, date_to):
+            raw_data = await self.db.get_brand_month_series(
+                sport=sport,
+                event_type=event_type,
+                location=location,
+                date_from=date_from,
+                date_to=date_to,
+                brand=brand
+            )
+        else:
+            raw_data = await self.db.get_brand_time_series(
+                sport=sport,
+                event_type=event_type,
+                location=location,
+                date_from=date_from,
+                date_to=date_to,
+                brand=brand
+            )
+        
+        return self._format_brand_time_series(raw_data)
+    
+    @staticmethod
+    def _format_brand_time_series(raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Agrupa linhas de itens por marca (por evento ou por mês) no formato da série temporal"""
+        if not raw_data:
+            return []
+        
         # Mapeamento de mês para nome abreviado em português
         month_names = {
             1: "Jan", 2: "Fev", 3: "Mar", 4: "Abr", 5: "Mai", 6: "Jun",
             7: "Jul", 8: "Ago", 9: "Set", 10: "Out", 11: "Nov", 12: "Dez"
         }
         
-        # Buscar dados do banco (com filtros)
-        raw_data = self.db.get_brand_time_series(
-            sport=sport,
-            event_type=event_type,
-            location=location,
-            date_from=date_from,
-            date_to=date_to,
-            brand=brand
-        )
-        
-        if not raw_data:
-            return []
-        
         # Agrupar por mês e marca
         # Estrutura: {(ano, mês): {marca: total_items}}
         monthly_data: Dict[tuple, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
         
         for item in raw_data:
-            event_date = item.get("event_date")
+            # Linhas do rollup têm "month" (YYYY-MM-01); linhas por evento têm "event_date"
+            row_date = item.get("month") or item.get("event_date")
             brand = item.get("brand")
             total_items = item.get("total_items", 0)
             
-            if not event_date or not brand:
+            if not row_date or not brand:
                 continue
             
-            # Parsear a data (formato: YYYY-MM-DD)
+            # Datas ISO (YYYY-MM-DD): ano e mês saem direto da string
             try:
-                date_obj = datetime.strptime(event_date, "%Y-%m-%d")
-                year_month = (date_obj.year, date_obj.month)
+                year_month = (int(row_date[0:4]), int(row_date[5:7]))
                 # Normalizar nome da marca para minúsculo
                 brand_key = brand.lower().replace("&", "")
                 monthly_data[year_month][brand_key] += total_items
@@ -169,3 +343,288 @@ class EventsService:
             result.append(entry)
         
         return result
+    
+    async def get_cube(
+        self,
+        dims: Optional[str] = None,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        product_type: Optional[str] = None,
+        gender: Optional[str] = None,
+        age_bucket: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Itens e pessoas para qualquer combinação de filtros, somando células do cubo
+        
+        `dims` (separadas por vírgula) define o agrupamento; o custo depende do número
+        de células, não de quantos atletas foram detectados. O grão de data é o mês.
+        `persons` só é exato sem marca/produto (cubo de pessoas) ou com um único tipo de
+        produto por grupo (uma pessoa tem no máximo um item de cada tipo por evento);
+        nos demais casos vem null. Levanta ValueError para dimensões desconhecidas.
+        """
+        dim_names = list(dict.fromkeys(d.strip() for d in (dims or "").split(",") if d.strip()))
+        unknown = set(dim_names) - CUBE_DIMENSIONS.keys()
+        if unknown:
+            raise ValueError(
+                f"Dimensões inválidas: {', '.join(sorted(unknown))}. "
+                f"Valores válidos: {', '.join(CUBE_DIMENSIONS)}"
+            )
+        columns = [CUBE_DIMENSIONS[d] for d in dim_names]
+        filters = dict(
+            sport=sport, event_type=event_type, location=location, date_from=date_from,
+            date_to=date_to, brand=brand, product_type=product_type, gender=gender,
+            age_bucket=age_bucket
+        )
+        
+        product_types = [v.strip() for v in (product_type or "").split(",") if v.strip()]
+        item_scope = bool(CUBE_ITEM_DIMENSIONS & set(dim_names)) or bool(brand) or bool(product_types)
+        
+        if item_scope:
+            item_cells = await self.db.query_cube("items", columns, **filters)
+            person_cells = None
+            persons_equal_items = "product_type" in dim_names or len(product_types) == 1
+        else:
+            item_cells, person_cells = await asyncio.gather(
+                self.db.query_cube("items", columns, **filters),
+                self.db.query_cube("persons", columns, **filters)
+            )
+            persons_equal_items = False
+        
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        
+        def group_for(cell: Dict[str, Any]) -> Dict[str, Any]:
+            key = tuple(cell.get(column) for column in columns)
+            if key not in groups:
+                groups[key] = {
+                    **{name: cell.get(column) for name, column in zip(dim_names, columns)},
+                    "items": 0,
+                    "persons": 0 if person_cells is not None else None,
+                }
+            return groups[key]
+        
+        for cell in item_cells:
+            group_for(cell)["items"] += cell.get("items") or 0
+        for cell in person_cells or []:
+            group_for(cell)["persons"] += cell.get("persons") or 0
+        
+        rows = list(groups.values())
+        if persons_equal_items:
+            for row in rows:
+                row["persons"] = row["items"]
+        # Sem agrupamento e sem dados o cubo devolve uma célula vazia
+        rows = [row for row in rows if row["items"] or row["persons"]]
+        rows.sort(key=lambda row: row["items"], reverse=True)
+        
+        persons_known = person_cells is not None or persons_equal_items
+        return {
+            "dimensions": dim_names,
+            "rows": rows,
+            "totals": {
+                "items": sum(row["items"] for row in rows),
+                "persons": sum(row["persons"] for row in rows) if persons_known else None,
+            },
+        }
+    
+    @staticmethod
+    def _sport_distribution(counts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Percentual de cada esporte a partir das contagens (sport, events), do maior para o menor"""
+        total = sum(row["events"] for row in counts)
+        return [
+            {"sport": row["sport"], "events": row["events"],
+             "percentage": round(row["events"] / total * 100, 1)}
+            for row in sorted(counts, key=lambda row: row["events"], reverse=True)
+        ]
+    
+    @staticmethod
+    def _count_persons(persons: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Contagens de gênero e faixas etárias (mesmo formato de AnalyticsSnapshot.person_counts)"""
+        genders = {"M": 0, "F": 0}
+        age_ranges = {"18-25": 0, "26-35": 0, "36-45": 0, "46+": 0}
+        ages = []
+        
+        for p in persons:
+            if p.get("gender") in genders:
+                genders[p["gender"]] += 1
+            age = p.get("age")
+            if age:
+                ages.append(age)
+                if age <= 25:
+                    age_ranges["18-25"] += 1
+                elif age <= 35:
+                    age_ranges["26-35"] += 1
+                elif age <= 45:
+                    age_ranges["36-45"] += 1
+                else:
+                    age_ranges["46+"] += 1
+        
+        return {
+            "total": len(persons),
+            "male": genders["M"],
+            "female": genders["F"],
+            "age_count": len(ages),
+            "age_sum": sum(ages),
+            "age_ranges": age_ranges,
+        }
+    
+    @staticmethod
+    def _summarize_demographics(counts: Dict[str, Any]) -> Dict[str, Any]:
+        """Distribuição de gênero e faixas etárias (mesmas faixas dos relatórios)"""
+        total = counts["male"] + counts["female"]
+        age_count = counts["age_count"]
+        return {
+            "total_persons": counts["total"],
+            "gender_distribution": {
+                "male": counts["male"],
+                "female": counts["female"],
+                "male_percent": round(counts["male"] / total * 100, 1) if total else 0,
+                "female_percent": round(counts["female"] / total * 100, 1) if total else 0,
+            },
+            "age_distribution": [
+                {"age_range": name, "count": count,
+                 "percent": round(count / age_count * 100, 1) if age_count else 0}
+                for name, count in counts["age_ranges"].items()
+            ],
+            "avg_age": round(counts["age_sum"] / age_count, 1) if age_count else 0,
+        }
+    
+    @staticmethod
+    def _is_month_aligned(date_from: Optional[str], date_to: Optional[str]) -> bool:
+        """True se date_from é o 1º dia de um mês e date_to o último (ou ausentes)"""
+        try:
+            if date_from and date.fromisoformat(date_from).day != 1:
+                return False
+            if date_to and (date.fromisoformat(date_to) + timedelta(days=1)).day != 1:
+                return False
+        except ValueError:
+            return False
+        return True
+
+
+class CachedEventsService(EventsService):
+    """
+    EventsService com cache em memória nas leituras do dashboard
+    
+    Listagem, KPIs e série temporal são servidos do cache enquanto a entrada
+    for válida; a chave usa a forma canônica dos filtros. Com `version_tracker`,
+    a versão dos dados é conferida antes de cada leitura do cache (no máximo uma
+    consulta ao banco por intervalo): se mudou, o cache é descartado antes de responder.
+    
+    Resultados montados com valores padrão por falha no banco não são armazenados:
+    a leitura falha com DataUnavailableError.
+    """
+    
+    def __init__(
+        self,
+        db_service: AsyncDatabaseService,
+        cache: TTLCache,
+        snapshots: Optional[AnalyticsSnapshotStore] = None,
+        version_tracker: Optional[DataVersionTracker] = None
+    ):
+        super().__init__(db_service, snapshots)
+        self.cache = cache
+        self.version_tracker = version_tracker
+    
+    async def list_events(
+        self, 
+        limit: int = 100, 
+        offset: int = 0,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: str = "exact"
+    ) -> Dict[str, Any]:
+        return await self._cached(
+            "list_events", super().list_events,
+            limit=limit, offset=offset, sport=sport, event_type=event_type,
+            location=location, date_from=date_from, date_to=date_to, cursor=cursor,
+            count=count
+        )
+    
+    async def get_dashboard(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        page_size: int = 10
+    ) -> Dict[str, Any]:
+        return await self._cached(
+            "dashboard", super().get_dashboard,
+            sport=sport, event_type=event_type, location=location,
+            date_from=date_from, date_to=date_to, brand=brand, page_size=page_size
+        )
+    
+    async def get_dashboard_metrics(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return await self._cached(
+            "dashboard_metrics", super().get_dashboard_metrics,
+            sport=sport, event_type=event_type, location=location,
+            date_from=date_from, date_to=date_to
+        )
+    
+    async def get_brand_time_series(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self._cached(
+            "brand_time_series", super().get_brand_time_series,
+            sport=sport, event_type=event_type, location=location,
+            date_from=date_from, date_to=date_to, brand=brand
+        )
+    
+    async def get_cube(
+        self,
+        dims: Optional[str] = None,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        product_type: Optional[str] = None,
+        gender: Optional[str] = None,
+        age_bucket: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return await self._cached(
+            "cube", super().get_cube,
+            dims=dims, sport=sport, event_type=event_type, location=location,
+            date_from=date_from, date_to=date_to, brand=brand, product_type=product_type,
+            gender=gender, age_bucket=age_bucket
+        )
+    
+    async def _cached(self, namespace: str, fetch, **params) -> Any:
+        """Retorna do cache ou executa fetch(**params) e armazena o resultado"""
+        if self.version_tracker is not None:
+            # Invalida o cache (callback on_change) se os dados mudaram, mesmo sem o middleware de ETag.
+            # Falha ao obter a versão não compromete a leitura: fica fora da captura de erros
+            with capture_db_errors():
+                await self.version_tracker.current()
+        key = make_cache_key(namespace, **params)
+        hit, value = self.cache.get(key)
+        record_cache_lookup("response", hit)
+        if hit:
+            return value
+        
+        value = await strict_read(fetch, **params)
+        self.cache.set(key, value)
+        return value
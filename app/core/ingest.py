@@ -0,0 +1,159 @@
+"""
+Ingestão em massa de resultados de detecção
+Lê o corpo NDJSON em streaming, valida cada linha e grava pessoas e itens em lotes
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Set, Tuple
+from pydantic import ValidationError
+
+from app.services.database import AsyncDatabaseService
+from app.schemas.ingest import IngestResponse, PersonRecord, ingest_record_adapter
+from app.config import settings
+
+
+# Quantas linhas rejeitadas são detalhadas na resposta (as demais só entram na contagem)
+MAX_REPORTED_ERRORS = 50
+
+
+class IngestionService:
+    """
+    Ingestão dos resultados do pipeline de visão computacional para um evento
+
+    Pessoas e itens são acumulados em lotes de `batch_size` linhas e gravados com
+    upsert (idempotente em (event_id, person_id) e (event_id, person_id, product_type)),
+    com até `concurrency` lotes em voo. Reenviar o mesmo arquivo não duplica dados.
+    """
+
+    def __init__(
+        self,
+        db_service: AsyncDatabaseService,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.db = db_service
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.concurrency = concurrency or settings.INGEST_CONCURRENCY
+
+    async def ingest_event(self, event_id: str, body: AsyncIterator[bytes]) -> Optional[IngestResponse]:
+        """
+        Ingestão de um evento a partir do corpo NDJSON (chunks de bytes)
+
+        O evento fica `processing` durante a carga e passa a `completed` ao final, com
+        contadores e resumos atualizados; se a gravação ou o fechamento (contadores e
+        resumos) falhar, fica `failed` e a exceção é propagada. Linhas inválidas são rejeitadas sem interromper a carga.
+        Retorna None se o evento não existir.
+        """
+        event = await self.db.get_event_by_id(event_id)
+        if not event:
+            return None
+
+        started = time.perf_counter()
+        await self.db.update_event_status(event_id, "processing")
+
+        # Lotes indexados pela chave de conflito: repetições no mesmo lote ficam com a última linha
+        persons: Dict[str, Dict[str, Any]] = {}
+        items: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        totals = {"persons": 0, "items": 0, "rejected": 0}
+        errors: List[Dict[str, Any]] = []
+        pending: Set[asyncio.Task] = set()
+
+        try:
+            line_number = 0
+            async for line in self._iter_lines(body):
+                line_number += 1
+                if not line.strip():
+                    continue
+
+                try:
+                    record = ingest_record_adapter.validate_json(line)
+                except ValidationError as e:
+                    totals["rejected"] += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({"line": line_number, "detail": self._format_error(e)})
+                    continue
+
+                row = record.model_dump(mode="json", exclude={"type"})
+                row["event_id"] = event_id
+                if isinstance(record, PersonRecord):
+                    persons[row["person_id"]] = row
+                    if len(persons) >= self.batch_size:
+                        totals["persons"] += len(persons)
+                        await self._submit(pending, self.db.upsert_event_persons(list(persons.values())))
+                        persons = {}
+                else:
+                    items[(row["person_id"], row["product_type"])] = row
+                    if len(items) >= self.batch_size:
+                        totals["items"] += len(items)
+                        await self._submit(pending, self.db.upsert_person_items(list(items.values())))
+                        items = {}
+
+            if persons:
+                totals["persons"] += len(persons)
+                await self._submit(pending, self.db.upsert_event_persons(list(persons.values())))
+            if items:
+                totals["items"] += len(items)
+                await self._submit(pending, self.db.upsert_person_items(list(items.values())))
+            await self._drain(pending)
+
+            # Contadores, status completed e resumos: uma transação no banco; se falhar,
+            # nada é aplicado e o evento fica failed como nas falhas de gravação
+            refreshed = await self.db.finish_event_ingestion(event_id)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            try:
+                await self.db.update_event_status(event_id, "failed")
+            except Exception as e:
+                print(f"Erro ao marcar ingestão do evento {event_id} como falha: {e}")
+            raise
+
+        return IngestResponse(
+            event_id=event_id,
+            status="completed",
+            persons=totals["persons"],
+            items=totals["items"],
+            rejected=totals["rejected"],
+            errors=errors,
+            summaries_refreshed=refreshed,
+            elapsed_ms=int((time.perf_counter() - started) * 1000)
+        )
+
+    async def _submit(self, pending: Set[asyncio.Task], write: Awaitable[None]) -> None:
+        """Dispara a gravação de um lote, esperando uma vaga se houver `concurrency` em voo"""
+        while len(pending) >= self.concurrency:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            for task in done:
+                task.result()  # propaga a falha do lote
+        pending.add(asyncio.ensure_future(write))
+
+    @staticmethod
+    async def _drain(pending: Set[asyncio.Task]) -> None:
+        """Espera todos os lotes em voo (propaga a primeira falha)"""
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            pending.difference_update(done)
+            for task in done:
+                task.result()
+
+    @staticmethod
+    async def _iter_lines(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Quebra os chunks do corpo em linhas (uma linha pode vir dividida entre chunks)"""
+        buffer = b""
+        async for chunk in body:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def _format_error(error: ValidationError) -> str:
+        """Resumo legível dos erros de validação de uma linha"""
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'linha'}: {err['msg']}"
+            for err in error.errors()
+        )
@@ -0,0 +1,71 @@
+"""
+Carregador de dados por relatório
+Busca e memoriza pessoas, itens e resumos por evento durante a geração de um relatório
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List
+from app.services.database import AsyncDatabaseService
+
+
+Rows = List[Dict[str, Any]]
+
+
+class ReportDataLoader:
+    """
+    Data loader com escopo de um relatório
+
+    Cada tabela é buscada em lote (por blocos de event_ids) e indexada por evento,
+    então agregações diferentes sobre os mesmos eventos compartilham os dados
+    em vez de repetir as consultas.
+    """
+
+    # Colunas necessárias para as agregações (evita trafegar colunas não usadas)
+    PERSON_COLUMNS = "event_id, person_id, gender, age"
+    ITEM_COLUMNS = "event_id, person_id, brand, product_type"
+
+    def __init__(self, db_service: AsyncDatabaseService):
+        self.db = db_service
+        self._persons: Dict[str, Rows] = {}
+        self._items: Dict[str, Rows] = {}
+        self._brand_summaries: Dict[str, Rows] = {}
+        self._product_summaries: Dict[str, Rows] = {}
+
+    async def get_persons(self, event_ids: List[str]) -> Dict[str, Rows]:
+        """Pessoas por evento"""
+        return await self._load(
+            self._persons, event_ids,
+            lambda ids: self.db.get_persons_by_events(ids, columns=self.PERSON_COLUMNS)
+        )
+
+    async def get_items(self, event_ids: List[str]) -> Dict[str, Rows]:
+        """Itens detectados por evento"""
+        return await self._load(
+            self._items, event_ids,
+            lambda ids: self.db.get_items_by_events(ids, columns=self.ITEM_COLUMNS)
+        )
+
+    async def get_brand_summaries(self, event_ids: List[str]) -> Dict[str, Rows]:
+        """Linhas de brand_event_summary por evento"""
+        return await self._load(self._brand_summaries, event_ids, self.db.get_brand_summaries)
+
+    async def get_product_summaries(self, event_ids: List[str]) -> Dict[str, Rows]:
+        """Linhas de product_event_summary por evento"""
+        return await self._load(self._product_summaries, event_ids, self.db.get_product_summaries)
+
+    @staticmethod
+    async def _load(
+        cache: Dict[str, Rows],
+        event_ids: List[str],
+        fetch: Callable[[List[str]], Awaitable[Rows]]
+    ) -> Dict[str, Rows]:
+        """Busca apenas os eventos ainda não carregados e devolve as linhas agrupadas por evento"""
+        missing = [event_id for event_id in dict.fromkeys(event_ids) if event_id not in cache]
+
+        if missing:
+            rows = await fetch(missing)
+            for event_id in missing:
+                cache[event_id] = []
+            for row in rows:
+                cache.setdefault(row["event_id"], []).append(row)
+
+        return {event_id: cache[event_id] for event_id in event_ids}
@@ -0,0 +1,32 @@
+"""
+Cursores de paginação (keyset)
+Codifica a posição (event_date, id) do último item de uma página em um token opaco
+"""
+
+import base64
+import json
+from datetime import date
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(event_date: str, event_id: str) -> str:
+    """Token opaco (base64 url-safe) para a posição após o evento informado"""
+    raw = json.dumps([event_date, event_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Retorna (event_date, id) a partir do token
+    Levanta ValueError se o token não foi gerado por encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        event_date, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Valida os tipos antes de usá-los em filtros do banco
+        date.fromisoformat(event_date)
+        UUID(event_id)
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+    return event_date, event_id
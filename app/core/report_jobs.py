@@ -0,0 +1,141 @@
+"""
+Fila de jobs de geração de relatórios
+Executa o pipeline do ReportsService em segundo plano, com um número fixo de workers
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from app.core.reports import ReportsService
+from app.schemas.reports import GenerateReportRequest, GenerateReportResponse
+
+
+class QueueFullError(Exception):
+    """A fila de jobs atingiu o limite configurado"""
+
+
+@dataclass
+class ReportJob:
+    """Estado de um job de relatório"""
+    id: str
+    request: GenerateReportRequest
+    status: str = "queued"  # queued | running | done | failed
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[GenerateReportResponse] = None
+    error: Optional[str] = None
+    # Relógio monotônico do fim do job, usado para expirar jobs antigos
+    finished_monotonic: Optional[float] = None
+
+
+class ReportJobQueue:
+    """
+    Fila em memória (asyncio.Queue) consumida por `workers` tarefas concorrentes
+
+    O estado dos jobs fica em memória no processo: jobs finalizados são mantidos por
+    `retention_seconds` para consulta e depois descartados. A fila aceita no máximo
+    `max_pending` jobs aguardando execução.
+    """
+
+    def __init__(
+        self,
+        service_factory: Callable[[], ReportsService],
+        workers: int = 2,
+        max_pending: int = 100,
+        retention_seconds: float = 3600
+    ):
+        self.service_factory = service_factory
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_pending)
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Inicia os workers (chamado no startup da aplicação)"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"report-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancela os workers (chamado no shutdown da aplicação)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: GenerateReportRequest) -> ReportJob:
+        """
+        Enfileira um pedido de relatório e retorna o job sem esperar a geração
+
+        Os filtros são validados antes de enfileirar, como em /reports/generate
+        (ValueError se inválidos), para que o erro chegue a quem pediu e não
+        apareça só depois como um job `failed`.
+        """
+        self.service_factory().parse_filters(request)
+        self._prune()
+        job = ReportJob(id=str(uuid.uuid4()), request=request)
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            raise QueueFullError("Fila de relatórios cheia. Tente novamente em instantes")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        """Retorna o job (ou None se não existir ou já tiver expirado)"""
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Posição de um job ainda na fila (0 = próximo a executar)"""
+        queued = [job.id for job in self._jobs.values() if job.status == "queued"]
+        return queued.index(job_id) if job_id in queued else None
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ReportJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = await self.service_factory().generate_report(job.request)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Job cancelado no encerramento da aplicação"
+            raise
+        except Exception as e:
+            print(f"Erro no job de relatório {job.id}: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            job.finished_monotonic = time.monotonic()
+
+    def _prune(self) -> None:
+        """Remove jobs finalizados há mais de retention_seconds"""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_monotonic is not None
+            and now - job.finished_monotonic > self.retention_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
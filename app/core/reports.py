@@ -3,23 +3,36 @@ Lógica de negócio para geração de relatórios com LLM
 Orquestra coleta de dados, construção de prompts e geração de texto
 """
 
+import asyncio
 import os
+import time
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Union
 from datetime import datetime
 import yaml
 
-from app.services.database import DatabaseService
+from app.services.database import AsyncDatabaseService
 from app.services.openai_service import OpenAIService
+from app.services.report_cache import ReportCache
+from app.services.analytics_snapshot import AnalyticsSnapshotStore
+from app.services.metrics import (
+    OPENAI_ESTIMATED_COMPLETION_TOKENS, OPENAI_REQUEST_DURATION, OPENAI_TOKENS, record_cache_lookup
+)
+from app.services.tracing import record_call
+from app.core.loaders import ReportDataLoader
 from app.schemas.reports import (
     MarketShareFilters,
     AudienceSegmentationFilters,
     EventMetricsFilters,
+    GenerateReportRequest,
     GenerateReportResponse,
     ReportMetadata,
 )
 
 
+ReportFilters = Union[MarketShareFilters, AudienceSegmentationFilters, EventMetricsFilters]
+
+
 # =============================================================================
 # CARREGADOR DE PROMPTS
 # =============================================================================
@@ -73,118 +86,217 @@ prompt_loader = PromptLoader()
 class ReportsService:
     """Serviço de geração de relatórios com LLM"""
     
-    def __init__(self, db_service: DatabaseService, openai_service: OpenAIService):
+    # Temperatura usada em todas as gerações (faz parte da chave do cache de relatórios)
+    TEMPERATURE = 0.7
+    
+    def __init__(
+        self,
+        db_service: AsyncDatabaseService,
+        openai_service: OpenAIService,
+        report_cache: Optional[ReportCache] = None,
+        snapshots: Optional[AnalyticsSnapshotStore] = None
+    ):
         self.db = db_service
         self.llm = openai_service
         self.prompts = prompt_loader
+        self.report_cache = report_cache
+        self.snapshots = snapshots
     
     # =========================================================================
     # MÉTODOS PÚBLICOS - Geração de Relatórios
     # =========================================================================
     
-    def generate_market_share_report(self, filters: MarketShareFilters) -> GenerateReportResponse:
+    async def generate_report(self, request: GenerateReportRequest) -> GenerateReportResponse:
+        """Gera o relatório do tipo pedido, validando os filtros específicos do tipo"""
+        filters = self.parse_filters(request)
+        
+        if isinstance(filters, MarketShareFilters):
+            return await self.generate_market_share_report(filters)
+        if isinstance(filters, AudienceSegmentationFilters):
+            return await self.generate_audience_segmentation_report(filters)
+        return await self.generate_event_metrics_report(filters)
+    
+    async def generate_market_share_report(self, filters: MarketShareFilters) -> GenerateReportResponse:
         """Gera relatório de Market Share"""
-        # 1. Coletar dados do banco
-        data = self._collect_market_share_data(filters)
-        
-        # 2. Construir prompts
-        system_prompt = self.prompts.get_system_prompt("market_share")
-        user_prompt = self._build_market_share_user_prompt(data, filters)
-        
-        # 3. Gerar texto com LLM
-        llm_response = self.llm.generate_completion(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.7
-        )
-        
-        # 4. Montar resposta
-        return GenerateReportResponse(
-            type="market_share",
-            generated_at=datetime.utcnow(),
-            filters_applied=filters.model_dump(exclude_none=True),
-            title=self._generate_market_share_title(filters),
-            content=llm_response["content"],
-            metadata=ReportMetadata(
-                total_events=data["total_events"],
-                total_athletes=data["total_athletes"],
-                total_items=data["total_items"],
-                tokens_used=llm_response["tokens_used"],
-                model=llm_response["model"],
-                generation_time_ms=llm_response["generation_time_ms"]
-            )
+        prepared = await self._prepare_market_share(filters)
+        llm_response = await self._generate_completion(
+            prepared["system_prompt"], prepared["user_prompt"], prepared["type"]
         )
+        return self._build_response(prepared, llm_response)
     
-    def generate_audience_segmentation_report(
+    async def generate_audience_segmentation_report(
         self, filters: AudienceSegmentationFilters
     ) -> GenerateReportResponse:
         """Gera relatório de Segmentação de Público"""
-        # 1. Coletar dados do banco
-        data = self._collect_audience_data(filters)
-        
-        # 2. Construir prompts
-        system_prompt = self.prompts.get_system_prompt("audience_segmentation")
-        user_prompt = self._build_audience_user_prompt(data, filters)
-        
-        # 3. Gerar texto com LLM
-        llm_response = self.llm.generate_completion(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.7
-        )
-        
-        # 4. Montar resposta
-        return GenerateReportResponse(
-            type="audience_segmentation",
-            generated_at=datetime.utcnow(),
-            filters_applied=filters.model_dump(exclude_none=True),
-            title=self._generate_audience_title(filters),
-            content=llm_response["content"],
-            metadata=ReportMetadata(
-                total_events=data["total_events"],
-                total_athletes=data["total_athletes"],
-                total_items=data["total_items"],
-                tokens_used=llm_response["tokens_used"],
-                model=llm_response["model"],
-                generation_time_ms=llm_response["generation_time_ms"]
-            )
+        prepared = await self._prepare_audience(filters)
+        llm_response = await self._generate_completion(
+            prepared["system_prompt"], prepared["user_prompt"], prepared["type"]
         )
+        return self._build_response(prepared, llm_response)
     
-    def generate_event_metrics_report(
+    async def generate_event_metrics_report(
         self, filters: EventMetricsFilters
     ) -> GenerateReportResponse:
         """Gera relatório de Métricas do Evento"""
-        # 1. Coletar dados do banco
-        data = self._collect_event_data(filters)
-        
-        if not data:
-            raise ValueError(f"Evento {filters.event_id} não encontrado")
+        prepared = await self._prepare_event_metrics(filters)
+        llm_response = await self._generate_completion(
+            prepared["system_prompt"], prepared["user_prompt"], prepared["type"]
+        )
+        return self._build_response(prepared, llm_response)
+    
+    async def stream_report(self, filters: ReportFilters) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Gera o relatório em partes, como pares (evento, dados):
+        
+        - "meta": tipo, título, filtros e contagens de dados (antes da chamada à LLM)
+        - "delta": trecho do conteúdo gerado
+        - "done": tokens, modelo, tempo de geração e flag de cache
+        
+        Usa o cache de relatórios quando configurado (o conteúdo chega em um único delta).
+        """
+        prepared = await self._prepare(filters)
+        yield "meta", {
+            "type": prepared["type"],
+            "generated_at": datetime.utcnow(),
+            "filters_applied": prepared["filters_applied"],
+            "title": prepared["title"],
+            "total_events": prepared["total_events"],
+            "total_athletes": prepared["total_athletes"],
+            "total_items": prepared["total_items"],
+        }
         
-        # 2. Construir prompts
-        system_prompt = self.prompts.get_system_prompt("event_metrics")
-        user_prompt = self._build_event_user_prompt(data, filters)
+        system_prompt, user_prompt = prepared["system_prompt"], prepared["user_prompt"]
+        start_time = time.time()
+        
+        stored = await self._get_cached_completion(system_prompt, user_prompt)
+        if stored is not None:
+            yield "delta", {"content": stored["content"]}
+            yield "done", {
+                "tokens_used": 0,
+                "model": stored["model"],
+                "generation_time_ms": int((time.time() - start_time) * 1000),
+                "cached": True,
+            }
+            return
         
-        # 3. Gerar texto com LLM
-        llm_response = self.llm.generate_completion(
+        parts: List[str] = []
+        async for delta in self.llm.stream_completion(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
-            temperature=0.7
+            temperature=self.TEMPERATURE
+        ):
+            parts.append(delta)
+            yield "delta", {"content": delta}
+        
+        # A API de streaming não informa o uso: a estimativa (~1 token por chunk, só a resposta)
+        # vai para um contador próprio e não é gravada no cache como consumo real
+        estimated_tokens = len(parts)
+        response = {
+            "content": "".join(parts),
+            "model": self.llm.model,
+            "generation_time_ms": int((time.time() - start_time) * 1000),
+        }
+        self._record_llm_metrics(
+            prepared["type"], "stream", time.time() - start_time, estimated_tokens, estimated=True
         )
+        await self._store_completion(system_prompt, user_prompt, response)
+        yield "done", {
+            "tokens_used": estimated_tokens,
+            "tokens_estimated": True,
+            "model": response["model"],
+            "generation_time_ms": response["generation_time_ms"],
+            "cached": False,
+        }
+    
+    def parse_filters(self, request: GenerateReportRequest) -> ReportFilters:
+        """Valida os filtros do pedido conforme o tipo de relatório (ValueError se inválidos)"""
+        if request.type == "market_share":
+            return MarketShareFilters(**request.filters)
+        if request.type == "audience_segmentation":
+            return AudienceSegmentationFilters(**request.filters)
+        if request.type == "event_metrics":
+            return EventMetricsFilters(**request.filters)
+        
+        raise ValueError(
+            f"Tipo de relatório inválido: {request.type}. "
+            f"Tipos válidos: market_share, audience_segmentation, event_metrics"
+        )
+    
+    # =========================================================================
+    # PREPARAÇÃO (dados + prompts, tudo o que antecede a chamada à LLM)
+    # =========================================================================
+    
+    async def _prepare(self, filters: ReportFilters) -> Dict[str, Any]:
+        """Despacha para a preparação do tipo de relatório correspondente aos filtros"""
+        if isinstance(filters, MarketShareFilters):
+            return await self._prepare_market_share(filters)
+        if isinstance(filters, AudienceSegmentationFilters):
+            return await self._prepare_audience(filters)
+        return await self._prepare_event_metrics(filters)
+    
+    async def _prepare_market_share(self, filters: MarketShareFilters) -> Dict[str, Any]:
+        """Coleta dados e monta os prompts do relatório de Market Share"""
+        data = await self._collect_market_share_data(filters)
+        return {
+            "type": "market_share",
+            "title": self._generate_market_share_title(filters),
+            "filters_applied": filters.model_dump(exclude_none=True),
+            "system_prompt": self.prompts.get_system_prompt("market_share"),
+            "user_prompt": self._build_market_share_user_prompt(data, filters),
+            "total_events": data["total_events"],
+            "total_athletes": data["total_athletes"],
+            "total_items": data["total_items"],
+        }
+    
+    async def _prepare_audience(self, filters: AudienceSegmentationFilters) -> Dict[str, Any]:
+        """Coleta dados e monta os prompts do relatório de Segmentação de Público"""
+        data = await self._collect_audience_data(filters)
+        return {
+            "type": "audience_segmentation",
+            "title": self._generate_audience_title(filters),
+            "filters_applied": filters.model_dump(exclude_none=True),
+            "system_prompt": self.prompts.get_system_prompt("audience_segmentation"),
+            "user_prompt": self._build_audience_user_prompt(data, filters),
+            "total_events": data["total_events"],
+            "total_athletes": data["total_athletes"],
+            "total_items": data["total_items"],
+        }
+    
+    async def _prepare_event_metrics(self, filters: EventMetricsFilters) -> Dict[str, Any]:
+        """Coleta dados e monta os prompts do relatório de Métricas do Evento"""
+        data = await self._collect_event_data(filters)
+        
+        if not data:
+            raise ValueError(f"Evento {filters.event_id} não encontrado")
         
-        # 4. Montar resposta
+        return {
+            "type": "event_metrics",
+            "title": f"Métricas do Evento - {data['event_name']}",
+            "filters_applied": filters.model_dump(exclude_none=True),
+            "system_prompt": self.prompts.get_system_prompt("event_metrics"),
+            "user_prompt": self._build_event_user_prompt(data, filters),
+            "total_events": 1,
+            "total_athletes": data["total_athletes"],
+            "total_items": data["total_items"],
+        }
+    
+    @staticmethod
+    def _build_response(prepared: Dict[str, Any], llm_response: Dict[str, Any]) -> GenerateReportResponse:
+        """Monta a resposta a partir da preparação e do retorno da LLM"""
         return GenerateReportResponse(
-            type="event_metrics",
+            type=prepared["type"],
             generated_at=datetime.utcnow(),
-            filters_applied=filters.model_dump(exclude_none=True),
-            title=f"Métricas do Evento - {data['event_name']}",
+            filters_applied=prepared["filters_applied"],
+            title=prepared["title"],
             content=llm_response["content"],
             metadata=ReportMetadata(
-                total_events=1,
-                total_athletes=data["total_athletes"],
-                total_items=data["total_items"],
+                total_events=prepared["total_events"],
+                total_athletes=prepared["total_athletes"],
+                total_items=prepared["total_items"],
                 tokens_used=llm_response["tokens_used"],
                 model=llm_response["model"],
-                generation_time_ms=llm_response["generation_time_ms"]
+                generation_time_ms=llm_response["generation_time_ms"],
+                cached=llm_response.get("cached", False)
             )
         )
     
@@ -192,13 +304,12 @@ class ReportsService:
     # COLETA DE DADOS
     # =========================================================================
     
-    def _collect_market_share_data(self, filters: MarketShareFilters) -> Dict[str, Any]:
+    async def _collect_market_share_data(self, filters: MarketShareFilters) -> Dict[str, Any]:
         """Coleta dados do banco para relatório de Market Share"""
         date_from = filters.date_from.isoformat()
         date_to = filters.date_to.isoformat()
         
-        events = self.db.get_events(
-            limit=1000, offset=0,
+        events = await self.db.get_all_events(
             sport=filters.sport,
             location=filters.location,
             date_from=date_from,
@@ -215,8 +326,11 @@ class ReportsService:
             }
         
         event_ids = [e["id"] for e in events]
-        brand_data = self._aggregate_brands_for_events(event_ids, filters.product_type, filters.brands)
-        product_data = self._aggregate_products_for_events(event_ids)
+        loader = ReportDataLoader(self.db)
+        brand_data, product_data = await asyncio.gather(
+            self._aggregate_brands_for_events(loader, event_ids, filters.product_type, filters.brands),
+            self._aggregate_products_for_events(loader, event_ids)
+        )
         
         total_athletes = sum(e.get("total_athletes_estimated", 0) or 0 for e in events)
         total_items = sum(b["items"] for b in brand_data)
@@ -229,13 +343,12 @@ class ReportsService:
             "product_distribution": product_data
         }
     
-    def _collect_audience_data(self, filters: AudienceSegmentationFilters) -> Dict[str, Any]:
+    async def _collect_audience_data(self, filters: AudienceSegmentationFilters) -> Dict[str, Any]:
         """Coleta dados do banco para relatório de Segmentação de Público"""
         date_from = filters.date_from.isoformat()
         date_to = filters.date_to.isoformat()
         
-        events = self.db.get_events(
-            limit=1000, offset=0,
+        events = await self.db.get_all_events(
             sport=filters.sport,
             location=filters.location,
             date_from=date_from,
@@ -254,31 +367,36 @@ class ReportsService:
             }
         
         event_ids = [e["id"] for e in events]
-        demographic_data = self._aggregate_demographics_for_events(event_ids)
-        brand_by_segment = self._aggregate_brands_by_segment(event_ids, filters.product_type)
+        loader = ReportDataLoader(self.db)
+        audience_data, brand_data = await asyncio.gather(
+            self._aggregate_audience_for_events(loader, event_ids, filters.product_type),
+            self._aggregate_brands_for_events(loader, event_ids, filters.product_type, None)
+        )
         
         total_athletes = sum(e.get("total_athletes_estimated", 0) or 0 for e in events)
-        brand_data = self._aggregate_brands_for_events(event_ids, filters.product_type, None)
         total_items = sum(b["items"] for b in brand_data)
         
         return {
             "total_events": len(events),
             "total_athletes": total_athletes,
             "total_items": total_items,
-            **demographic_data,
-            "brand_by_segment": brand_by_segment
+            **audience_data
         }
     
-    def _collect_event_data(self, filters: EventMetricsFilters) -> Optional[Dict[str, Any]]:
+    async def _collect_event_data(self, filters: EventMetricsFilters) -> Optional[Dict[str, Any]]:
         """Coleta dados do banco para relatório de Métricas do Evento"""
-        event = self.db.get_event_by_id(filters.event_id)
+        event = await self.db.get_event_by_id(filters.event_id)
         
         if not event:
             return None
         
-        brand_data = self._aggregate_brands_for_events([filters.event_id], None, None)
-        product_data = self._aggregate_products_for_events([filters.event_id])
-        demographic_data = self._aggregate_demographics_for_events([filters.event_id])
+        event_ids = [filters.event_id]
+        loader = ReportDataLoader(self.db)
+        brand_data, product_data, demographic_data = await asyncio.gather(
+            self._aggregate_brands_for_events(loader, event_ids, None, None),
+            self._aggregate_products_for_events(loader, event_ids),
+            self._aggregate_audience_for_events(loader, event_ids, with_segments=False)
+        )
         
         total_items = sum(b["items"] for b in brand_data)
         
@@ -301,16 +419,16 @@ class ReportsService:
     # AGREGAÇÃO DE DADOS
     # =========================================================================
     
-    def _aggregate_brands_for_events(
-        self, event_ids: List[str],
+    async def _aggregate_brands_for_events(
+        self, loader: ReportDataLoader, event_ids: List[str],
         product_type: Optional[str] = None,
         brands_filter: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """Agrega dados de marcas para múltiplos eventos"""
         brand_totals: Dict[str, Dict[str, int]] = {}
         
-        for event_id in event_ids:
-            brands = self.db.get_brand_summary(event_id)
+        summaries = await loader.get_brand_summaries(event_ids)
+        for brands in summaries.values():
             for b in brands:
                 brand_name = b["brand"]
                 if brands_filter and brand_name not in brands_filter:
@@ -335,12 +453,14 @@ class ReportsService:
         result.sort(key=lambda x: x["share_percent"], reverse=True)
         return result
     
-    def _aggregate_products_for_events(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+    async def _aggregate_products_for_events(
+        self, loader: ReportDataLoader, event_ids: List[str]
+    ) -> List[Dict[str, Any]]:
         """Agrega dados de produtos para múltiplos eventos"""
         product_totals: Dict[str, int] = {}
         
-        for event_id in event_ids:
-            products = self.db.get_product_summary(event_id)
+        summaries = await loader.get_product_summaries(event_ids)
+        for products in summaries.values():
             for p in products:
                 product_type = p["product_type"]
                 if product_type not in product_totals:
@@ -361,40 +481,31 @@ class ReportsService:
         result.sort(key=lambda x: x["percent"], reverse=True)
         return result
     
-    def _aggregate_demographics_for_events(self, event_ids: List[str]) -> Dict[str, Any]:
-        """Agrega dados demográficos para múltiplos eventos"""
-        male_count = 0
-        female_count = 0
-        ages: List[int] = []
-        age_ranges = {"18-25": 0, "26-35": 0, "36-45": 0, "46+": 0}
-        
-        for event_id in event_ids:
-            persons = self.db.get_persons_by_event(event_id, limit=10000)
-            for p in persons:
-                gender = p.get("gender", "")
-                age = p.get("age", 0)
-                
-                if gender == "M":
-                    male_count += 1
-                elif gender == "F":
-                    female_count += 1
-                
-                if age:
-                    ages.append(age)
-                    if age <= 25:
-                        age_ranges["18-25"] += 1
-                    elif age <= 35:
-                        age_ranges["26-35"] += 1
-                    elif age <= 45:
-                        age_ranges["36-45"] += 1
-                    else:
-                        age_ranges["46+"] += 1
-        
+    async def _aggregate_audience_for_events(
+        self, loader: ReportDataLoader, event_ids: List[str],
+        product_type: Optional[str] = None,
+        with_segments: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Agrega dados demográficos e (opcionalmente) preferência de marca por segmento
+        
+        Usa o snapshot analítico (agregação vetorizada) quando há um atualizado;
+        caso contrário, conta a partir das linhas do banco.
+        """
+        snapshot = await self.snapshots.get() if self.snapshots else None
+        if snapshot is not None:
+            counts = snapshot.person_counts(event_ids)
+            segments = snapshot.brand_counts_by_segment(event_ids, product_type) if with_segments else {}
+        else:
+            counts, segments = await self._count_audience(loader, event_ids, product_type, with_segments)
+        
+        male_count = counts["male"]
+        female_count = counts["female"]
         total = male_count + female_count
-        avg_age = sum(ages) / len(ages) if ages else 0
+        avg_age = counts["age_sum"] / counts["age_count"] if counts["age_count"] else 0
         
         age_distribution = []
-        for range_name, count in age_ranges.items():
+        for range_name, count in counts["age_ranges"].items():
             percent = (count / total * 100) if total > 0 else 0
             age_distribution.append({
                 "age_range": range_name,
@@ -402,7 +513,7 @@ class ReportsService:
                 "percent": round(percent, 1)
             })
         
-        return {
+        result = {
             "gender_distribution": {
                 "male": male_count,
                 "female": female_count,
@@ -412,12 +523,27 @@ class ReportsService:
             "age_distribution": age_distribution,
             "avg_age": round(avg_age, 1)
         }
+        
+        if with_segments:
+            result["brand_by_segment"] = self._format_brand_segments(segments)
+        
+        return result
     
-    def _aggregate_brands_by_segment(
-        self, event_ids: List[str],
-        product_type: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Agrega preferência de marca por segmento demográfico"""
+    async def _count_audience(
+        self, loader: ReportDataLoader, event_ids: List[str],
+        product_type: Optional[str], with_segments: bool
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, int]]]:
+        """
+        Contagens demográficas e itens por marca/segmento a partir das linhas do banco
+        
+        Percorre as pessoas de cada evento uma única vez: a mesma passada alimenta
+        as distribuições de gênero/idade e o mapa pessoa -> segmento usado pelos itens.
+        """
+        male_count = 0
+        female_count = 0
+        age_count = 0
+        age_sum = 0
+        age_ranges = {"18-25": 0, "26-35": 0, "36-45": 0, "46+": 0}
         segments: Dict[str, Dict[str, int]] = {
             "Homens 18-35": {},
             "Homens 36+": {},
@@ -425,13 +551,45 @@ class ReportsService:
             "Mulheres 36+": {}
         }
         
+        if with_segments:
+            persons_by_event, items_by_event = await asyncio.gather(
+                loader.get_persons(event_ids),
+                loader.get_items(event_ids)
+            )
+        else:
+            persons_by_event = await loader.get_persons(event_ids)
+            items_by_event = {}
+        
         for event_id in event_ids:
-            persons = self.db.get_persons_by_event(event_id, limit=10000)
-            items = self.db.get_items_by_event(event_id, limit=50000)
+            person_segments: Dict[str, str] = {}
             
-            person_map = {p["person_id"]: {"gender": p.get("gender", ""), "age": p.get("age", 0)} for p in persons}
+            for p in persons_by_event.get(event_id, []):
+                gender = p.get("gender", "")
+                age = p.get("age", 0)
+                
+                if gender == "M":
+                    male_count += 1
+                elif gender == "F":
+                    female_count += 1
+                
+                if age:
+                    age_count += 1
+                    age_sum += age
+                    if age <= 25:
+                        age_ranges["18-25"] += 1
+                    elif age <= 35:
+                        age_ranges["26-35"] += 1
+                    elif age <= 45:
+                        age_ranges["36-45"] += 1
+                    else:
+                        age_ranges["46+"] += 1
+                
+                if with_segments:
+                    segment = self._segment_for(gender, age or 0)
+                    if segment:
+                        person_segments[p["person_id"]] = segment
             
-            for item in items:
+            for item in items_by_event.get(event_id, []):
                 person_id = item.get("person_id")
                 brand = item.get("brand")
                 
@@ -440,21 +598,35 @@ class ReportsService:
                 if product_type and item.get("product_type") != product_type:
                     continue
                 
-                person = person_map.get(person_id, {})
-                gender = person.get("gender", "")
-                age = person.get("age", 0)
-                
-                if gender == "M":
-                    segment = "Homens 18-35" if age <= 35 else "Homens 36+"
-                elif gender == "F":
-                    segment = "Mulheres 18-35" if age <= 35 else "Mulheres 36+"
-                else:
+                segment = person_segments.get(person_id)
+                if not segment:
                     continue
                 
                 if brand not in segments[segment]:
                     segments[segment][brand] = 0
                 segments[segment][brand] += 1
         
+        counts = {
+            "male": male_count,
+            "female": female_count,
+            "age_count": age_count,
+            "age_sum": age_sum,
+            "age_ranges": age_ranges
+        }
+        return counts, segments
+    
+    @staticmethod
+    def _segment_for(gender: str, age: int) -> Optional[str]:
+        """Segmento demográfico de uma pessoa (None se gênero não for M/F)"""
+        if gender == "M":
+            return "Homens 18-35" if age <= 35 else "Homens 36+"
+        if gender == "F":
+            return "Mulheres 18-35" if age <= 35 else "Mulheres 36+"
+        return None
+    
+    @staticmethod
+    def _format_brand_segments(segments: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+        """Top 5 marcas por segmento, com share dentro do segmento"""
         result = []
         for segment, brands in segments.items():
             total = sum(brands.values())
@@ -604,6 +776,78 @@ class ReportsService:
     # HELPERS
     # =========================================================================
     
+    async def _generate_completion(
+        self, system_prompt: str, user_prompt: str, report_type: str
+    ) -> Dict[str, Any]:
+        """
+        Chama a LLM em uma thread para não bloquear o event loop
+        
+        Com cache de relatórios configurado, prompts idênticos reaproveitam o texto
+        já gerado: a resposta volta com cached=True e sem consumo de tokens.
+        """
+        start_time = time.time()
+        stored = await self._get_cached_completion(system_prompt, user_prompt)
+        if stored is not None:
+            return {
+                **stored,
+                "tokens_used": 0,
+                "generation_time_ms": int((time.time() - start_time) * 1000),
+                "cached": True
+            }
+        
+        response = await self._call_llm(system_prompt, user_prompt)
+        self._record_llm_metrics(report_type, "complete", time.time() - start_time, response["tokens_used"])
+        await self._store_completion(system_prompt, user_prompt, response)
+        return response
+    
+    async def _get_cached_completion(self, system_prompt: str, user_prompt: str) -> Optional[Dict[str, Any]]:
+        """Resposta armazenada para estes prompts (None se não houver ou sem cache)"""
+        if self.report_cache is None:
+            return None
+        key = ReportCache.make_key(system_prompt, user_prompt, self.llm.model, self.TEMPERATURE)
+        try:
+            stored = await asyncio.to_thread(self.report_cache.get, key)
+        except Exception as e:
+            print(f"Erro ao ler cache de relatórios: {e}")
+            stored = None
+        record_cache_lookup("report", stored is not None)
+        return stored
+    
+    async def _store_completion(self, system_prompt: str, user_prompt: str, response: Dict[str, Any]) -> None:
+        """Grava a resposta no cache de relatórios (se configurado)"""
+        if self.report_cache is None:
+            return
+        key = ReportCache.make_key(system_prompt, user_prompt, self.llm.model, self.TEMPERATURE)
+        try:
+            await asyncio.to_thread(self.report_cache.set, key, response)
+        except Exception as e:
+            print(f"Erro ao gravar cache de relatórios: {e}")
+    
+    @staticmethod
+    def _record_llm_metrics(report_type: str, mode: str, seconds: float, tokens: int,
+                            estimated: bool = False) -> None:
+        """
+        Latência e tokens de uma geração na OpenAI (não chamado em hits de cache)
+        
+        `estimated`: tokens contados por chunk no streaming (só a resposta, sem o prompt),
+        registrados em um contador separado do uso real informado pela API
+        """
+        OPENAI_REQUEST_DURATION.observe(seconds, report_type=report_type, mode=mode)
+        if estimated:
+            OPENAI_ESTIMATED_COMPLETION_TOKENS.inc(tokens or 0, report_type=report_type)
+        else:
+            OPENAI_TOKENS.inc(tokens or 0, report_type=report_type)
+        label = "estimated_tokens" if estimated else "tokens"
+        record_call("llm", f"openai:{report_type}", seconds * 1000, filters=f"mode={mode}, {label}={tokens}")
+    
+    async def _call_llm(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(
+            self.llm.generate_completion,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=self.TEMPERATURE
+        )
+    
     def _generate_market_share_title(self, filters: MarketShareFilters) -> str:
         """Gera título para relatório de Market Share"""
         parts = ["Relatório de Market Share"]
@@ -8,7 +8,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 
 # Importar rotas
-from app.api import events, reports
+from app.api import events, ingest, metrics, reports
+from app.api.deps import db_service, data_version_tracker, report_jobs
+from app.api.compression import CompressionMiddleware
+from app.api.etag import DataVersionETagMiddleware
+from app.api.metrics import MetricsMiddleware
+from app.api.tracing import QueryTraceMiddleware
 
 app = FastAPI(
     title=settings.API_TITLE,
@@ -17,6 +22,15 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# ETag / 304 nas leituras (registrado antes do CORS para que as respostas 304
+# também passem pelo CORSMiddleware, que fica por fora)
+if settings.ETAG_ENABLED:
+    app.add_middleware(
+        DataVersionETagMiddleware,
+        tracker=data_version_tracker,
+        path_prefixes=("/api/events", "/api/metrics", "/api/dashboard"),
+    )
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,8 +38,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Compressão das respostas (SSE dos relatórios não é comprimido)
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE)
+
+# Server-Timing e aviso de N+1 (por fora do ETag, para incluir a consulta da versão dos dados)
+if settings.QUERY_TRACE_ENABLED:
+    app.add_middleware(
+        QueryTraceMiddleware,
+        max_queries_per_table=settings.QUERY_TRACE_MAX_PER_TABLE,
+        log_summary=settings.QUERY_TRACE_LOG_SUMMARY,
+    )
+
+# Latência por rota (o mais externo: mede também os demais middlewares)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.on_event("startup")
+async def startup():
+    """Inicia os workers da fila de relatórios"""
+    report_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Para os workers e fecha o pool de conexões do banco ao encerrar a aplicação"""
+    await report_jobs.stop()
+    await db_service.close()
+
 
 @app.get("/")
 async def root():
@@ -46,6 +90,9 @@ async def health():
 # Registrar rotas
 app.include_router(events.router, prefix="/api", tags=["events"])
 app.include_router(reports.router, prefix="/api", tags=["reports"])
+app.include_router(ingest.router, prefix="/api", tags=["ingest"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 
 if __name__ == "__main__":
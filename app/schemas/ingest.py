@@ -0,0 +1,64 @@
+"""
+Schemas Pydantic para ingestão de resultados de detecção
+Cada linha do corpo NDJSON é uma pessoa ou um item, validados contra as constraints do banco
+"""
+
+from typing import Annotated, List, Literal, Optional, Union
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.schemas.reports import BrandName, ProductType
+
+
+# =============================================================================
+# REGISTROS (uma linha NDJSON cada)
+# =============================================================================
+
+class PersonRecord(BaseModel):
+    """Pessoa identificada no evento (event_persons)"""
+    type: Literal["person"]
+    person_id: UUID = Field(..., description="ID único da pessoa")
+    cpf: str = Field(..., pattern=r"^\d{11}$", description="CPF (11 dígitos)")
+    age: int = Field(..., ge=0, le=120, description="Idade")
+    gender: Literal["M", "F", "Outro"] = Field(..., description="Gênero")
+    photo_count: int = Field(0, ge=0, description="Em quantas fotos a pessoa aparece")
+    first_seen: Optional[datetime] = Field(None, description="Primeira aparição no evento")
+    last_seen: Optional[datetime] = Field(None, description="Última aparição no evento")
+
+
+class ItemRecord(BaseModel):
+    """Item detectado em uma pessoa (person_items)"""
+    type: Literal["item"]
+    person_id: UUID = Field(..., description="Pessoa que usa o item")
+    product_type: ProductType = Field(..., description="Tipo de produto")
+    brand: BrandName = Field(..., description="Marca")
+    product_name: Optional[str] = Field(None, max_length=200, description="Produto específico (opcional)")
+
+
+IngestRecord = Annotated[Union[PersonRecord, ItemRecord], Field(discriminator="type")]
+
+# Validador de uma linha (JSON -> PersonRecord | ItemRecord)
+ingest_record_adapter = TypeAdapter(IngestRecord)
+
+
+# =============================================================================
+# RESPONSE SCHEMAS
+# =============================================================================
+
+class IngestLineError(BaseModel):
+    """Linha rejeitada na validação"""
+    line: int = Field(..., description="Número da linha no corpo (a partir de 1)")
+    detail: str = Field(..., description="Motivo da rejeição")
+
+
+class IngestResponse(BaseModel):
+    """Resultado da ingestão de um evento"""
+    event_id: str = Field(..., description="ID do evento")
+    status: str = Field(..., description="Status final do evento")
+    persons: int = Field(..., description="Pessoas gravadas (upsert)")
+    items: int = Field(..., description="Itens gravados (upsert)")
+    rejected: int = Field(..., description="Linhas rejeitadas na validação")
+    errors: List[IngestLineError] = Field(default_factory=list, description="Primeiras linhas rejeitadas")
+    summaries_refreshed: int = Field(..., description="Eventos com resumos recalculados")
+    elapsed_ms: int = Field(..., description="Tempo total da ingestão em ms")
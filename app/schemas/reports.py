@@ -14,6 +14,7 @@ from datetime import date, datetime
 
 ReportType = Literal["market_share", "audience_segmentation", "event_metrics"]
 ReportFocus = Literal["general", "brands", "products", "audience"]
+ReportJobStatus = Literal["queued", "running", "done", "failed"]
 SportType = Literal["corrida", "triathlon", "ciclismo", "vôlei", "futebol"]
 ProductType = Literal["tênis", "camiseta", "short", "óculos", "boné"]
 BrandName = Literal["Nike", "Adidas", "Mizuno", "Track&Field", "Asics", "Olympikus"]
@@ -88,6 +89,7 @@ class ReportMetadata(BaseModel):
     tokens_used: int = Field(..., description="Tokens consumidos pela LLM")
     model: str = Field(..., description="Modelo LLM utilizado")
     generation_time_ms: int = Field(..., description="Tempo de geração em milissegundos")
+    cached: bool = Field(False, description="True se o texto veio do cache de relatórios (sem chamada à LLM)")
 
 
 class GenerateReportResponse(BaseModel):
@@ -123,6 +125,19 @@ class GenerateReportResponse(BaseModel):
         }
 
 
+class ReportJobResponse(BaseModel):
+    """Estado de um job de geração de relatório"""
+    job_id: str = Field(..., description="ID do job")
+    type: ReportType = Field(..., description="Tipo de relatório")
+    status: ReportJobStatus = Field(..., description="queued, running, done ou failed")
+    created_at: datetime = Field(..., description="Data/hora de criação do job")
+    started_at: Optional[datetime] = Field(None, description="Início da execução")
+    finished_at: Optional[datetime] = Field(None, description="Fim da execução")
+    queue_position: Optional[int] = Field(None, description="Posição na fila (apenas para jobs queued)")
+    result: Optional[GenerateReportResponse] = Field(None, description="Relatório gerado (status done)")
+    error: Optional[str] = Field(None, description="Mensagem de erro (status failed)")
+
+
 # =============================================================================
 # DATA SCHEMAS (para estruturar dados antes de enviar ao prompt)
 # =============================================================================
@@ -0,0 +1,316 @@
+"""
+Snapshot analítico colunar (NumPy)
+Pessoas e itens em colunas numéricas codificadas por dicionário, gravadas em arquivos
+.npy e abertos via mmap - todos os workers do uvicorn compartilham a mesma cópia
+(page cache do sistema operacional).
+
+Geração (fora do processo da API, ex: após atualizar as views):
+    python -m app.services.analytics_snapshot
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # dependência opcional: sem numpy o snapshot fica desabilitado
+    np = None
+
+from app.services.database import AsyncDatabaseService
+
+
+# Segmentos demográficos, na ordem dos códigos (gênero M/F x idade até 35 / 36+)
+SEGMENTS = ("Homens 18-35", "Homens 36+", "Mulheres 18-35", "Mulheres 36+")
+
+# Limites superiores das faixas etárias (as mesmas dos relatórios)
+AGE_RANGES = ("18-25", "26-35", "36-45", "46+")
+AGE_BOUNDS = (25, 35, 45)
+
+# Códigos de gênero (0 = outro)
+GENDER_CODES = {"M": 1, "F": 2}
+
+# Colunas gravadas em disco: nome -> dtype
+COLUMNS = {
+    "person_event": "int32",
+    "person_gender": "int8",
+    "person_age": "int16",
+    "person_segment": "int8",
+    "item_event": "int32",
+    "item_person": "int32",
+    "item_brand": "int16",
+    "item_product": "int16",
+}
+
+CURRENT_FILE = "CURRENT"
+KEEP_BUILDS = 2
+
+
+def numpy_available() -> bool:
+    """True se numpy está instalado"""
+    return np is not None
+
+
+class AnalyticsSnapshot:
+    """
+    Cópia colunar de event_persons e person_items para agregações vetorizadas
+
+    Eventos, marcas e tipos de produto viram códigos inteiros (índices nos
+    dicionários `event_ids`, `brands` e `product_types`). Cada item aponta para a
+    linha da pessoa correspondente (mesmo evento e person_id) em `item_person`
+    (-1 se a pessoa não existir).
+    """
+
+    def __init__(self, meta: Dict[str, Any], columns: Dict[str, Any]):
+        self.meta = meta
+        self.data_version: Optional[str] = meta.get("data_version")
+        self.event_ids: List[str] = meta["event_ids"]
+        self.brands: List[str] = meta["brands"]
+        self.product_types: List[str] = meta["product_types"]
+        self.columns = columns
+        self._event_codes = {event_id: code for code, event_id in enumerate(self.event_ids)}
+        self._product_codes = {name: code for code, name in enumerate(self.product_types)}
+
+    # =========================================================================
+    # AGREGAÇÕES
+    # =========================================================================
+
+    def person_counts(self, event_ids: List[str]) -> Dict[str, Any]:
+        """
+        Contagens demográficas das pessoas dos eventos informados
+
+        Retorna total de pessoas, homens, mulheres, soma e quantidade de idades
+        preenchidas e contagem por faixa etária.
+        """
+        mask = self._event_mask(event_ids, self.columns["person_event"])
+        genders = np.bincount(self.columns["person_gender"][mask], minlength=3)
+        ages = self.columns["person_age"][mask]
+        ages = ages[ages > 0]
+        ranges = np.bincount(np.searchsorted(AGE_BOUNDS, ages), minlength=len(AGE_RANGES))
+
+        return {
+            "total": int(mask.sum()),
+            "male": int(genders[GENDER_CODES["M"]]),
+            "female": int(genders[GENDER_CODES["F"]]),
+            "age_count": int(ages.size),
+            "age_sum": int(ages.sum(dtype=np.int64)),
+            "age_ranges": {name: int(count) for name, count in zip(AGE_RANGES, ranges)},
+        }
+
+    def brand_counts_by_segment(
+        self, event_ids: List[str], product_type: Optional[str] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """Itens por marca em cada segmento demográfico (segmento da pessoa dona do item)"""
+        mask = self._event_mask(event_ids, self.columns["item_event"])
+        if product_type is not None:
+            product_code = self._product_codes.get(product_type)
+            if product_code is None:
+                return {segment: {} for segment in SEGMENTS}
+            mask &= self.columns["item_product"] == product_code
+
+        persons = self.columns["item_person"][mask]
+        brands = self.columns["item_brand"][mask]
+        valid = persons >= 0
+        segments = self.columns["person_segment"][persons[valid]].astype(np.int64)
+        brands = brands[valid]
+        has_segment = segments >= 0
+
+        n_brands = len(self.brands)
+        counts = np.bincount(
+            segments[has_segment] * n_brands + brands[has_segment],
+            minlength=len(SEGMENTS) * n_brands
+        ).reshape(len(SEGMENTS), n_brands)
+
+        return {
+            segment: {
+                self.brands[code]: int(counts[index, code])
+                for code in np.flatnonzero(counts[index])
+            }
+            for index, segment in enumerate(SEGMENTS)
+        }
+
+    def _event_mask(self, event_ids: List[str], event_column: Any) -> Any:
+        """Máscara das linhas cujo evento está em event_ids (eventos desconhecidos são ignorados)"""
+        selected = np.zeros(len(self.event_ids), dtype=bool)
+        codes = [self._event_codes[e] for e in event_ids if e in self._event_codes]
+        selected[codes] = True
+        return selected[event_column]
+
+    # =========================================================================
+    # GERAÇÃO E PERSISTÊNCIA
+    # =========================================================================
+
+    @classmethod
+    async def build(cls, db: AsyncDatabaseService) -> "AnalyticsSnapshot":
+        """
+        Lê event_persons e person_items (paginado) e monta as colunas
+
+        A versão dos dados é lida antes das tabelas: se os dados mudarem durante a
+        leitura, o snapshot já nasce marcado como desatualizado.
+        """
+        data_version = await db.get_data_version()
+        events: Dict[str, int] = {}
+        brands: Dict[str, int] = {}
+        products: Dict[str, int] = {}
+        person_rows: Dict[tuple, int] = {}
+        data: Dict[str, List[int]] = {name: [] for name in COLUMNS}
+
+        async for row in db.iter_rows("event_persons", "id, event_id, person_id, gender, age"):
+            event_code = events.setdefault(row["event_id"], len(events))
+            gender = GENDER_CODES.get(row.get("gender"), 0)
+            age = row.get("age") or 0
+            segment = -1 if gender == 0 else (gender - 1) * 2 + (1 if age > 35 else 0)
+
+            person_rows[(row["event_id"], row["person_id"])] = len(data["person_event"])
+            data["person_event"].append(event_code)
+            data["person_gender"].append(gender)
+            data["person_age"].append(age)
+            data["person_segment"].append(segment)
+
+        async for row in db.iter_rows("person_items", "id, event_id, person_id, brand, product_type"):
+            data["item_event"].append(events.setdefault(row["event_id"], len(events)))
+            data["item_person"].append(person_rows.get((row["event_id"], row["person_id"]), -1))
+            data["item_brand"].append(brands.setdefault(row["brand"], len(brands)))
+            data["item_product"].append(products.setdefault(row["product_type"], len(products)))
+
+        meta = {
+            "data_version": data_version,
+            "built_at": time.time(),
+            "event_ids": list(events),
+            "brands": list(brands),
+            "product_types": list(products),
+            "persons": len(data["person_event"]),
+            "items": len(data["item_event"]),
+        }
+        columns = {name: np.asarray(values, dtype=COLUMNS[name]) for name, values in data.items()}
+        return cls(meta, columns)
+
+    def save(self, path: str) -> Path:
+        """
+        Grava o snapshot em um novo diretório e o publica no arquivo CURRENT
+
+        A troca é atômica (os.replace): workers que já mapearam a versão anterior
+        continuam lendo-a até recarregar. Mantém apenas as KEEP_BUILDS mais recentes.
+        """
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        name = str(time.time_ns())
+        tmp_dir = root / f".tmp-{name}"
+        tmp_dir.mkdir()
+
+        for column, values in self.columns.items():
+            np.save(tmp_dir / f"{column}.npy", values)
+        (tmp_dir / "meta.json").write_text(json.dumps(self.meta, ensure_ascii=False), encoding="utf-8")
+        build_dir = root / name
+        os.replace(tmp_dir, build_dir)
+
+        current_tmp = root / f".{CURRENT_FILE}.tmp"
+        current_tmp.write_text(name, encoding="utf-8")
+        os.replace(current_tmp, root / CURRENT_FILE)
+
+        builds = sorted((p for p in root.iterdir() if p.is_dir() and p.name.isdigit()), key=lambda p: int(p.name))
+        for old in builds[:-KEEP_BUILDS]:
+            shutil.rmtree(old, ignore_errors=True)
+        return build_dir
+
+    @classmethod
+    def load(cls, build_dir: Path) -> "AnalyticsSnapshot":
+        """Abre um snapshot gravado, mapeando as colunas em memória (somente leitura)"""
+        meta = json.loads((build_dir / "meta.json").read_text(encoding="utf-8"))
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            file = build_dir / f"{name}.npy"
+            # mmap não aceita arquivos de dados vazios
+            empty = not meta["persons"] if name.startswith("person") else not meta["items"]
+            columns[name] = np.empty(0, dtype=dtype) if empty else np.load(file, mmap_mode="r")
+        return cls(meta, columns)
+
+
+class AnalyticsSnapshotStore:
+    """
+    Acesso ao snapshot publicado em `path`, com recarga automática
+
+    A cada acesso o arquivo CURRENT é verificado (um stat); se outro processo
+    publicou um snapshot novo, ele é mapeado. O snapshot só é usado se a versão
+    dos dados em que foi gerado for a atual (`version_provider`); se a versão
+    atual não puder ser obtida, o snapshot é usado como está.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        version_provider: Optional[Callable[[], Awaitable[Optional[str]]]] = None
+    ):
+        self.path = Path(path)
+        self.version_provider = version_provider
+        self._snapshot: Optional[AnalyticsSnapshot] = None
+        self._current_mtime: Optional[int] = None
+
+    async def get(self) -> Optional[AnalyticsSnapshot]:
+        """Snapshot atual, ou None se não houver um válido (use o banco)"""
+        snapshot = self._load_current()
+        if snapshot is None:
+            return None
+        if self.version_provider is not None:
+            version = await self.version_provider()
+            if version is not None and version != snapshot.data_version:
+                return None
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        """Informações do snapshot carregado"""
+        snapshot = self._load_current()
+        if snapshot is None:
+            return {"loaded": False, "path": str(self.path)}
+        return {
+            "loaded": True,
+            "path": str(self.path),
+            "data_version": snapshot.data_version,
+            "built_at": snapshot.meta.get("built_at"),
+            "events": len(snapshot.event_ids),
+            "persons": snapshot.meta.get("persons"),
+            "items": snapshot.meta.get("items"),
+        }
+
+    def _load_current(self) -> Optional[AnalyticsSnapshot]:
+        """Recarrega se CURRENT mudou desde a última leitura"""
+        current = self.path / CURRENT_FILE
+        try:
+            mtime = current.stat().st_mtime_ns
+            if mtime != self._current_mtime:
+                name = current.read_text(encoding="utf-8").strip()
+                self._snapshot = AnalyticsSnapshot.load(self.path / name)
+                self._current_mtime = mtime
+        except FileNotFoundError:
+            self._snapshot = None
+            self._current_mtime = None
+        except Exception as e:
+            print(f"Erro ao carregar snapshot analítico: {e}")
+        return self._snapshot
+
+
+async def _main() -> None:
+    from app.config import settings
+
+    db = AsyncDatabaseService()
+    try:
+        started = time.monotonic()
+        snapshot = await AnalyticsSnapshot.build(db)
+        build_dir = snapshot.save(settings.ANALYTICS_SNAPSHOT_PATH)
+        print(
+            f"Snapshot gravado em {build_dir}: {snapshot.meta['persons']} pessoas, "
+            f"{snapshot.meta['items']} itens, {len(snapshot.event_ids)} eventos "
+            f"({time.monotonic() - started:.1f}s)"
+        )
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    if np is None:
+        raise SystemExit("numpy não instalado: pip install numpy")
+    asyncio.run(_main())
@@ -0,0 +1,112 @@
+"""
+Cache em memória (TTL + LRU)
+Usado na frente das leituras do dashboard, cujos dados só mudam quando as views são atualizadas
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# Filtros que são conjuntos de valores separados por vírgula: a ordem não altera o resultado
+SET_VALUED_PARAMS = {"sport", "event_type", "location", "brand", "product_type", "gender", "age_bucket"}
+
+# Listas em que a ordem importa (ex: dims do cubo define a ordem das dimensões na resposta)
+ORDERED_LIST_PARAMS = {"dims"}
+
+# Filtros comparados com ILIKE no banco: a caixa não altera o resultado
+CASE_INSENSITIVE_PARAMS = {"location"}
+
+
+def make_cache_key(namespace: str, **params: Any) -> Tuple[Hashable, ...]:
+    """
+    Chave canônica para um conjunto de parâmetros
+
+    Filtros de conjunto (SET_VALUED_PARAMS) viram uma tupla ordenada e sem repetições,
+    então "corrida,triathlon" e "triathlon, corrida" geram a mesma chave. Listas em
+    ORDERED_LIST_PARAMS mantêm a ordem (só espaços e repetições são removidos); os
+    demais textos são usados como vieram. Valores vazios são equivalentes a None.
+    """
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, str):
+            if name in SET_VALUED_PARAMS or name in ORDERED_LIST_PARAMS:
+                values = [v.strip() for v in value.split(",") if v.strip()]
+                if name in CASE_INSENSITIVE_PARAMS:
+                    values = [v.lower() for v in values]
+                if name in SET_VALUED_PARAMS:
+                    value = tuple(sorted(set(values))) or None
+                else:
+                    value = tuple(dict.fromkeys(values)) or None
+            else:
+                value = value.strip() or None
+        items.append((name, value))
+    return (namespace, *items)
+
+
+class TTLCache:
+    """
+    Cache com tamanho máximo (despejo LRU) e tempo de vida por entrada
+
+    Thread-safe; mantém contadores de hit/miss para monitoramento.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 300):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Retorna (encontrado, valor); entradas expiradas contam como miss"""
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Armazena um valor, despejando as entradas menos usadas se necessário"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Remove todas as entradas (ou só as de um namespace); retorna quantas foram removidas"""
+        with self._lock:
+            if namespace is None:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+            keys = [k for k in self._data if isinstance(k, tuple) and k and k[0] == namespace]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores e ocupação do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
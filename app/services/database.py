@@ -1,15 +1,125 @@
 """
 Serviço de banco de dados (Supabase)
 Abstração sobre o cliente Supabase para facilitar uso e testes
+
+- DatabaseService: cliente síncrono (scripts e uso fora do event loop)
+- AsyncDatabaseService: cliente assíncrono usado pelas rotas da API
 """
 
-from typing import Optional, List, Dict, Any
+import asyncio
+from contextlib import aclosing
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Tuple
+from postgrest import AsyncPostgrestClient
+from postgrest.types import ReturnMethod
 from supabase import create_client, Client
 from app.config import settings
+from app.services.metrics import log_db_error, record_postgrest_response, track_db_call
+from app.services.tracing import trace_postgrest_request, trace_postgrest_response
+
+
+# Máximo de IDs por filtro in_() - UUIDs têm 36 caracteres, então 150 IDs
+# mantêm a URL da requisição bem abaixo do limite usual de ~8KB
+IN_FILTER_CHUNK_SIZE = 150
 
 
-class DatabaseService:
-    """Serviço de acesso ao banco de dados via Supabase"""
+class BaseDatabaseService:
+    """Lógica comum de construção de queries (independente de sync/async)"""
+    
+    def _apply_event_filters(self, query, sport: Optional[str], event_type: Optional[str], 
+                               location: Optional[str], date_from: Optional[str], date_to: Optional[str],
+                               date_column: str = "event_date"):
+        """Aplicar filtros comuns a queries de eventos
+        Suporta múltiplos valores separados por vírgula para sport, event_type e location
+        date_column permite aplicar o filtro de data em views com outra coluna de data (ex: month)
+        """
+        if sport:
+            sports = [s.strip() for s in sport.split(",")]
+            if len(sports) > 1:
+                query = query.in_("sport", sports)
+            else:
+                query = query.eq("sport", sports[0])
+        if event_type:
+            types = [t.strip() for t in event_type.split(",")]
+            if len(types) > 1:
+                query = query.in_("event_type", types)
+            else:
+                query = query.eq("event_type", types[0])
+        if location:
+            locations = [l.strip() for l in location.split(",")]
+            if len(locations) > 1:
+                # Para múltiplas localizações, usar OR com ilike
+                # O cliente postgrest (0.13) não expõe or_(), então o parâmetro é adicionado direto
+                location_filters = ",".join([f"event_location.ilike.%{loc}%" for loc in locations])
+                query.params = query.params.add("or", f"({location_filters})")
+            else:
+                query = query.ilike("event_location", f"%{locations[0]}%")
+        if date_from:
+            query = query.gte(date_column, date_from)
+        if date_to:
+            query = query.lte(date_column, date_to)
+        return query
+    
+    @staticmethod
+    def _chunk(values: List[str], size: int = IN_FILTER_CHUNK_SIZE) -> List[List[str]]:
+        """Divide uma lista de IDs em blocos para filtros in_()"""
+        return [values[i:i + size] for i in range(0, len(values), size)]
+    
+    @staticmethod
+    def _split_filter(value: Optional[str]) -> Optional[List[str]]:
+        """Converte um filtro separado por vírgula em lista (None se vazio)"""
+        if not value:
+            return None
+        values = [v.strip() for v in value.split(",") if v.strip()]
+        return values or None
+    
+    def _event_filter_params(self, sport: Optional[str], event_type: Optional[str],
+                             location: Optional[str], date_from: Optional[str],
+                             date_to: Optional[str]) -> Dict[str, Any]:
+        """Parâmetros de filtro de eventos no formato das funções RPC do banco
+        Mesma semântica de _apply_event_filters (location é busca parcial)
+        """
+        return {
+            "p_sports": self._split_filter(sport),
+            "p_event_types": self._split_filter(event_type),
+            "p_locations": self._split_filter(location),
+            "p_date_from": date_from,
+            "p_date_to": date_to,
+        }
+    
+    @staticmethod
+    def _dashboard_summary(data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Normaliza o retorno de get_dashboard_summary (zeros e listas vazias se ausente)"""
+        data = data or {}
+        metrics = data.get("metrics") or {}
+        return {
+            "metrics": {
+                "total_events": metrics.get("total_events", 0) or 0,
+                "total_photos_analyzed": metrics.get("total_photos_analyzed", 0) or 0,
+                "total_athletes_identified": metrics.get("total_athletes_identified", 0) or 0,
+                "total_brands_tracked": metrics.get("total_brands_tracked", 0) or 0,
+            },
+            "sport_distribution": data.get("sport_distribution") or [],
+            "brand_months": data.get("brand_months") or [],
+        }
+
+    def _cube_params(self, source: str, dims: List[str], sport: Optional[str], event_type: Optional[str],
+                     location: Optional[str], date_from: Optional[str], date_to: Optional[str],
+                     brand: Optional[str], product_type: Optional[str], gender: Optional[str],
+                     age_bucket: Optional[str]) -> Dict[str, Any]:
+        """Parâmetros da função query_analytics_cube"""
+        return {
+            "p_source": source,
+            "p_dims": list(dims),
+            **self._event_filter_params(sport, event_type, location, date_from, date_to),
+            "p_brands": self._split_filter(brand),
+            "p_product_types": self._split_filter(product_type),
+            "p_genders": self._split_filter(gender),
+            "p_age_buckets": self._split_filter(age_bucket),
+        }
+
+
+class DatabaseService(BaseDatabaseService):
+    """Serviço de acesso ao banco de dados via Supabase (síncrono)"""
     
     def __init__(self):
         self.client: Client = create_client(
@@ -91,6 +201,40 @@ class DatabaseService:
             print(f"Erro ao buscar resumo de produtos para evento {event_id}: {e}")
             return []
     
+    def get_brand_summaries(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Buscar resumo de marcas de vários eventos (uma requisição por bloco de IDs)"""
+        rows: List[Dict[str, Any]] = []
+        try:
+            for chunk in self._chunk(event_ids):
+                response = (
+                    self.client.table("brand_event_summary")
+                    .select("*")
+                    .in_("event_id", chunk)
+                    .execute()
+                )
+                rows.extend(response.data or [])
+            return rows
+        except Exception as e:
+            print(f"Erro ao buscar resumo de marcas para {len(event_ids)} eventos: {e}")
+            return []
+    
+    def get_product_summaries(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Buscar resumo de produtos de vários eventos (uma requisição por bloco de IDs)"""
+        rows: List[Dict[str, Any]] = []
+        try:
+            for chunk in self._chunk(event_ids):
+                response = (
+                    self.client.table("product_event_summary")
+                    .select("*")
+                    .in_("event_id", chunk)
+                    .execute()
+                )
+                rows.extend(response.data or [])
+            return rows
+        except Exception as e:
+            print(f"Erro ao buscar resumo de produtos para {len(event_ids)} eventos: {e}")
+            return []
+    
     def get_persons_by_event(self, event_id: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Buscar pessoas de um evento"""
         try:
@@ -121,38 +265,6 @@ class DatabaseService:
             print(f"Erro ao buscar itens do evento {event_id}: {e}")
             return []
     
-    def _apply_event_filters(self, query, sport: Optional[str], event_type: Optional[str], 
-                               location: Optional[str], date_from: Optional[str], date_to: Optional[str]):
-        """Aplicar filtros comuns a queries de eventos
-        Suporta múltiplos valores separados por vírgula para sport, event_type e location
-        """
-        if sport:
-            sports = [s.strip() for s in sport.split(",")]
-            if len(sports) > 1:
-                query = query.in_("sport", sports)
-            else:
-                query = query.eq("sport", sports[0])
-        if event_type:
-            types = [t.strip() for t in event_type.split(",")]
-            if len(types) > 1:
-                query = query.in_("event_type", types)
-            else:
-                query = query.eq("event_type", types[0])
-        if location:
-            locations = [l.strip() for l in location.split(",")]
-            if len(locations) > 1:
-                # Para múltiplas localizações, usar OR com ilike
-                # Supabase não suporta múltiplos ilike diretamente, então usamos or_
-                location_filters = ",".join([f"event_location.ilike.%{loc}%" for loc in locations])
-                query = query.or_(location_filters)
-            else:
-                query = query.ilike("event_location", f"%{locations[0]}%")
-        if date_from:
-            query = query.gte("event_date", date_from)
-        if date_to:
-            query = query.lte("event_date", date_to)
-        return query
-    
     def _get_filtered_event_ids(self, sport: Optional[str] = None, event_type: Optional[str] = None,
                                  location: Optional[str] = None, date_from: Optional[str] = None,
                                  date_to: Optional[str] = None) -> List[str]:
@@ -172,84 +284,20 @@ class DatabaseService:
     ) -> Dict[str, Any]:
         """
         Buscar KPIs agregados para o dashboard com filtros
-        Retorna métricas filtradas do sistema
+        Calculado no banco pela função get_dashboard_metrics (uma única chamada RPC)
         """
         try:
-            has_filters = any([sport, event_type, location, date_from, date_to])
-            
-            # Total de eventos (com filtros)
-            events_query = self.client.table("events").select("id, total_photos", count="exact")
-            events_query = self._apply_event_filters(events_query, sport, event_type, location, date_from, date_to)
-            events_response = events_query.execute()
-            
-            total_events = events_response.count if hasattr(events_response, 'count') else len(events_response.data or [])
-            total_photos = sum(event.get("total_photos", 0) or 0 for event in (events_response.data or []))
-            
-            # Se há filtros, precisamos filtrar atletas e marcas pelos event_ids
-            if has_filters:
-                event_ids = [e["id"] for e in (events_response.data or [])]
-                
-                if not event_ids:
-                    return {
-                        "total_events": 0,
-                        "total_photos_analyzed": 0,
-                        "total_athletes_identified": 0,
-                        "total_brands_tracked": 0,
-                    }
-                
-                # Total de atletas nos eventos filtrados
-                total_athletes = 0
-                all_brands = set()
-                
-                for event_id in event_ids:
-                    # Contar atletas por evento
-                    athletes_resp = (
-                        self.client.table("event_persons")
-                        .select("person_id", count="exact")
-                        .eq("event_id", event_id)
-                        .execute()
-                    )
-                    total_athletes += athletes_resp.count if hasattr(athletes_resp, 'count') else len(athletes_resp.data or [])
-                    
-                    # Buscar marcas por evento
-                    brands_resp = (
-                        self.client.table("person_items")
-                        .select("brand")
-                        .eq("event_id", event_id)
-                        .execute()
-                    )
-                    for item in (brands_resp.data or []):
-                        if item.get("brand"):
-                            all_brands.add(item["brand"])
-                
-                unique_brands = len(all_brands)
-            else:
-                # Sem filtros - buscar todos
-                athletes_response = (
-                    self.client.table("event_persons")
-                    .select("person_id", count="exact")
-                    .execute()
-                )
-                total_athletes = athletes_response.count if hasattr(athletes_response, 'count') else len(athletes_response.data or [])
-                
-                # Marcas únicas - usar a view brand_event_summary que já tem marcas agregadas
-                # Isso é mais eficiente que buscar em person_items
-                all_brands = set()
-                brands_response = (
-                    self.client.table("brand_event_summary")
-                    .select("brand")
-                    .execute()
-                )
-                for item in (brands_response.data or []):
-                    if item.get("brand"):
-                        all_brands.add(item["brand"])
-                unique_brands = len(all_brands)
+            response = self.client.rpc(
+                "get_dashboard_metrics",
+                self._event_filter_params(sport, event_type, location, date_from, date_to)
+            ).execute()
             
+            row = response.data[0] if response.data else {}
             return {
-                "total_events": total_events,
-                "total_photos_analyzed": total_photos,
-                "total_athletes_identified": total_athletes,
-                "total_brands_tracked": unique_brands,
+                "total_events": row.get("total_events", 0) or 0,
+                "total_photos_analyzed": row.get("total_photos_analyzed", 0) or 0,
+                "total_athletes_identified": row.get("total_athletes_identified", 0) or 0,
+                "total_brands_tracked": row.get("total_brands_tracked", 0) or 0,
             }
         except Exception as e:
             print(f"Erro ao buscar métricas do dashboard: {e}")
@@ -331,6 +379,599 @@ class DatabaseService:
             return []
 
 
+class AsyncDatabaseService(BaseDatabaseService):
+    """Serviço de acesso ao banco de dados via PostgREST (assíncrono)
+    
+    Usa um AsyncPostgrestClient, que mantém um pool de conexões httpx
+    reaproveitado entre requisições, para não bloquear o event loop do uvicorn.
+    Leituras usam a chave anônima; escritas (ingestão) usam um cliente próprio
+    com a SUPABASE_SERVICE_KEY, sem a qual falham com RuntimeError.
+    """
+    
+    def __init__(self):
+        self.client = self._create_client(settings.SUPABASE_ANON_KEY)
+        self.write_client: Optional[AsyncPostgrestClient] = (
+            self._create_client(settings.SUPABASE_SERVICE_KEY) if settings.SUPABASE_SERVICE_KEY else None
+        )
+    
+    @staticmethod
+    def _create_client(key: str) -> AsyncPostgrestClient:
+        """Cliente PostgREST autenticado com a chave informada"""
+        client = AsyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers={
+                "apiKey": key,
+                "Authorization": f"Bearer {key}",
+            },
+        )
+        # Conta as requisições ao PostgREST por método (métricas) e as registra no
+        # rastreamento da requisição da API em andamento, se houver
+        client.session.event_hooks["request"].append(trace_postgrest_request)
+        client.session.event_hooks["response"].append(record_postgrest_response)
+        client.session.event_hooks["response"].append(trace_postgrest_response)
+        return client
+    
+    async def close(self) -> None:
+        """Fecha as conexões do pool HTTP"""
+        await self.client.aclose()
+        if self.write_client is not None:
+            await self.write_client.aclose()
+    
+    async def get_events(
+        self, 
+        limit: int = 100, 
+        offset: int = 0,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Buscar eventos com paginação e filtros
+        
+        Ordenados por (event_date, id) decrescente. Com `after` = (event_date, id) do
+        último evento da página anterior, pagina por cursor (keyset) em vez de offset.
+        """
+        events, _ = await self.get_events_page(
+            limit=limit, offset=offset, sport=sport, event_type=event_type,
+            location=location, date_from=date_from, date_to=date_to, after=after
+        )
+        return events
+    
+    @track_db_call
+    async def get_all_events(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Todos os eventos que atendem aos filtros (leituras em massa, ex: relatórios)
+        
+        Paginado por iter_rows: não é truncado em max-rows nem em um limite fixo.
+        Sem ordem garantida.
+        """
+        try:
+            return [
+                row async for row in self.iter_rows(
+                    "events", "*",
+                    apply_filters=lambda q: self._apply_event_filters(
+                        q, sport, event_type, location, date_from, date_to
+                    )
+                )
+            ]
+        except Exception as e:
+            log_db_error(f"Erro ao buscar todos os eventos: {e}")
+            return []
+    
+    @track_db_call
+    async def get_events_page(
+        self, 
+        limit: int = 100, 
+        offset: int = 0,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        count: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Buscar uma página de eventos e, na mesma requisição, o total com os filtros
+        
+        `count` é o modo de contagem do PostgREST ("exact", "planned" ou "estimated"),
+        lido do header Content-Range da própria resposta; None não conta.
+        Retorna (eventos, total). Com `after`, o total considera só os eventos após o cursor.
+        """
+        try:
+            query = self.client.table("events").select("*", count=count)
+            
+            # Aplicar filtros (suporta múltiplos valores separados por vírgula)
+            query = self._apply_event_filters(query, sport, event_type, location, date_from, date_to)
+            
+            if after:
+                # (event_date, id) < cursor; "and" porque "or" pode já estar em uso pelo filtro de localização
+                after_date, after_id = after
+                query.params = query.params.add(
+                    "and",
+                    f"(or(event_date.lt.{after_date},and(event_date.eq.{after_date},id.lt.{after_id})))"
+                )
+            
+            # Desempate por id; o PostgREST espera as colunas de ordenação em um único parâmetro
+            query.params = query.params.add("order", "event_date.desc,id.desc")
+            
+            response = await (
+                query
+                .limit(limit)
+                .offset(offset)
+                .execute()
+            )
+            return response.data or [], (response.count if count else None)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar eventos: {e}")
+            return [], (0 if count else None)
+    
+    @track_db_call
+    async def get_event_by_id(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """Buscar evento por ID (None se não existir; só falhas de acesso contam como erro)"""
+        try:
+            response = await (
+                self.client.table("events")
+                .select("*")
+                .eq("id", event_id)
+                .maybe_single()
+                .execute()
+            )
+            return response.data if response and response.data else None
+        except Exception as e:
+            log_db_error(f"Erro ao buscar evento {event_id}: {e}")
+            return None
+    
+    @track_db_call
+    async def get_brand_summary(self, event_id: str) -> List[Dict[str, Any]]:
+        """Buscar resumo de marcas por evento"""
+        try:
+            response = await (
+                self.client.table("brand_event_summary")
+                .select("*")
+                .eq("event_id", event_id)
+                .order("brand_share_percent", desc=True)
+                .execute()
+            )
+            return response.data or []
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo de marcas para evento {event_id}: {e}")
+            return []
+    
+    @track_db_call
+    async def get_product_summary(self, event_id: str) -> List[Dict[str, Any]]:
+        """Buscar resumo de produtos por evento"""
+        try:
+            response = await (
+                self.client.table("product_event_summary")
+                .select("*")
+                .eq("event_id", event_id)
+                .order("product_share_percent", desc=True)
+                .execute()
+            )
+            return response.data or []
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo de produtos para evento {event_id}: {e}")
+            return []
+    
+    async def iter_rows(
+        self,
+        table: str,
+        columns: str = "*",
+        in_column: Optional[str] = None,
+        in_values: Optional[List[str]] = None,
+        apply_filters: Optional[Callable[[Any], Any]] = None,
+        key: Optional[str] = "id",
+        order: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Percorre todas as linhas de uma consulta, página a página, sem limite de linhas
+        
+        Uma única requisição ao PostgREST é truncada em max-rows sem aviso; aqui cada
+        página tem no máximo `page_size` linhas (padrão DATABASE_PAGE_SIZE, que deve ser
+        <= max-rows) e a próxima só é buscada quando a anterior foi consumida.
+        
+        - `in_column`/`in_values`: filtro in_() dividido em blocos (limite de URL)
+        - `apply_filters`: função que recebe e devolve a query para filtros adicionais
+        - `key`: coluna única para paginação por keyset (key > último visto);
+          None usa offset com a ordenação `order` (views sem chave única)
+        """
+        page_size = page_size or settings.DATABASE_PAGE_SIZE
+        if in_column is not None:
+            chunks = self._chunk(in_values or [])
+        else:
+            chunks = [None]
+        if key and columns != "*" and key not in [c.strip() for c in columns.split(",")]:
+            columns = f"{columns}, {key}"
+        
+        for chunk in chunks:
+            last_key = None
+            offset = 0
+            while True:
+                query = self.client.table(table).select(columns)
+                if chunk is not None:
+                    query = query.in_(in_column, chunk)
+                if apply_filters:
+                    query = apply_filters(query)
+                if key:
+                    if last_key is not None:
+                        query = query.gt(key, last_key)
+                    query = query.order(key)
+                else:
+                    if order:
+                        query.params = query.params.add("order", order)
+                    query = query.offset(offset)
+                
+                response = await query.limit(page_size).execute()
+                rows = response.data or []
+                for row in rows:
+                    yield row
+                
+                if len(rows) < page_size:
+                    break
+                if key:
+                    last_key = rows[-1][key]
+                else:
+                    offset += len(rows)
+    
+    async def _select_in_chunks(self, table: str, columns: str, column: str, values: List[str],
+                                key: Optional[str] = "id", order: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Select filtrado por in_() em blocos paginados, com os blocos em paralelo"""
+        async def collect(chunk: List[str]) -> List[Dict[str, Any]]:
+            return [
+                row async for row in self.iter_rows(
+                    table, columns, in_column=column, in_values=chunk, key=key, order=order
+                )
+            ]
+        
+        results = await asyncio.gather(*[collect(chunk) for chunk in self._chunk(values)])
+        return [row for rows in results for row in rows]
+    
+    @track_db_call
+    async def get_brand_summaries(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Buscar resumo de marcas de vários eventos (uma requisição por bloco de IDs)"""
+        try:
+            return await self._select_in_chunks(
+                "brand_event_summary", "*", "event_id", event_ids, key=None, order="event_id,brand"
+            )
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo de marcas para {len(event_ids)} eventos: {e}")
+            return []
+    
+    @track_db_call
+    async def get_product_summaries(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Buscar resumo de produtos de vários eventos (uma requisição por bloco de IDs)"""
+        try:
+            return await self._select_in_chunks(
+                "product_event_summary", "*", "event_id", event_ids, key=None, order="event_id,product_type"
+            )
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo de produtos para {len(event_ids)} eventos: {e}")
+            return []
+    
+    @track_db_call
+    async def get_persons_by_event(self, event_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Buscar pessoas de um evento (todas as páginas; `limit` restringe a quantidade)"""
+        try:
+            return await self._select_event_rows("event_persons", event_id, limit)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar pessoas do evento {event_id}: {e}")
+            return []
+    
+    @track_db_call
+    async def get_items_by_event(self, event_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Buscar itens de um evento (todas as páginas; `limit` restringe a quantidade)"""
+        try:
+            return await self._select_event_rows("person_items", event_id, limit)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar itens do evento {event_id}: {e}")
+            return []
+    
+    async def _select_event_rows(self, table: str, event_id: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        """Linhas de um evento, paginadas por iter_rows (None = todas)"""
+        page_size = min(limit, settings.DATABASE_PAGE_SIZE) if limit else None
+        rows: List[Dict[str, Any]] = []
+        async with aclosing(self.iter_rows(
+            table, "*", apply_filters=lambda q: q.eq("event_id", event_id), page_size=page_size
+        )) as pages:
+            async for row in pages:
+                rows.append(row)
+                if limit is not None and len(rows) >= limit:
+                    break
+        return rows
+    
+    @track_db_call
+    async def get_persons_by_events(self, event_ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Buscar pessoas de vários eventos (uma requisição por bloco de IDs)"""
+        try:
+            return await self._select_in_chunks("event_persons", columns, "event_id", event_ids)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar pessoas de {len(event_ids)} eventos: {e}")
+            return []
+    
+    @track_db_call
+    async def get_items_by_events(self, event_ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Buscar itens de vários eventos (uma requisição por bloco de IDs)"""
+        try:
+            return await self._select_in_chunks("person_items", columns, "event_id", event_ids)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar itens de {len(event_ids)} eventos: {e}")
+            return []
+    
+    async def _get_filtered_event_ids(self, sport: Optional[str] = None, event_type: Optional[str] = None,
+                                 location: Optional[str] = None, date_from: Optional[str] = None,
+                                 date_to: Optional[str] = None) -> List[str]:
+        """Buscar IDs de eventos que correspondem aos filtros (todas as páginas)"""
+        return [
+            row["id"] async for row in self.iter_rows(
+                "events", "id",
+                apply_filters=lambda q: self._apply_event_filters(q, sport, event_type, location, date_from, date_to)
+            )
+        ]
+    
+    @track_db_call
+    async def get_dashboard_metrics(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Buscar KPIs agregados para o dashboard com filtros
+        Calculado no banco pela função get_dashboard_metrics (uma única chamada RPC)
+        """
+        try:
+            response = await self.client.rpc(
+                "get_dashboard_metrics",
+                self._event_filter_params(sport, event_type, location, date_from, date_to)
+            ).execute()
+            
+            row = response.data[0] if response.data else {}
+            return {
+                "total_events": row.get("total_events", 0) or 0,
+                "total_photos_analyzed": row.get("total_photos_analyzed", 0) or 0,
+                "total_athletes_identified": row.get("total_athletes_identified", 0) or 0,
+                "total_brands_tracked": row.get("total_brands_tracked", 0) or 0,
+            }
+        except Exception as e:
+            log_db_error(f"Erro ao buscar métricas do dashboard: {e}")
+            return {
+                "total_events": 0,
+                "total_photos_analyzed": 0,
+                "total_athletes_identified": 0,
+                "total_brands_tracked": 0,
+            }
+
+    @track_db_call
+    async def get_dashboard_summary(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        use_month_rollup: bool = False
+    ) -> Dict[str, Any]:
+        """
+        KPIs, eventos por esporte e itens por mês e marca (função get_dashboard_summary)
+        Os filtros são resolvidos uma vez no banco para as três agregações.
+        Retorna {"metrics": {...}, "sport_distribution": [...], "brand_months": [...]}
+        """
+        try:
+            response = await self.client.rpc(
+                "get_dashboard_summary",
+                {
+                    **self._event_filter_params(sport, event_type, location, date_from, date_to),
+                    "p_brands": self._split_filter(brand),
+                    "p_use_month_rollup": use_month_rollup,
+                }
+            ).execute()
+            return self._dashboard_summary(response.data)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo do dashboard: {e}")
+            return self._dashboard_summary(None)
+
+    @track_db_call
+    async def query_cube(
+        self,
+        source: str,
+        dims: List[str],
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        product_type: Optional[str] = None,
+        gender: Optional[str] = None,
+        age_bucket: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Somar células do cubo analítico (função query_analytics_cube)
+        `source` é "items" ou "persons"; `dims` são colunas do cubo para agrupar
+        """
+        try:
+            response = await self.client.rpc(
+                "query_analytics_cube",
+                self._cube_params(source, dims, sport, event_type, location, date_from, date_to,
+                                  brand, product_type, gender, age_bucket)
+            ).execute()
+            return response.data or []
+        except Exception as e:
+            log_db_error(f"Erro ao consultar cubo analítico: {e}")
+            return []
+    
+    @track_db_call
+    async def count_events(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> int:
+        """Contar total de eventos com filtros (suporta múltiplos valores separados por vírgula)"""
+        try:
+            query = self.client.table("events").select("id", count="exact")
+            
+            # Aplicar filtros (suporta múltiplos valores separados por vírgula)
+            query = self._apply_event_filters(query, sport, event_type, location, date_from, date_to)
+            
+            response = await query.execute()
+            return response.count if hasattr(response, 'count') else len(response.data or [])
+        except Exception as e:
+            log_db_error(f"Erro ao contar eventos: {e}")
+            return 0
+    
+    @track_db_call
+    async def get_brand_time_series(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Buscar dados de marcas agregados por evento com data e filtros
+        Retorna dados da view brand_event_summary com informações de data
+        """
+        try:
+            brands = self._split_filter(brand)
+            
+            def apply_brand(query):
+                if brands:
+                    query = query.in_("brand", brands) if len(brands) > 1 else query.eq("brand", brands[0])
+                return query
+            
+            # Se há filtros de evento, primeiro buscar os event_ids filtrados
+            has_event_filters = any([sport, event_type, location, date_from, date_to])
+            event_ids = None
+            if has_event_filters:
+                event_ids = await self._get_filtered_event_ids(sport, event_type, location, date_from, date_to)
+                if not event_ids:
+                    return []
+            
+            # Paginado (e em blocos de IDs): nenhuma linha é perdida por max-rows ou limite de URL
+            rows = [
+                row async for row in self.iter_rows(
+                    "brand_event_summary", "event_id, event_name, event_date, brand, total_items",
+                    in_column="event_id" if event_ids is not None else None,
+                    in_values=event_ids,
+                    apply_filters=apply_brand,
+                    key=None,
+                    order="event_date,event_id,brand"
+                )
+            ]
+            rows.sort(key=lambda row: row["event_date"])
+            return rows
+        except Exception as e:
+            log_db_error(f"Erro ao buscar dados temporais de marcas: {e}")
+            return []
+    
+    @track_db_call
+    async def get_brand_month_series(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Buscar itens por mês e marca no rollup brand_month_summary
+        O filtro de data é aplicado sobre o mês (date_from/date_to devem ser limites de mês)
+        """
+        try:
+            query = self.client.table("brand_month_summary").select("month, brand, total_items")
+            query = self._apply_event_filters(query, sport, event_type, location, date_from, date_to,
+                                              date_column="month")
+            
+            brands = self._split_filter(brand)
+            if brands:
+                query = query.in_("brand", brands)
+            
+            response = await query.order("month", desc=False).execute()
+            return response.data or []
+        except Exception as e:
+            log_db_error(f"Erro ao buscar série mensal de marcas: {e}")
+            return []
+    
+    @track_db_call
+    async def get_data_version(self) -> Optional[str]:
+        """
+        Buscar a versão atual dos dados (função get_data_version)
+        Muda quando eventos são alterados ou as views de resumo são atualizadas
+        """
+        try:
+            response = await self.client.rpc("get_data_version", {}).execute()
+            return str(response.data) if response.data is not None else None
+        except Exception as e:
+            log_db_error(f"Erro ao buscar versão dos dados: {e}")
+            return None
+    
+    # -------------------------------------------------------------------------
+    # Escrita (ingestão): falhas são propagadas em vez de virar um valor padrão
+    # -------------------------------------------------------------------------
+    
+    @property
+    def writer(self) -> AsyncPostgrestClient:
+        """Cliente de escrita (service key); RuntimeError se não configurado"""
+        if self.write_client is None:
+            raise RuntimeError(
+                "SUPABASE_SERVICE_KEY não configurada. "
+                "Adicione a service key no arquivo .env para gravar dados (ingestão)"
+            )
+        return self.write_client
+    
+    @track_db_call
+    async def upsert_event_persons(self, rows: List[Dict[str, Any]]) -> None:
+        """Grava pessoas em lote (upsert em event_id, person_id)"""
+        await self.writer.table("event_persons").upsert(
+            rows, on_conflict="event_id,person_id", returning=ReturnMethod.minimal
+        ).execute()
+    
+    @track_db_call
+    async def upsert_person_items(self, rows: List[Dict[str, Any]]) -> None:
+        """Grava itens em lote (upsert em event_id, person_id, product_type)"""
+        await self.writer.table("person_items").upsert(
+            rows, on_conflict="event_id,person_id,product_type", returning=ReturnMethod.minimal
+        ).execute()
+    
+    @track_db_call
+    async def update_event_status(self, event_id: str, status: str) -> None:
+        """Atualiza events.status (created, processing, completed, failed)"""
+        await self.writer.table("events").update(
+            {"status": status}, returning=ReturnMethod.minimal
+        ).eq("id", event_id).execute()
+    
+    @track_db_call
+    async def finish_event_ingestion(self, event_id: str) -> int:
+        """
+        Fecha a ingestão (função finish_event_ingestion): contadores do evento,
+        status completed e refresh dos resumos. Retorna quantos eventos tiveram
+        os resumos recalculados.
+        """
+        response = await self.writer.rpc("finish_event_ingestion", {"p_event_id": event_id}).execute()
+        return int(response.data or 0)
+
+
 # Instância global do serviço
 db_service = DatabaseService()
 
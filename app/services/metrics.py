@@ -0,0 +1,276 @@
+"""
+Métricas da aplicação no formato de exposição do Prometheus
+Registro em memória (por processo) de contadores, gauges e histogramas com labels
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Limites (em segundos) dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """Base: série por combinação de valores de labels"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{self._labels(key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Counter(_Metric):
+    """Valor que só cresce (ex: total de requisições)"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce (ex: ocupação de um cache)"""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribuição de observações em buckets cumulativos, com soma e contagem"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # contagem por bucket (não cumulativa; +Inf no fim), soma
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    labels = self._labels(key, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas expostas em GET /metrics
+
+    `on_collect` registra funções chamadas antes de cada exposição, para gauges
+    calculados a partir de outros objetos (ex: ocupação dos caches).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        for callback in self._collectors:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Erro ao coletar métricas: {e}")
+
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+# Registro global (um por processo/worker)
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota e status",
+    ["method", "route", "status"]
+)
+DB_CALL_DURATION = registry.histogram(
+    "db_call_duration_seconds", "Latência dos métodos do serviço de banco", ["method"]
+)
+DB_ERRORS = registry.counter(
+    "db_errors_total", "Erros nos métodos do serviço de banco", ["method"]
+)
+POSTGREST_REQUESTS = registry.counter(
+    "postgrest_requests_total", "Requisições HTTP ao PostgREST por método do serviço de banco",
+    ["method", "status"]
+)
+OPENAI_REQUEST_DURATION = registry.histogram(
+    "openai_request_duration_seconds", "Latência das gerações na OpenAI por tipo de relatório",
+    ["report_type", "mode"]
+)
+OPENAI_TOKENS = registry.counter(
+    "openai_tokens_total", "Tokens consumidos na OpenAI por tipo de relatório", ["report_type"]
+)
+OPENAI_ESTIMATED_COMPLETION_TOKENS = registry.counter(
+    "openai_estimated_completion_tokens_total",
+    "Tokens de resposta estimados (chunks) nas gerações em streaming, em que a API não informa o uso",
+    ["report_type"]
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Consultas aos caches por resultado (hit/miss)", ["cache", "result"]
+)
+CACHE_HIT_RATIO = registry.gauge(
+    "cache_hit_ratio", "Proporção de hits desde o início do processo", ["cache"]
+)
+CACHE_ENTRIES = registry.gauge(
+    "cache_entries", "Entradas armazenadas no cache", ["cache"]
+)
+
+
+# Método do serviço de banco em execução (label das requisições ao PostgREST)
+current_db_method: ContextVar[str] = ContextVar("current_db_method", default="other")
+
+
+def track_db_call(func: Callable) -> Callable:
+    """Decorator dos métodos assíncronos do serviço de banco: latência, erros e contexto"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_db_method.set(name)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(method=name)
+            raise
+        finally:
+            DB_CALL_DURATION.observe(time.perf_counter() - start, method=name)
+            current_db_method.reset(token)
+
+    return wrapper
+
+
+# Erros tratados na operação atual (ver capture_db_errors); None fora de uma captura
+current_db_errors: ContextVar[Optional[List[str]]] = ContextVar("current_db_errors", default=None)
+
+
+@contextmanager
+def capture_db_errors() -> Iterator[List[str]]:
+    """
+    Coleta os métodos de banco que falharam e devolveram um valor padrão dentro do bloco
+
+    A lista é compartilhada com as tarefas criadas no bloco (asyncio.gather), então
+    falhas em consultas paralelas também aparecem.
+    """
+    errors: List[str] = []
+    token = current_db_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        current_db_errors.reset(token)
+
+
+def log_db_error(message: str) -> None:
+    """Registra um erro tratado (convertido em valor padrão) no método de banco atual"""
+    print(message)
+    method = current_db_method.get()
+    DB_ERRORS.inc(method=method)
+    errors = current_db_errors.get()
+    if errors is not None:
+        errors.append(method)
+
+
+async def record_postgrest_response(response) -> None:
+    """Event hook do httpx: conta as requisições ao PostgREST"""
+    POSTGREST_REQUESTS.inc(method=current_db_method.get(), status=response.status_code)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Conta uma consulta a um cache"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def update_cache_hit_ratio(cache: str) -> None:
+    """Atualiza cache_hit_ratio a partir de cache_requests_total"""
+    hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+    total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(round(hits / total, 4) if total else 0, cache=cache)
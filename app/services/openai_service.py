@@ -4,8 +4,8 @@ Abstração sobre o cliente OpenAI para geração de texto com LLM
 """
 
 import time
-from typing import Optional
-from openai import OpenAI
+from typing import AsyncIterator, Optional
+from openai import AsyncOpenAI, OpenAI
 from app.config import settings
 
 
@@ -21,6 +21,7 @@ class OpenAIService:
             )
         
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.OPENAI_MODEL
         self.max_tokens = settings.OPENAI_MAX_TOKENS
     
@@ -72,6 +73,37 @@ class OpenAIService:
         except Exception as e:
             raise RuntimeError(f"Erro ao gerar texto com OpenAI: {str(e)}")
     
+    async def stream_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Gera uma completion em streaming, devolvendo os trechos de texto à medida que chegam
+        
+        Mesmos parâmetros de generate_completion. Chunks sem conteúdo (ex: o final,
+        que só traz finish_reason) são ignorados.
+        """
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens or self.max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except Exception as e:
+            raise RuntimeError(f"Erro ao gerar texto com OpenAI: {str(e)}")
+    
     def is_available(self) -> bool:
         """Verifica se o serviço está disponível"""
         return bool(settings.OPENAI_API_KEY)
@@ -0,0 +1,472 @@
+"""
+Serviço de banco de dados via conexão direta ao PostgreSQL
+Alternativa ao PostgREST para os caminhos de agregação pesados (dashboard,
+série temporal e coleta de dados de relatórios)
+"""
+
+import asyncio
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, Tuple
+from uuid import UUID
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.services.database import AsyncDatabaseService
+from app.services.metrics import log_db_error, track_db_call
+from app.services.tracing import format_filters, record_call, sql_target
+
+
+class PostgresDatabaseService(AsyncDatabaseService):
+    """
+    Mesma interface do AsyncDatabaseService, com as consultas pesadas em SQL parametrizado
+
+    Usa um pool de conexões SQLAlchemy (psycopg2) configurado por DATABASE_URL.
+    As chamadas ao driver são bloqueantes, então rodam em threads para não travar
+    o event loop. Joins e agregações acontecem no banco; métodos não sobrescritos
+    continuam usando o PostgREST da classe base.
+    """
+
+    def __init__(self):
+        super().__init__()
+        if not settings.DATABASE_URL:
+            raise ValueError(
+                "DATABASE_URL não configurada. "
+                "Adicione a URL de conexão no arquivo .env para usar DATABASE_BACKEND=postgres"
+            )
+        self.engine: Engine = create_engine(
+            self._normalize_url(settings.DATABASE_URL),
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+        )
+
+    async def close(self) -> None:
+        """Fecha o pool HTTP e o pool de conexões PostgreSQL"""
+        await super().close()
+        self.engine.dispose()
+
+    # =========================================================================
+    # EVENTOS
+    # =========================================================================
+
+    async def get_events(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Buscar eventos com paginação (offset ou cursor) e filtros"""
+        events, _ = await self.get_events_page(
+            limit=limit, offset=offset, sport=sport, event_type=event_type,
+            location=location, date_from=date_from, date_to=date_to, after=after
+        )
+        return events
+
+    @track_db_call
+    async def get_events_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        count: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Página de eventos e total em uma única ida ao banco
+
+        "exact" conta com COUNT(*) OVER() na própria consulta da página;
+        "planned"/"estimated" usam a estimativa do planejador (EXPLAIN), na mesma conexão.
+        """
+        try:
+            where, params = self._event_filter_sql(sport, event_type, location, date_from, date_to)
+            if after:
+                where += " AND (e.event_date, e.id) < (CAST(:after_date AS DATE), CAST(:after_id AS UUID))"
+                params["after_date"], params["after_id"] = after
+
+            total_column = ", COUNT(*) OVER() AS _total" if count == "exact" else ""
+            page_sql = f"""
+                SELECT e.*{total_column} FROM events e
+                WHERE {where}
+                ORDER BY e.event_date DESC, e.id DESC
+                LIMIT :limit OFFSET :offset
+                """
+            # Exato: COUNT(*) só é usado se a página vier vazia; estimado: plano da contagem
+            total_sql = (
+                f"SELECT COUNT(*) FROM events e WHERE {where}" if count == "exact"
+                else f"EXPLAIN (FORMAT JSON) SELECT 1 FROM events e WHERE {where}"
+            )
+            started = time.perf_counter()
+            events, total = await asyncio.to_thread(
+                self._fetch_events_page_sync, page_sql, total_sql,
+                {**params, "limit": limit, "offset": offset}, count
+            )
+            record_call(
+                "db", "events", (time.perf_counter() - started) * 1000,
+                filters=format_filters(params.items()), rows=len(events)
+            )
+            return events, total
+        except Exception as e:
+            log_db_error(f"Erro ao buscar eventos: {e}")
+            return [], (0 if count else None)
+
+    @track_db_call
+    async def get_all_events(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Todos os eventos que atendem aos filtros (uma consulta, sem limite)"""
+        try:
+            where, params = self._event_filter_sql(sport, event_type, location, date_from, date_to)
+            return await self._fetch_all(f"SELECT e.* FROM events e WHERE {where}", params)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar todos os eventos: {e}")
+            return []
+
+    @track_db_call
+    async def count_events(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> int:
+        """Contar total de eventos com filtros"""
+        try:
+            where, params = self._event_filter_sql(sport, event_type, location, date_from, date_to)
+            rows = await self._fetch_all(f"SELECT COUNT(*) AS total FROM events e WHERE {where}", params)
+            return rows[0]["total"] if rows else 0
+        except Exception as e:
+            log_db_error(f"Erro ao contar eventos: {e}")
+            return 0
+
+    # =========================================================================
+    # DASHBOARD E SÉRIE TEMPORAL
+    # =========================================================================
+
+    @track_db_call
+    async def get_dashboard_metrics(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Buscar KPIs agregados para o dashboard (função get_dashboard_metrics no banco)"""
+        try:
+            rows = await self._fetch_all(
+                """
+                SELECT * FROM get_dashboard_metrics(
+                    CAST(:p_sports AS TEXT[]), CAST(:p_event_types AS TEXT[]),
+                    CAST(:p_locations AS TEXT[]), CAST(:p_date_from AS DATE), CAST(:p_date_to AS DATE)
+                )
+                """,
+                self._event_filter_params(sport, event_type, location, date_from, date_to)
+            )
+            row = rows[0] if rows else {}
+            return {
+                "total_events": row.get("total_events", 0) or 0,
+                "total_photos_analyzed": row.get("total_photos_analyzed", 0) or 0,
+                "total_athletes_identified": row.get("total_athletes_identified", 0) or 0,
+                "total_brands_tracked": row.get("total_brands_tracked", 0) or 0,
+            }
+        except Exception as e:
+            log_db_error(f"Erro ao buscar métricas do dashboard: {e}")
+            return {
+                "total_events": 0,
+                "total_photos_analyzed": 0,
+                "total_athletes_identified": 0,
+                "total_brands_tracked": 0,
+            }
+
+    @track_db_call
+    async def get_dashboard_summary(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        use_month_rollup: bool = False
+    ) -> Dict[str, Any]:
+        """KPIs, eventos por esporte e itens por mês e marca (função get_dashboard_summary no banco)"""
+        try:
+            rows = await self._fetch_all(
+                """
+                SELECT get_dashboard_summary(
+                    CAST(:p_sports AS TEXT[]), CAST(:p_event_types AS TEXT[]),
+                    CAST(:p_locations AS TEXT[]), CAST(:p_date_from AS DATE), CAST(:p_date_to AS DATE),
+                    CAST(:p_brands AS TEXT[]), CAST(:p_use_month_rollup AS BOOLEAN)
+                ) AS summary
+                """,
+                {
+                    **self._event_filter_params(sport, event_type, location, date_from, date_to),
+                    "p_brands": self._split_filter(brand),
+                    "p_use_month_rollup": use_month_rollup,
+                }
+            )
+            return self._dashboard_summary(rows[0]["summary"] if rows else None)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo do dashboard: {e}")
+            return self._dashboard_summary(None)
+
+    @track_db_call
+    async def query_cube(
+        self,
+        source: str,
+        dims: List[str],
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None,
+        product_type: Optional[str] = None,
+        gender: Optional[str] = None,
+        age_bucket: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Somar células do cubo analítico (função query_analytics_cube no banco)"""
+        try:
+            rows = await self._fetch_all(
+                """
+                SELECT query_analytics_cube(
+                    CAST(:p_source AS TEXT), CAST(:p_dims AS TEXT[]),
+                    CAST(:p_sports AS TEXT[]), CAST(:p_event_types AS TEXT[]),
+                    CAST(:p_locations AS TEXT[]), CAST(:p_date_from AS DATE), CAST(:p_date_to AS DATE),
+                    CAST(:p_brands AS TEXT[]), CAST(:p_product_types AS TEXT[]),
+                    CAST(:p_genders AS TEXT[]), CAST(:p_age_buckets AS TEXT[])
+                ) AS cell
+                """,
+                self._cube_params(source, dims, sport, event_type, location, date_from, date_to,
+                                  brand, product_type, gender, age_bucket)
+            )
+            return [row["cell"] for row in rows]
+        except Exception as e:
+            log_db_error(f"Erro ao consultar cubo analítico: {e}")
+            return []
+
+    @track_db_call
+    async def get_brand_time_series(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Buscar dados de marcas por evento com data (join com events no banco)"""
+        try:
+            where, params = self._event_filter_sql(sport, event_type, location, date_from, date_to)
+            brands = self._split_filter(brand)
+            if brands:
+                where += " AND bes.brand = ANY(:brands)"
+                params["brands"] = brands
+
+            return await self._fetch_all(
+                f"""
+                SELECT bes.event_id, bes.event_name, bes.event_date, bes.brand, bes.total_items
+                FROM brand_event_summary bes
+                JOIN events e ON e.id = bes.event_id
+                WHERE {where}
+                ORDER BY bes.event_date
+                """,
+                params
+            )
+        except Exception as e:
+            log_db_error(f"Erro ao buscar dados temporais de marcas: {e}")
+            return []
+
+    @track_db_call
+    async def get_brand_month_series(
+        self,
+        sport: Optional[str] = None,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        brand: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Buscar itens por mês e marca no rollup, já somados por (mês, marca)"""
+        try:
+            where, params = self._event_filter_sql(sport, event_type, location, date_from, date_to,
+                                                   alias="bms", date_column="month")
+            brands = self._split_filter(brand)
+            if brands:
+                where += " AND bms.brand = ANY(:brands)"
+                params["brands"] = brands
+
+            return await self._fetch_all(
+                f"""
+                SELECT bms.month, bms.brand, SUM(bms.total_items)::BIGINT AS total_items
+                FROM brand_month_summary bms
+                WHERE {where}
+                GROUP BY bms.month, bms.brand
+                ORDER BY bms.month
+                """,
+                params
+            )
+        except Exception as e:
+            log_db_error(f"Erro ao buscar série mensal de marcas: {e}")
+            return []
+
+    # =========================================================================
+    # COLETA DE DADOS DE RELATÓRIOS (uma consulta por tabela, sem limite de URL)
+    # =========================================================================
+
+    @track_db_call
+    async def get_brand_summaries(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Buscar resumo de marcas de vários eventos"""
+        try:
+            return await self._select_by_event_ids("brand_event_summary", "*", event_ids)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo de marcas para {len(event_ids)} eventos: {e}")
+            return []
+
+    @track_db_call
+    async def get_product_summaries(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """Buscar resumo de produtos de vários eventos"""
+        try:
+            return await self._select_by_event_ids("product_event_summary", "*", event_ids)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar resumo de produtos para {len(event_ids)} eventos: {e}")
+            return []
+
+    @track_db_call
+    async def get_persons_by_events(self, event_ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Buscar pessoas de vários eventos"""
+        try:
+            return await self._select_by_event_ids("event_persons", columns, event_ids)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar pessoas de {len(event_ids)} eventos: {e}")
+            return []
+
+    @track_db_call
+    async def get_items_by_events(self, event_ids: List[str], columns: str = "*") -> List[Dict[str, Any]]:
+        """Buscar itens de vários eventos"""
+        try:
+            return await self._select_by_event_ids("person_items", columns, event_ids)
+        except Exception as e:
+            log_db_error(f"Erro ao buscar itens de {len(event_ids)} eventos: {e}")
+            return []
+
+    # =========================================================================
+    # HELPERS
+    # =========================================================================
+
+    def _event_filter_sql(self, sport: Optional[str], event_type: Optional[str],
+                          location: Optional[str], date_from: Optional[str],
+                          date_to: Optional[str], alias: str = "e",
+                          date_column: str = "event_date") -> Tuple[str, Dict[str, Any]]:
+        """
+        Cláusula WHERE equivalente a _apply_event_filters
+        Retorna (sql, parâmetros) - os valores nunca são interpolados no SQL
+        """
+        clauses = ["TRUE"]
+        params: Dict[str, Any] = {}
+
+        sports = self._split_filter(sport)
+        if sports:
+            clauses.append(f"{alias}.sport = ANY(:sports)")
+            params["sports"] = sports
+        event_types = self._split_filter(event_type)
+        if event_types:
+            clauses.append(f"{alias}.event_type = ANY(:event_types)")
+            params["event_types"] = event_types
+        locations = self._split_filter(location)
+        if locations:
+            clauses.append(f"{alias}.event_location ILIKE ANY(:location_patterns)")
+            params["location_patterns"] = [f"%{loc}%" for loc in locations]
+        if date_from:
+            clauses.append(f"{alias}.{date_column} >= CAST(:date_from AS DATE)")
+            params["date_from"] = date_from
+        if date_to:
+            clauses.append(f"{alias}.{date_column} <= CAST(:date_to AS DATE)")
+            params["date_to"] = date_to
+
+        return " AND ".join(clauses), params
+
+    async def _select_by_event_ids(self, table: str, columns: str, event_ids: List[str]) -> List[Dict[str, Any]]:
+        """SELECT filtrado por uma lista de event_ids (tabela e colunas são constantes do código)"""
+        if not event_ids:
+            return []
+        return await self._fetch_all(
+            f"SELECT {columns} FROM {table} WHERE event_id = ANY(CAST(:event_ids AS UUID[]))",
+            {"event_ids": list(event_ids)}
+        )
+
+    async def _fetch_all(self, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Executa a consulta em uma thread e devolve linhas no mesmo formato JSON do PostgREST"""
+        started = time.perf_counter()
+        rows = await asyncio.to_thread(self._fetch_all_sync, sql, params)
+        record_call(
+            "db", sql_target(sql), (time.perf_counter() - started) * 1000,
+            filters=format_filters(params.items()), rows=len(rows)
+        )
+        return rows
+
+    def _fetch_all_sync(self, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            result = conn.execute(text(sql), params)
+            return [
+                {key: self._to_json_value(value) for key, value in row.items()}
+                for row in result.mappings()
+            ]
+
+    def _fetch_events_page_sync(
+        self, page_sql: str, total_sql: str, params: Dict[str, Any], count: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        with self.engine.connect() as conn:
+            rows = [
+                {key: self._to_json_value(value) for key, value in row.items()}
+                for row in conn.execute(text(page_sql), params).mappings()
+            ]
+            total = None
+            if count == "exact":
+                total = rows[0]["_total"] if rows else 0
+                for row in rows:
+                    del row["_total"]
+                if not rows and params["offset"] > 0:
+                    # Offset além do fim: a página vazia não traz o total
+                    total = conn.execute(text(total_sql), params).scalar()
+            elif count:
+                plan = conn.execute(text(total_sql), params).scalar()
+                total = int(plan[0]["Plan"]["Plan Rows"])
+            return rows, total
+
+    @staticmethod
+    def _to_json_value(value: Any) -> Any:
+        """Converte tipos do driver para os tipos que o PostgREST devolveria em JSON"""
+        if isinstance(value, UUID):
+            return str(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return float(value)
+        return value
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """SQLAlchemy 2 não aceita o esquema 'postgres://' usado por alguns provedores"""
+        if url.startswith("postgres://"):
+            return "postgresql://" + url[len("postgres://"):]
+        return url
@@ -0,0 +1,108 @@
+"""
+Cache persistente de relatórios gerados pela LLM
+Armazena as respostas em SQLite, endereçadas pelo hash dos prompts renderizados
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+class ReportCache:
+    """
+    Cache de completions em disco (SQLite), limitado por número de entradas
+
+    A chave é o SHA-256 de (prompt de sistema, prompt do usuário, modelo, temperatura).
+    Como o prompt do usuário já contém os dados coletados do banco, qualquer mudança
+    nos dados gera uma chave nova - não é preciso invalidar entradas.
+    Ao exceder max_entries, as entradas acessadas há mais tempo são removidas.
+    """
+
+    def __init__(self, path: str, max_entries: int = 500):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS report_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_report_cache_accessed ON report_cache (accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        """Hash dos prompts renderizados e dos parâmetros de geração"""
+        payload = json.dumps(
+            [system_prompt, user_prompt, model, temperature],
+            ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna a resposta armazenada (ou None) e atualiza o horário de acesso"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM report_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE report_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            return json.loads(row[0])
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """Armazena uma resposta, removendo as menos acessadas se passar do limite"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO report_cache (key, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), now, now)
+            )
+            conn.execute(
+                """
+                DELETE FROM report_cache WHERE key IN (
+                    SELECT key FROM report_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+    def clear(self) -> int:
+        """Remove todas as entradas; retorna quantas foram removidas"""
+        with self._lock, self._connect() as conn:
+            return conn.execute("DELETE FROM report_cache").rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Ocupação do cache"""
+        with self._lock, self._connect() as conn:
+            size = conn.execute("SELECT COUNT(*) FROM report_cache").fetchone()[0]
+        return {"size": size, "max_entries": self.max_entries, "path": str(self.path)}
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Uma conexão por operação: as chamadas chegam de threads diferentes (asyncio.to_thread)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
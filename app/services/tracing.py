@@ -0,0 +1,164 @@
+"""
+Rastreamento das chamadas ao banco e à LLM feitas durante uma requisição
+Base do cabeçalho Server-Timing e da detecção de padrões N+1 (ver app/api/tracing.py)
+"""
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.metrics import current_db_method
+
+
+# Tamanho máximo de cada valor de filtro no resumo (listas de IDs são longas)
+MAX_FILTER_VALUE_LENGTH = 60
+
+# Parâmetros do PostgREST que não são filtros
+_NON_FILTER_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+_SQL_FROM = re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE)
+_SQL_FUNCTION = re.compile(r"\bSELECT\s+([\w.]+)\s*\(", re.IGNORECASE)
+
+
+@dataclass
+class TraceEntry:
+    """Uma chamada ao banco (tabela, view ou RPC) ou à LLM"""
+    kind: str
+    target: str
+    method: str
+    filters: str
+    rows: Optional[int]
+    duration_ms: float
+
+
+class RequestTrace:
+    """Chamadas registradas durante uma requisição, na ordem em que terminaram"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.entries: List[TraceEntry] = []
+
+    def record(self, kind: str, target: str, duration_ms: float,
+               filters: str = "", rows: Optional[int] = None) -> None:
+        self.entries.append(TraceEntry(
+            kind=kind,
+            target=target,
+            method=current_db_method.get(),
+            filters=filters,
+            rows=rows,
+            duration_ms=duration_ms
+        ))
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """Quantidade e soma das durações por tipo de chamada (db, llm)"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            total = totals.setdefault(entry.kind, {"count": 0, "duration_ms": 0.0})
+            total["count"] += 1
+            total["duration_ms"] += entry.duration_ms
+        return totals
+
+    def queries_per_target(self) -> Counter:
+        """Consultas ao banco por tabela/RPC"""
+        return Counter(entry.target for entry in self.entries if entry.kind == "db")
+
+    def server_timing(self, total_ms: float) -> str:
+        """
+        Valor do cabeçalho Server-Timing
+
+        As durações de db e llm são somas: chamadas em paralelo podem somar mais que `total`.
+        """
+        metrics = []
+        for kind, total in sorted(self.totals().items()):
+            unit = "queries" if kind == "db" else "calls"
+            metrics.append(f'{kind};dur={total["duration_ms"]:.1f};desc="{total["count"]} {unit}"')
+        metrics.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(metrics)
+
+    def summary(self, total_ms: float) -> str:
+        """Resumo legível das chamadas (uma linha por chamada)"""
+        lines = [f"{self.method} {self.path}: {len(self.entries)} chamadas em {total_ms:.1f}ms"]
+        for entry in self.entries:
+            rows = "-" if entry.rows is None else entry.rows
+            filters = f" [{entry.filters}]" if entry.filters else ""
+            lines.append(
+                f"  {entry.kind:<3} {entry.duration_ms:8.1f}ms  rows={rows:<6} "
+                f"{entry.target} ({entry.method}){filters}"
+            )
+        return "\n".join(lines)
+
+
+# Rastreamento da requisição atual (None fora de requisições rastreadas, ex: jobs)
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def record_call(kind: str, target: str, duration_ms: float,
+                filters: str = "", rows: Optional[int] = None) -> None:
+    """Registra uma chamada no rastreamento da requisição atual (sem efeito se não houver)"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(kind, target, duration_ms, filters, rows)
+
+
+def format_filters(params: Iterable[Tuple[str, Any]]) -> str:
+    """Filtros (pares nome/valor) como `coluna=valor`, com valores longos truncados"""
+    parts = []
+    for name, value in params:
+        if name in _NON_FILTER_PARAMS or value is None:
+            continue
+        value = str(value)
+        if len(value) > MAX_FILTER_VALUE_LENGTH:
+            value = value[:MAX_FILTER_VALUE_LENGTH] + "…"
+        parts.append(f"{name}={value}")
+    return ", ".join(parts)
+
+
+def sql_target(sql: str) -> str:
+    """Tabela (primeiro FROM) ou função consultada por um SQL"""
+    match = _SQL_FROM.search(sql) or _SQL_FUNCTION.search(sql)
+    return match.group(1) if match else "sql"
+
+
+# =============================================================================
+# EVENT HOOKS DO HTTPX (PostgREST)
+# =============================================================================
+
+async def trace_postgrest_request(request) -> None:
+    """Marca o início da requisição ao PostgREST"""
+    if current_trace.get() is not None:
+        request.extensions["trace_started"] = time.perf_counter()
+
+
+async def trace_postgrest_response(response) -> None:
+    """Registra tabela/RPC, filtros, linhas e duração (até a chegada dos cabeçalhos)"""
+    started = response.request.extensions.get("trace_started")
+    if started is None:
+        return
+
+    url = response.request.url
+    target = url.path.split("/rest/v1/", 1)[-1]
+    record_call(
+        "db",
+        target,
+        (time.perf_counter() - started) * 1000,
+        filters=format_filters(url.params.multi_items()),
+        rows=_content_range_rows(response.headers.get("content-range"))
+    )
+
+
+def _content_range_rows(content_range: Optional[str]) -> Optional[int]:
+    """Linhas devolvidas, a partir do Content-Range do PostgREST (ex: `0-24/*`, `*/0`)"""
+    if not content_range:
+        return None
+    window = content_range.split("/", 1)[0]
+    if window == "*":
+        return 0
+    try:
+        start, end = window.split("-", 1)
+        return int(end) - int(start) + 1
+    except ValueError:
+        return None
@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks offline dos caminhos de agregação (ver benchmarks/run.py)
+"""
@@ -0,0 +1,47 @@
+"""
+Banco local para benchmarks
+AsyncDatabaseService real, com o cliente PostgREST apontado (sem rede) para o
+PostgrestStub sobre um SyntheticDataset: consultas, paginação e divisão em blocos
+são as mesmas da produção
+"""
+
+from collections import Counter
+
+import httpx
+
+from app.services.database import AsyncDatabaseService
+from benchmarks.stubs import PostgrestStub
+from benchmarks.synthetic import SyntheticDataset
+
+
+class StubDatabaseService(AsyncDatabaseService):
+    """
+    AsyncDatabaseService servido pelo PostgrestStub, em processo (httpx.ASGITransport)
+
+    `calls` conta as requisições HTTP ao PostgREST por tabela/RPC (cada uma seria
+    uma ida ao banco); `latency_ms` é somada a cada requisição pelo stub.
+    """
+
+    def __init__(self, dataset: SyntheticDataset, latency_ms: float = 0):
+        super().__init__()
+        self.data = dataset
+        self.stub = PostgrestStub(dataset, latency_ms=latency_ms)
+        self.calls: Counter = Counter()
+
+        session = self.client.session
+        hooks = session.event_hooks
+        self.client.session = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.stub.app),
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=session.timeout,
+            event_hooks={"request": [*hooks["request"], self._count_request], "response": list(hooks["response"])},
+        )
+        self._unused_session = session
+
+    async def close(self) -> None:
+        await super().close()
+        await self._unused_session.aclose()
+
+    async def _count_request(self, request: httpx.Request) -> None:
+        self.calls[request.url.path.rsplit("/rest/v1/", 1)[-1]] += 1
@@ -0,0 +1,356 @@
+"""
+Teste de carga ponta a ponta da API
+
+Sobe os stand-ins do PostgREST e da OpenAI (benchmarks/stubs.py), inicia a API
+real (uvicorn app.main:app) apontando para eles e simula usuários simultâneos
+navegando pelas páginas do front-end:
+
+- Dashboard (Index.tsx): GET /api/dashboard com filtros
+- Eventos (Events.tsx): GET /api/events e páginas seguintes por cursor
+- Relatórios (Reports.tsx): status, lista de eventos e POST /api/reports/stream (SSE)
+
+Cada etapa de `--users` roda por `--duration` segundos (laço fechado: cada usuário
+espera a resposta e um tempo de reflexão antes da próxima página) e imprime vazão
+e percentis de latência por endpoint.
+
+Uso:
+    python -m benchmarks.loadtest --users 10,50,100 --duration 30
+    python -m benchmarks.loadtest --users 20 --mix dashboard=1 --workers 4
+    python -m benchmarks.loadtest --api-url http://localhost:8000   # API já em execução
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.stubs import add_stub_arguments
+from benchmarks.synthetic import LOCATIONS, SPORTS
+
+# Filtros que o dashboard oferece (combinados aleatoriamente por visita)
+DASHBOARD_FILTERS = [
+    {},
+    {"sport": "corrida"},
+    {"sport": "corrida,triathlon"},
+    {"date_from": "2025-01-01", "date_to": "2025-06-30"},
+    {"sport": "ciclismo", "date_from": "2024-03-10", "date_to": "2024-11-20"},
+    {"location": "São Paulo"},
+    {"brand": "Nike,Adidas"},
+]
+
+REPORT_TYPES = ("market_share", "audience_segmentation", "event_metrics")
+
+# Rótulo do tempo até o primeiro trecho do relatório (não é uma requisição a mais)
+FIRST_CHUNK_SUFFIX = " (1º trecho)"
+
+
+# =============================================================================
+# COLETA DE RESULTADOS
+# =============================================================================
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+class Recorder:
+    """Latências por endpoint (rótulo = método + rota template)"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.started = time.perf_counter()
+
+    def record(self, label: str, elapsed_ms: float, ok: bool) -> None:
+        stats = self.endpoints[label]
+        if ok:
+            stats.latencies_ms.append(elapsed_ms)
+        else:
+            stats.errors += 1
+
+    def report(self, users: int) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        rows = {}
+        for label, stats in sorted(self.endpoints.items()):
+            latencies = sorted(stats.latencies_ms)
+            rows[label] = {
+                "requests": len(latencies),
+                "errors": stats.errors,
+                "rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": _percentile(latencies, 50),
+                "p90_ms": _percentile(latencies, 90),
+                "p99_ms": _percentile(latencies, 99),
+                "max_ms": round(latencies[-1], 1) if latencies else None,
+            }
+        return {"users": users, "duration_s": round(elapsed, 1), "endpoints": rows}
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Percentil pelo método nearest-rank"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return round(sorted_values[int(rank) - 1], 1)
+
+
+# =============================================================================
+# PÁGINAS (mesmas requisições do front-end)
+# =============================================================================
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+
+    async def request(self, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record(label, (time.perf_counter() - started) * 1000, ok)
+        return response if ok else None
+
+    async def dashboard(self) -> None:
+        """Index.tsx: uma requisição agregada por combinação de filtros"""
+        params = {"page_size": 10, **self.rng.choice(DASHBOARD_FILTERS)}
+        await self.request("GET /api/dashboard", "GET", "/api/dashboard", params=params)
+
+    async def events(self) -> None:
+        """Events.tsx: primeira página e rolagem por cursor"""
+        params: Dict[str, Any] = {"limit": 10, "offset": 0}
+        if self.rng.random() < 0.3:
+            params["sport"] = self.rng.choice(SPORTS)
+        for page in range(self.rng.randint(1, 4)):
+            label = "GET /api/events" if page == 0 else "GET /api/events?cursor"
+            response = await self.request(label, "GET", "/api/events", params=params)
+            cursor = response.json().get("next_cursor") if response is not None else None
+            if not cursor:
+                break
+            params = {"limit": 10, "cursor": cursor, **({"sport": params["sport"]} if "sport" in params else {})}
+
+    async def reports(self) -> None:
+        """Reports.tsx: status, eventos para o seletor e geração em streaming"""
+        await self.request("GET /api/reports/status", "GET", "/api/reports/status")
+        response = await self.request("GET /api/events (reports)", "GET", "/api/events", params={"limit": 100, "offset": 0})
+        events = response.json().get("events", []) if response is not None else []
+
+        report_type = self.rng.choice(REPORT_TYPES)
+        if report_type == "event_metrics":
+            if not events:
+                return
+            filters = {"event_id": self.rng.choice(events)["id"], "focus": "general"}
+        else:
+            month = self.rng.randint(1, 12)
+            filters = {
+                "date_from": f"2025-{month:02d}-01",
+                "date_to": f"2025-{month:02d}-28",
+                "sport": self.rng.choice((None,) + SPORTS),
+                "location": self.rng.choice((None,) + tuple(loc.split(",")[0] for loc in LOCATIONS)),
+            }
+            filters = {k: v for k, v in filters.items() if v is not None}
+        await self._stream_report({"type": report_type, "filters": filters})
+
+    async def _stream_report(self, body: Dict[str, Any]) -> None:
+        """POST /api/reports/stream até o evento `done` (registra também o tempo até o 1º trecho)"""
+        label = "POST /api/reports/stream"
+        started = time.perf_counter()
+        first_delta = None
+        ok = False
+        try:
+            async with self.client.stream("POST", "/api/reports/stream", json=body,
+                                          headers={"Accept": "text/event-stream"}) as response:
+                if response.status_code < 400:
+                    async for line in response.aiter_lines():
+                        if line == "event: delta" and first_delta is None:
+                            first_delta = (time.perf_counter() - started) * 1000
+                        elif line == "event: done":
+                            ok = True
+                        elif line == "event: error":
+                            break
+        except httpx.HTTPError:
+            ok = False
+        self.recorder.record(label, (time.perf_counter() - started) * 1000, ok)
+        if first_delta is not None:
+            self.recorder.record(f"{label}{FIRST_CHUNK_SUFFIX}", first_delta, True)
+
+
+async def run_step(api_url: str, users: int, duration: float, mix: Dict[str, float],
+                   think_ms: float, seed: int) -> Dict[str, Any]:
+    """Uma etapa: `users` usuários simultâneos por `duration` segundos"""
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    pages, weights = zip(*mix.items())
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=120, limits=limits) as client:
+        async def user_loop(index: int) -> None:
+            rng = random.Random(seed * 1000 + index)
+            user = VirtualUser(client, recorder, rng)
+            # Chegadas espalhadas no primeiro segundo (evita uma rajada sincronizada)
+            await asyncio.sleep(rng.random())
+            while time.perf_counter() < deadline:
+                page = rng.choices(pages, weights)[0]
+                await getattr(user, page)()
+                await asyncio.sleep(rng.expovariate(1000 / think_ms) if think_ms else 0)
+
+        await asyncio.gather(*(user_loop(i) for i in range(users)))
+
+    return recorder.report(users)
+
+
+def print_step(result: Dict[str, Any]) -> None:
+    print(f"\n== {result['users']} usuários, {result['duration_s']}s")
+    print(f"  {'endpoint':<38} {'req':>6} {'err':>5} {'req/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    total = 0
+    for label, row in result["endpoints"].items():
+        if not label.endswith(FIRST_CHUNK_SUFFIX):
+            total += row["rps"]
+        cells = [row[k] if row[k] is not None else "-" for k in ("p50_ms", "p90_ms", "p99_ms", "max_ms")]
+        print(
+            f"  {label:<38} {row['requests']:>6} {row['errors']:>5} {row['rps']:>8.2f} "
+            + " ".join(f"{cell:>8}" for cell in cells)
+        )
+    print(f"  {'total':<38} {'':>6} {'':>5} {total:>8.2f}")
+
+
+# =============================================================================
+# PROCESSOS (stubs + API)
+# =============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Processo encerrou antes de ficar pronto ({url})")
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Tempo esgotado aguardando {url}")
+
+
+def _start_stubs(args: argparse.Namespace, postgrest_port: int, openai_port: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "benchmarks.stubs",
+        "--postgrest-port", str(postgrest_port), "--openai-port", str(openai_port),
+        "--events", str(args.events), "--persons", str(args.persons), "--seed", str(args.seed),
+        "--db-latency-ms", str(args.db_latency_ms),
+        "--llm-first-token-ms", str(args.llm_first_token_ms),
+        "--llm-token-ms", str(args.llm_token_ms), "--llm-tokens", str(args.llm_tokens),
+    ]
+    return subprocess.Popen(command)
+
+
+def _start_api(args: argparse.Namespace, port: int, postgrest_port: int, openai_port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SUPABASE_URL": f"http://127.0.0.1:{postgrest_port}",
+        "SUPABASE_ANON_KEY": "loadtest.anon.key",
+        "DATABASE_BACKEND": "supabase",
+        "OPENAI_API_KEY": "sk-loadtest",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        # Cada geração chega à "OpenAI" (pior caso), a menos que --report-cache
+        "REPORT_CACHE_ENABLED": "true" if args.report_cache else "false",
+        "ANALYTICS_SNAPSHOT_ENABLED": "false",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        page, _, weight = part.partition("=")
+        if page not in ("dashboard", "events", "reports"):
+            raise argparse.ArgumentTypeError(f"Página inválida no mix: {page}")
+        mix[page] = float(weight or 1)
+    return mix
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga ponta a ponta da API")
+    parser.add_argument("--users", default="10,25,50", help="Usuários simultâneos por etapa, separados por vírgula")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos por etapa")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("dashboard=6,events=3,reports=1"),
+                        help="Peso de cada página (dashboard, events, reports)")
+    parser.add_argument("--think-ms", type=float, default=1000, help="Tempo médio de reflexão entre páginas")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn da API")
+    parser.add_argument("--report-cache", action="store_true", help="Mantém o cache de relatórios ligado")
+    parser.add_argument("--api-url", help="Usa uma API já em execução (não inicia stubs nem API)")
+    parser.add_argument("--json", dest="json_path", help="Grava os resultados em JSON")
+    add_stub_arguments(parser)
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> int:
+    steps = [int(users) for users in args.users.split(",") if users.strip()]
+    processes: List[subprocess.Popen] = []
+    api_url = args.api_url
+
+    try:
+        if api_url is None:
+            postgrest_port, openai_port, api_port = _free_port(), _free_port(), _free_port()
+            stubs = _start_stubs(args, postgrest_port, openai_port)
+            processes.append(stubs)
+            await _wait_ready(f"http://127.0.0.1:{postgrest_port}/rest/v1/rpc/get_data_version", stubs, 600)
+            api = _start_api(args, api_port, postgrest_port, openai_port)
+            processes.append(api)
+            api_url = f"http://127.0.0.1:{api_port}"
+            await _wait_ready(f"{api_url}/health", api, 60)
+
+        results = []
+        for users in steps:
+            result = await run_step(api_url, users, args.duration, args.mix, args.think_ms, args.seed)
+            print_step(result)
+            results.append(result)
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    if args.json_path:
+        config = {k: v for k, v in vars(args).items() if k != "json_path"}
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "steps": results}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.json_path}")
+
+    # Falha apenas se nada respondeu (ex: API ou stubs mal configurados)
+    succeeded = sum(row["requests"] for result in results for row in result["endpoints"].values())
+    return 0 if succeeded else 1
+
+
+def main(argv: List[str] = None) -> int:
+    return asyncio.run(_run(_parse_args(sys.argv[1:] if argv is None else argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Micro-benchmarks dos caminhos de agregação (offline, sem banco)
+
+Mede EventsService.get_brand_time_series e a coleta de dados dos relatórios
+(ReportsService._collect_*) sobre dados sintéticos, em vários tamanhos, e
+compara com a baseline gravada. O AsyncDatabaseService é o real, com o cliente
+PostgREST ligado em processo ao PostgrestStub (benchmarks/fake_db.py): chamadas
+ao banco são as requisições HTTP efetivamente feitas.
+
+- resultado diferente (digest) ou mais chamadas ao banco: falha
+- com --check-time, tempo mediano acima de baseline × (1 + tolerância) e pelo
+  menos `min-delta-ms`: falha (sem a flag, o tempo é apenas exibido)
+
+Uso:
+    python -m benchmarks.run                            # compara com benchmarks/baseline.json
+    python -m benchmarks.run --check-time               # também falha se ficar mais lento
+    python -m benchmarks.run --update-baseline          # regrava a baseline
+    python -m benchmarks.run --sizes 10,1000,100000     # 100k eventos (~12M itens gerados)
+
+Os tempos dependem da máquina: só use --check-time com uma baseline gravada na
+mesma máquina em que a comparação roda (ex: o runner de CI).
+"""
+
+import os
+
+# As configurações exigem credenciais do Supabase (formato de JWT), que os benchmarks não usam
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark.offline.key")
+
+import argparse
+import asyncio
+import hashlib
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.core.events import EventsService
+from app.core.reports import ReportsService
+from app.schemas.reports import AudienceSegmentationFilters, EventMetricsFilters, MarketShareFilters
+from benchmarks.fake_db import StubDatabaseService
+from benchmarks.synthetic import SyntheticDataset
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_SIZES = "10,100,1000"
+
+# Período coberto pelos dados sintéticos (ver synthetic.START_DATE)
+PERIOD_FROM = date(2024, 1, 1)
+PERIOD_TO = date(2025, 12, 31)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[StubDatabaseService, SyntheticDataset], Awaitable[Any]]
+
+
+def _reports(db: StubDatabaseService) -> ReportsService:
+    return ReportsService(db, openai_service=None)
+
+
+BENCHMARKS = [
+    Benchmark(
+        # Datas fora dos limites de mês: caminho por evento (brand_event_summary)
+        "events.get_brand_time_series",
+        lambda db, data: EventsService(db).get_brand_time_series(
+            date_from="2024-01-15", date_to="2025-12-15"
+        ),
+    ),
+    Benchmark(
+        # Meses completos: rollup brand_month_summary
+        "events.get_brand_time_series[mensal]",
+        lambda db, data: EventsService(db).get_brand_time_series(
+            date_from=PERIOD_FROM.isoformat(), date_to=PERIOD_TO.isoformat()
+        ),
+    ),
+    Benchmark(
+        "reports._collect_market_share_data",
+        lambda db, data: _reports(db)._collect_market_share_data(
+            MarketShareFilters(date_from=PERIOD_FROM, date_to=PERIOD_TO)
+        ),
+    ),
+    Benchmark(
+        "reports._collect_audience_data",
+        lambda db, data: _reports(db)._collect_audience_data(
+            AudienceSegmentationFilters(date_from=PERIOD_FROM, date_to=PERIOD_TO)
+        ),
+    ),
+    Benchmark(
+        "reports._collect_event_data",
+        lambda db, data: _reports(db)._collect_event_data(
+            EventMetricsFilters(event_id=data.events[0]["id"])
+        ),
+    ),
+]
+
+
+# =============================================================================
+# MEDIÇÃO
+# =============================================================================
+
+async def measure(bench: Benchmark, data: SyntheticDataset, repeat: int, latency_ms: float) -> Dict[str, Any]:
+    """
+    Executa um benchmark: uma rodada de aquecimento (resultado e chamadas ao banco)
+    e `repeat` rodadas cronometradas
+    """
+    db = StubDatabaseService(data, latency_ms=latency_ms)
+    timings = []
+    try:
+        result = await bench.run(db, data)
+        db_calls = sum(db.calls.values())
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await bench.run(db, data)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        await db.close()
+
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "db_calls": db_calls,
+        "digest": _digest(result),
+    }
+
+
+def _digest(result: Any) -> str:
+    """Impressão digital do resultado (detecta mudança de comportamento)"""
+    payload = json.dumps(result, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float,
+    check_time: bool = False
+) -> List[str]:
+    """Regressões de um benchmark em relação à baseline (tempo só com check_time)"""
+    problems = []
+    if current["digest"] != baseline["digest"]:
+        problems.append(f"resultado mudou ({baseline['digest']} -> {current['digest']})")
+    if current["db_calls"] > baseline["db_calls"]:
+        problems.append(f"chamadas ao banco {baseline['db_calls']} -> {current['db_calls']}")
+    if not check_time:
+        return problems
+    limit = baseline["median_ms"] * (1 + tolerance)
+    if current["median_ms"] > limit and current["median_ms"] - baseline["median_ms"] >= min_delta_ms:
+        problems.append(
+            f"mais lento: {current['median_ms']:.2f}ms (baseline {baseline['median_ms']:.2f}ms, "
+            f"limite {limit:.2f}ms)"
+        )
+    return problems
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks dos caminhos de agregação")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Quantidades de eventos, separadas por vírgula")
+    parser.add_argument("--persons", type=int, default=50, help="Pessoas por evento (média)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="Rodadas cronometradas por benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latência simulada por chamada ao banco")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Grava os resultados como baseline")
+    parser.add_argument(
+        "--check-time", action="store_true",
+        help="Falha também se o tempo mediano piorar (baseline gravada na mesma máquina)"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Folga relativa no tempo (0.5 = +50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2, help="Diferença mínima de tempo para falhar")
+    parser.add_argument("--only", help="Roda apenas benchmarks cujo nome contém este texto")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> int:
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    benchmarks = [b for b in BENCHMARKS if not args.only or args.only in b.name]
+    config = {"persons_per_event": args.persons, "seed": args.seed, "latency_ms": args.latency_ms}
+
+    baseline = None
+    if not args.update_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("config") != config:
+            print(f"Baseline gerada com outra configuração ({baseline.get('config')}); use --update-baseline")
+            return 2
+
+    results: Dict[str, Dict[str, Any]] = {}
+    failures = 0
+    for size in sizes:
+        started = time.perf_counter()
+        data = SyntheticDataset(size, persons_per_event=args.persons, seed=args.seed)
+        shape = data.describe()
+        print(
+            f"\n== {size} eventos ({shape['persons']} pessoas, {shape['items']} itens; "
+            f"gerados em {time.perf_counter() - started:.1f}s)"
+        )
+        results[str(size)] = {}
+        for bench in benchmarks:
+            current = await measure(bench, data, args.repeat, args.latency_ms)
+            results[str(size)][bench.name] = current
+
+            base = (baseline or {}).get("results", {}).get(str(size), {}).get(bench.name)
+            problems = compare(current, base, args.tolerance, args.min_delta_ms, args.check_time) if base else []
+            status = "sem baseline" if base is None and baseline is not None else ("FALHOU" if problems else "ok")
+            failures += bool(problems)
+            delta = f" ({current['median_ms'] / base['median_ms'] - 1:+.0%})" if base and base["median_ms"] else ""
+            print(
+                f"  {bench.name:<40} {current['median_ms']:10.2f}ms{delta:<8} "
+                f"db={current['db_calls']:<4} {status}"
+            )
+            for problem in problems:
+                print(f"      - {problem}")
+
+    if args.update_baseline:
+        # Rodadas parciais (--sizes/--only) atualizam só o que foi medido
+        if args.baseline.exists():
+            previous = json.loads(args.baseline.read_text(encoding="utf-8"))
+            if previous.get("config") == config:
+                for size, benches in previous.get("results", {}).items():
+                    results[size] = {**benches, **results.get(size, {})}
+        payload = {
+            "config": config,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nBaseline gravada em {args.baseline}")
+        return 0
+
+    if failures:
+        print(f"\n{failures} regressão(ões) em relação à baseline")
+        return 1
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    return asyncio.run(_run(_parse_args(sys.argv[1:] if argv is None else argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
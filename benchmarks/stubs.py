@@ -0,0 +1,386 @@
+"""
+Stand-ins locais do Supabase REST (PostgREST) e da API da OpenAI para testes de carga
+
+- PostgREST: subconjunto usado pela API (select, filtros eq/neq/gt/gte/lt/lte/in/ilike/is,
+  or/and, order, limit/offset, Prefer count=exact, objeto único e as RPCs de leitura
+  get_data_version, get_dashboard_metrics e get_dashboard_summary)
+  sobre um SyntheticDataset
+- OpenAI: POST /v1/chat/completions, com e sem streaming, com latência configurável
+
+Uso (normalmente iniciado por benchmarks/loadtest.py):
+    python -m benchmarks.stubs --events 1000 --postgrest-port 54321 --openai-port 54322
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks.synthetic import Row, SyntheticDataset
+
+Predicate = Callable[[Row], bool]
+
+
+# =============================================================================
+# POSTGREST
+# =============================================================================
+
+class PostgrestStub:
+    """
+    Leituras do PostgREST servidas de um SyntheticDataset
+
+    `latency_ms` é somada a cada requisição (rede + execução no banco).
+    """
+
+    RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self, data: SyntheticDataset, latency_ms: float = 0):
+        self.data = data
+        self.latency_ms = latency_ms
+        self.app = Starlette(routes=[
+            Route("/rest/v1/rpc/{function}", self.rpc, methods=["POST", "GET"]),
+            Route("/rest/v1/{table}", self.select, methods=["GET"]),
+        ])
+
+    async def select(self, request: Request) -> Response:
+        await self._wait()
+        table = request.path_params["table"]
+        params = list(request.query_params.multi_items())
+
+        try:
+            predicates = [self._parse_param(name, value) for name, value in params if name not in self.RESERVED_PARAMS]
+            rows = self._rows(table, self._event_scope(params))
+        except KeyError:
+            return self._error(404, f'relation "public.{table}" does not exist')
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        rows = [row for row in rows if all(predicate(row) for predicate in predicates)]
+        query = request.query_params
+        if query.get("order"):
+            rows = self._order(rows, query["order"])
+        total = len(rows)
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+        rows = rows[offset:offset + limit if limit is not None else None]
+        rows = self._project(rows, query.get("select", "*"))
+
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(rows) != 1:
+                return self._error(
+                    406, "JSON object requested, multiple (or no) rows returned",
+                    details=f"The result contains {len(rows)} rows", code="PGRST116"
+                )
+            return JSONResponse(rows[0])
+
+        count = str(total) if "count=exact" in request.headers.get("prefer", "") else "*"
+        window = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+        return JSONResponse(rows, headers={"Content-Range": f"{window}/{count}"})
+
+    async def rpc(self, request: Request) -> Response:
+        await self._wait()
+        function = request.path_params["function"]
+        body = await request.json() if request.method == "POST" else {}
+
+        if function == "get_data_version":
+            return JSONResponse(f"synthetic-{self.data.seed}-{self.data.size}")
+        if function == "get_dashboard_metrics":
+            return JSONResponse([self._dashboard_metrics(body or {})])
+        if function == "get_dashboard_summary":
+            return JSONResponse(self._dashboard_summary(body or {}))
+        return self._error(404, f"Could not find the function public.{function}")
+
+    async def _wait(self) -> None:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    # -------------------------------------------------------------------------
+    # Dados
+    # -------------------------------------------------------------------------
+
+    def _rows(self, table: str, event_ids: Optional[List[str]]) -> Iterable[Row]:
+        """Linhas da tabela; pessoas e itens só dos eventos filtrados, se houver filtro por event_id"""
+        data = self.data
+        if table == "events":
+            return data.events
+        if table in ("brand_event_summary", "product_event_summary"):
+            summaries = data.brand_summaries if table == "brand_event_summary" else data.product_summaries
+            ids = event_ids if event_ids is not None else summaries.keys()
+            return [row for e in ids for row in summaries.get(e, [])]
+        if table == "brand_month_summary":
+            return data.brand_month_summary
+        if table in ("event_persons", "person_items"):
+            ids = event_ids if event_ids is not None else [e["id"] for e in data.events]
+            rows_for = data.persons_for if table == "event_persons" else data.items_for
+            return [row for e in ids if e in data.events_by_id for row in rows_for(e)]
+        raise KeyError(table)
+
+    @staticmethod
+    def _event_scope(params: List[Tuple[str, str]]) -> Optional[List[str]]:
+        """event_ids de um filtro event_id=eq/in (evita gerar pessoas e itens de todos os eventos)"""
+        for name, value in params:
+            if name == "event_id":
+                if value.startswith("eq."):
+                    return [value[3:]]
+                if value.startswith("in.("):
+                    return [v.strip('"') for v in value[4:-1].split(",")]
+        return None
+
+    def _filtered_events(self, body: Dict[str, Any]) -> List[Row]:
+        """Eventos que atendem aos filtros p_* das RPCs (mesma semântica das funções do banco)"""
+        sports, types, locations = body.get("p_sports"), body.get("p_event_types"), body.get("p_locations")
+        date_from, date_to = body.get("p_date_from"), body.get("p_date_to")
+        return [
+            e for e in self.data.events
+            if (not sports or e["sport"] in sports)
+            and (not types or e["event_type"] in types)
+            and (not locations or any(loc.lower() in e["event_location"].lower() for loc in locations))
+            and (not date_from or e["event_date"] >= date_from)
+            and (not date_to or e["event_date"] <= date_to)
+        ]
+
+    def _dashboard_metrics(self, body: Dict[str, Any], events: Optional[List[Row]] = None) -> Dict[str, Any]:
+        """Mesma agregação da função get_dashboard_metrics do banco"""
+        events = self._filtered_events(body) if events is None else events
+        brands = {row["brand"] for e in events for row in self.data.brand_summaries.get(e["id"], [])}
+        return {
+            "total_events": len(events),
+            "total_photos_analyzed": sum(e["total_photos"] for e in events),
+            "total_athletes_identified": sum(e["total_athletes_estimated"] for e in events),
+            "total_brands_tracked": len(brands),
+        }
+
+    def _dashboard_summary(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Mesma agregação da função get_dashboard_summary do banco (série sempre por evento)"""
+        events = self._filtered_events(body)
+        brands = body.get("p_brands")
+        sports: Dict[str, int] = {}
+        months: Dict[Tuple[str, str], int] = {}
+        for e in events:
+            sports[e["sport"]] = sports.get(e["sport"], 0) + 1
+            for row in self.data.brand_summaries.get(e["id"], []):
+                if not brands or row["brand"] in brands:
+                    key = (e["event_date"][:8] + "01", row["brand"])
+                    months[key] = months.get(key, 0) + row["total_items"]
+        return {
+            "metrics": self._dashboard_metrics(body, events),
+            "sport_distribution": [
+                {"sport": sport, "events": count}
+                for sport, count in sorted(sports.items(), key=lambda x: (-x[1], x[0]))
+            ],
+            "brand_months": [
+                {"month": month, "brand": brand, "total_items": total}
+                for (month, brand), total in sorted(months.items())
+            ],
+        }
+
+    # -------------------------------------------------------------------------
+    # Sintaxe do PostgREST
+    # -------------------------------------------------------------------------
+
+    def _parse_param(self, name: str, value: str) -> Predicate:
+        if name in ("or", "and"):
+            return self._parse_logic(name, value)
+        return self._parse_condition(name, value)
+
+    def _parse_logic(self, operator: str, value: str) -> Predicate:
+        """`or=(a.eq.1,and(b.gt.2,c.lt.3))`"""
+        if not (value.startswith("(") and value.endswith(")")):
+            raise ValueError(f"failed to parse logic tree ({value})")
+        parts = []
+        for term in self._split_top_level(value[1:-1]):
+            match = re.match(r"^(or|and)\((.*)\)$", term)
+            if match:
+                parts.append(self._parse_logic(match.group(1), f"({match.group(2)})"))
+            else:
+                column, condition = term.split(".", 1)
+                parts.append(self._parse_condition(column, condition))
+        if operator == "or":
+            return lambda row: any(part(row) for part in parts)
+        return lambda row: all(part(row) for part in parts)
+
+    @staticmethod
+    def _parse_condition(column: str, condition: str) -> Predicate:
+        """`coluna=op.valor` (ex: sport=eq.corrida, event_id=in.(a,b), event_location=ilike.*SP*)"""
+        operator, _, value = condition.partition(".")
+        if operator == "in":
+            values = {v.strip('"') for v in value.strip("()").split(",")}
+            return lambda row: str(row.get(column)) in values
+        if operator in ("like", "ilike"):
+            pattern = "^" + ".*".join(re.escape(part) for part in re.split(r"[%*]", value)) + "$"
+            regex = re.compile(pattern, re.IGNORECASE if operator == "ilike" else 0)
+            return lambda row: row.get(column) is not None and bool(regex.match(str(row[column])))
+        if operator == "is":
+            expected = {"null": None, "true": True, "false": False}[value]
+            return lambda row: row.get(column) is expected
+
+        compare = {
+            "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+            "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+        }.get(operator)
+        if compare is None:
+            raise ValueError(f"unsupported operator: {operator}")
+
+        def predicate(row: Row) -> bool:
+            current = row.get(column)
+            if current is None:
+                return False
+            target = type(current)(value) if isinstance(current, (int, float)) else value
+            return compare(current, target)
+
+        return predicate
+
+    @staticmethod
+    def _split_top_level(expression: str) -> List[str]:
+        """Divide por vírgulas fora de parênteses"""
+        parts, depth, current = [], 0, ""
+        for char in expression:
+            if char == "," and depth == 0:
+                parts.append(current)
+                current = ""
+                continue
+            depth += (char == "(") - (char == ")")
+            current += char
+        if current:
+            parts.append(current)
+        return parts
+
+    @staticmethod
+    def _order(rows: List[Row], order: str) -> List[Row]:
+        """`order=event_date.desc,id.desc` (ordenação estável, da última coluna para a primeira)"""
+        rows = list(rows)
+        for term in reversed(order.split(",")):
+            column, *modifiers = term.strip().split(".")
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse="desc" in modifiers)
+        return rows
+
+    @staticmethod
+    def _project(rows: List[Row], select: str) -> List[Row]:
+        if select.strip() == "*":
+            return [dict(row) for row in rows]
+        columns = [column.strip() for column in select.split(",")]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    @staticmethod
+    def _error(status: int, message: str, details: Optional[str] = None, code: Optional[str] = None) -> JSONResponse:
+        return JSONResponse(
+            {"code": code or str(status), "message": message, "details": details, "hint": None}, status_code=status
+        )
+
+
+# =============================================================================
+# OPENAI
+# =============================================================================
+
+class OpenAIStub:
+    """
+    POST /v1/chat/completions com texto fixo
+
+    `first_token_ms` é o tempo até o primeiro token e `token_ms` o intervalo entre
+    tokens; uma resposta completa leva first_token_ms + tokens × token_ms.
+    """
+
+    def __init__(self, first_token_ms: float = 500, token_ms: float = 10, tokens: int = 300):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.tokens = tokens
+        self.app = Starlette(routes=[Route("/v1/chat/completions", self.completions, methods=["POST"])])
+
+    async def completions(self, request: Request) -> Response:
+        body = await request.json()
+        model = body.get("model", "gpt-4o-mini")
+        words = [f"palavra{i % 50} " for i in range(self.tokens)]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        if body.get("stream"):
+            return StreamingResponse(self._stream(completion_id, model, words), media_type="text/event-stream")
+
+        await asyncio.sleep((self.first_token_ms + self.token_ms * self.tokens) / 1000)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(words)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 800, "completion_tokens": self.tokens, "total_tokens": 800 + self.tokens},
+        })
+
+    async def _stream(self, completion_id: str, model: str, words: List[str]):
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        await asyncio.sleep(self.first_token_ms / 1000)
+        yield chunk({"role": "assistant", "content": ""})
+        for word in words:
+            yield chunk({"content": word})
+            if self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+        yield chunk({}, "stop")
+        yield "data: [DONE]\n\n"
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def serve(args: argparse.Namespace) -> None:
+    data = SyntheticDataset(args.events, persons_per_event=args.persons, seed=args.seed)
+    postgrest = PostgrestStub(data, latency_ms=args.db_latency_ms)
+    openai = OpenAIStub(args.llm_first_token_ms, args.llm_token_ms, args.llm_tokens)
+
+    servers = [
+        uvicorn.Server(uvicorn.Config(postgrest.app, host=args.host, port=args.postgrest_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(openai.app, host=args.host, port=args.openai_port, log_level="warning")),
+    ]
+    shape = data.describe()
+    print(
+        f"Stubs prontos: PostgREST em {args.host}:{args.postgrest_port} ({shape['events']} eventos, "
+        f"{shape['items']} itens), OpenAI em {args.host}:{args.openai_port}",
+        flush=True
+    )
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Opções dos stubs (compartilhadas com benchmarks/loadtest.py)"""
+    parser.add_argument("--events", type=int, default=1000, help="Eventos sintéticos")
+    parser.add_argument("--persons", type=int, default=50, help="Pessoas por evento (média)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-latency-ms", type=float, default=5, help="Latência de cada requisição ao PostgREST")
+    parser.add_argument("--llm-first-token-ms", type=float, default=500, help="Tempo até o primeiro token")
+    parser.add_argument("--llm-token-ms", type=float, default=10, help="Intervalo entre tokens")
+    parser.add_argument("--llm-tokens", type=int, default=300, help="Tokens por resposta")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-ins do PostgREST e da OpenAI")
+    add_stub_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--postgrest-port", type=int, default=54321)
+    parser.add_argument("--openai-port", type=int, default=54322)
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Gerador determinístico de dados sintéticos
+Segue o schema de docs/context/script_database/database_schema_and_seed.sql
+(events, event_persons, person_items e os resumos derivados deles)
+
+Pessoas e itens são gerados sob demanda por evento (a partir de uma semente
+derivada do índice do evento): 100k eventos e milhões de itens não precisam
+caber em memória ao mesmo tempo. Apenas eventos e resumos ficam materializados.
+"""
+
+import random
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+# Valores permitidos pelas constraints do banco
+SPORTS = ("corrida", "triathlon", "ciclismo", "vôlei", "futebol")
+EVENT_TYPES = ("prova", "treino")
+GENDERS = ("M", "F", "Outro")
+GENDER_WEIGHTS = (52, 46, 2)
+BRANDS = ("Nike", "Adidas", "Mizuno", "Track&Field", "Asics", "Olympikus")
+BRAND_WEIGHTS = (30, 20, 15, 8, 15, 12)
+# Tipo de produto -> probabilidade de uma pessoa usá-lo
+PRODUCT_TYPES = {"tênis": 0.9, "camiseta": 0.7, "short": 0.5, "óculos": 0.2, "boné": 0.25}
+LOCATIONS = (
+    "São Paulo, SP", "Rio de Janeiro, RJ", "Belo Horizonte, MG", "Curitiba, PR",
+    "Porto Alegre, RS", "Florianópolis, SC", "Recife, PE", "Salvador, BA",
+    "Brasília, DF", "Fortaleza, CE",
+)
+
+START_DATE = date(2024, 1, 1)
+DATE_SPAN_DAYS = 730
+
+Row = Dict[str, Any]
+
+
+class SyntheticDataset:
+    """
+    Eventos, pessoas e itens sintéticos com os resumos calculados como no banco
+
+    `events` eventos com, em média, `persons_per_event` pessoas cada (±50%).
+    A mesma (events, persons_per_event, seed) sempre gera os mesmos dados.
+    """
+
+    def __init__(self, events: int, persons_per_event: int = 50, seed: int = 42,
+                 cached_events: int = 2048):
+        self.size = events
+        self.persons_per_event = persons_per_event
+        self.seed = seed
+
+        self.events: List[Row] = []
+        self.events_by_id: Dict[str, Row] = {}
+        self._event_index: Dict[str, int] = {}
+        # Pessoas/itens dos últimos eventos gerados (as leituras repetidas não pagam a geração)
+        self._generated: "OrderedDict[str, Tuple[List[Row], List[Row]]]" = OrderedDict()
+        self._cached_events = cached_events
+        self.brand_summaries: Dict[str, List[Row]] = {}
+        self.product_summaries: Dict[str, List[Row]] = {}
+        self.brand_month_summary: List[Row] = []
+        self.total_persons = 0
+        self.total_items = 0
+
+        self._build()
+
+    # =========================================================================
+    # PESSOAS E ITENS (sob demanda)
+    # =========================================================================
+
+    def persons_for(self, event_id: str) -> List[Row]:
+        """Linhas de event_persons do evento"""
+        return self._event_rows(event_id)[0]
+
+    def items_for(self, event_id: str) -> List[Row]:
+        """Linhas de person_items do evento"""
+        return self._event_rows(event_id)[1]
+
+    def _event_rows(self, event_id: str) -> Tuple[List[Row], List[Row]]:
+        rows = self._generated.get(event_id)
+        if rows is None:
+            rows = self._generated[event_id] = self._generate_event(self.events_by_id[event_id])
+            if len(self._generated) > self._cached_events:
+                self._generated.popitem(last=False)
+        else:
+            self._generated.move_to_end(event_id)
+        return rows
+
+    def _generate_event(self, event: Row) -> Tuple[List[Row], List[Row]]:
+        rng = random.Random(f"{self.seed}:{self._event_index[event['id']]}")
+        persons: List[Row] = []
+        items: List[Row] = []
+
+        for _ in range(event["total_athletes_estimated"]):
+            person_id = self._uuid(rng)
+            persons.append({
+                "id": self._uuid(rng),
+                "event_id": event["id"],
+                "cpf": f"{rng.randrange(10 ** 11):011d}",
+                "person_id": person_id,
+                "age": rng.randint(18, 65),
+                "gender": rng.choices(GENDERS, GENDER_WEIGHTS)[0],
+                "photo_count": rng.randint(1, 12),
+            })
+            for product_type, probability in PRODUCT_TYPES.items():
+                if rng.random() < probability:
+                    items.append({
+                        "id": self._uuid(rng),
+                        "event_id": event["id"],
+                        "person_id": person_id,
+                        "product_type": product_type,
+                        "brand": rng.choices(BRANDS, BRAND_WEIGHTS)[0],
+                        "product_name": None,
+                    })
+        return persons, items
+
+    # =========================================================================
+    # EVENTOS E RESUMOS
+    # =========================================================================
+
+    def _build(self) -> None:
+        rng = random.Random(self.seed)
+        months: Dict[tuple, int] = defaultdict(int)
+
+        for index in range(self.size):
+            sport = rng.choice(SPORTS)
+            location = rng.choice(LOCATIONS)
+            event_date = START_DATE + timedelta(days=rng.randrange(DATE_SPAN_DAYS))
+            low, high = max(1, self.persons_per_event // 2), max(1, self.persons_per_event * 3 // 2)
+            event = {
+                "id": self._uuid(rng),
+                "event_name": f"{sport.capitalize()} {location.split(',')[0]} #{index + 1}",
+                "event_type": rng.choice(EVENT_TYPES),
+                "sport": sport,
+                "event_date": event_date.isoformat(),
+                "event_location": location,
+                "total_photos": 0,
+                "total_athletes_estimated": rng.randint(low, high),
+                "status": "completed",
+            }
+            event["total_photos"] = event["total_athletes_estimated"] * 4
+            self.events.append(event)
+            self.events_by_id[event["id"]] = event
+            self._event_index[event["id"]] = index
+
+            persons, items = self._generate_event(event)
+            self.total_persons += len(persons)
+            self.total_items += len(items)
+            self._summarize(event, persons, items, months)
+
+        # Mesma ordem do PostgREST na listagem (event_date DESC, id DESC)
+        self.events.sort(key=lambda e: (e["event_date"], e["id"]), reverse=True)
+        self.brand_month_summary = [
+            {
+                "month": month, "brand": brand, "sport": sport,
+                "event_type": event_type, "event_location": location, "total_items": total,
+            }
+            for (month, brand, sport, event_type, location), total in sorted(months.items())
+        ]
+
+    def _summarize(self, event: Row, persons: List[Row], items: List[Row], months: Dict[tuple, int]) -> None:
+        """brand_event_summary, product_event_summary e brand_month_summary de um evento"""
+        brand_items: Dict[str, int] = defaultdict(int)
+        brand_persons: Dict[str, set] = defaultdict(set)
+        product_items: Dict[str, int] = defaultdict(int)
+        product_persons: Dict[str, set] = defaultdict(set)
+        for item in items:
+            brand_items[item["brand"]] += 1
+            brand_persons[item["brand"]].add(item["person_id"])
+            product_items[item["product_type"]] += 1
+            product_persons[item["product_type"]].add(item["person_id"])
+
+        total_items = len(items) or 1
+        total_persons = len(persons) or 1
+        self.brand_summaries[event["id"]] = [
+            {
+                "event_id": event["id"],
+                "event_name": event["event_name"],
+                "event_date": event["event_date"],
+                "brand": brand,
+                "persons_with_brand": len(brand_persons[brand]),
+                "total_items": count,
+                "brand_share_percent": round(count * 100 / total_items, 2),
+                "person_coverage_percent": round(len(brand_persons[brand]) * 100 / total_persons, 2),
+            }
+            for brand, count in sorted(brand_items.items(), key=lambda kv: -kv[1])
+        ]
+        self.product_summaries[event["id"]] = [
+            {
+                "event_id": event["id"],
+                "event_name": event["event_name"],
+                "product_type": product_type,
+                "persons_with_product": len(product_persons[product_type]),
+                "total_items": count,
+                "product_share_percent": round(count * 100 / total_items, 2),
+            }
+            for product_type, count in sorted(product_items.items(), key=lambda kv: -kv[1])
+        ]
+
+        month = event["event_date"][:8] + "01"
+        for brand, count in brand_items.items():
+            months[(month, brand, event["sport"], event["event_type"], event["event_location"])] += count
+
+    @staticmethod
+    def _uuid(rng: random.Random) -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def describe(self) -> Dict[str, int]:
+        """Tamanho do conjunto gerado"""
+        return {
+            "events": self.size,
+            "persons": self.total_persons,
+            "items": self.total_items,
+        }
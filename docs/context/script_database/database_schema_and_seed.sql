@@ -24,6 +24,8 @@ CREATE TABLE IF NOT EXISTS events (
 );
 
 CREATE INDEX IF NOT EXISTS idx_events_date ON events(event_date);
+-- Paginação por cursor: ORDER BY event_date DESC, id DESC + (event_date, id) < (cursor)
+CREATE INDEX IF NOT EXISTS idx_events_date_id ON events(event_date, id);
 CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type);
 CREATE INDEX IF NOT EXISTS idx_events_status ON events(status);
 CREATE INDEX IF NOT EXISTS idx_events_location ON events(event_location);
@@ -97,57 +99,685 @@ END $$;
 
 -- NOTA: A constraint de event_type será atualizada DEPOIS de limpar os dados
 
--- 1.4. Views Materializadas
+-- 1.4. Tabelas de resumo por evento e rollups
+-- Mantidas incrementalmente (ver 1.6.3): apenas os eventos alterados são recalculados.
+-- Versões anteriores do schema criavam materialized views com esses nomes.
+DO $$
+DECLARE
+    v_name TEXT;
+BEGIN
+    FOREACH v_name IN ARRAY ARRAY[
+        'brand_month_summary', 'cube_items', 'cube_persons', 'brand_event_summary', 'product_event_summary'
+    ] LOOP
+        IF EXISTS (SELECT 1 FROM pg_matviews WHERE schemaname = 'public' AND matviewname = v_name) THEN
+            EXECUTE format('DROP MATERIALIZED VIEW %I', v_name);
+        END IF;
+    END LOOP;
+END $$;
 
 -- 1.4.1. brand_event_summary
-DROP MATERIALIZED VIEW IF EXISTS brand_event_summary;
-CREATE MATERIALIZED VIEW brand_event_summary AS
-SELECT 
-    e.id as event_id,
-    e.event_name,
-    e.event_date,
-    pi.brand,
-    COUNT(DISTINCT pi.person_id) as persons_with_brand,
-    COUNT(DISTINCT pi.id) as total_items,
-    ROUND(
-        100.0 * COUNT(DISTINCT pi.id) / 
-        NULLIF((SELECT COUNT(*) FROM person_items WHERE event_id = e.id), 0),
-        2
-    ) as brand_share_percent,
-    ROUND(
-        100.0 * COUNT(DISTINCT pi.person_id) / 
-        NULLIF((SELECT COUNT(DISTINCT person_id) FROM event_persons WHERE event_id = e.id), 0),
-        2
-    ) as person_coverage_percent
-FROM events e
-JOIN person_items pi ON pi.event_id = e.id
-WHERE pi.brand IS NOT NULL
-GROUP BY e.id, e.event_name, e.event_date, pi.brand;
+CREATE TABLE IF NOT EXISTS brand_event_summary (
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    event_name VARCHAR(200) NOT NULL,
+    event_date DATE NOT NULL,
+    brand VARCHAR(200) NOT NULL,
+    persons_with_brand BIGINT NOT NULL,
+    total_items BIGINT NOT NULL,
+    brand_share_percent NUMERIC,
+    person_coverage_percent NUMERIC,
+    PRIMARY KEY (event_id, brand)
+);
 
-CREATE UNIQUE INDEX IF NOT EXISTS idx_brand_summary_unique ON brand_event_summary(event_id, brand);
-CREATE INDEX IF NOT EXISTS idx_brand_summary_event ON brand_event_summary(event_id);
 CREATE INDEX IF NOT EXISTS idx_brand_summary_brand ON brand_event_summary(brand);
 
 -- 1.4.2. product_event_summary
-DROP MATERIALIZED VIEW IF EXISTS product_event_summary;
-CREATE MATERIALIZED VIEW product_event_summary AS
-SELECT 
-    e.id as event_id,
-    e.event_name,
-    pi.product_type,
-    COUNT(DISTINCT pi.person_id) as persons_with_product,
-    COUNT(DISTINCT pi.id) as total_items,
-    ROUND(
-        100.0 * COUNT(DISTINCT pi.id) / 
-        NULLIF((SELECT COUNT(*) FROM person_items WHERE event_id = e.id), 0),
-        2
-    ) as product_share_percent
-FROM events e
-JOIN person_items pi ON pi.event_id = e.id
-WHERE pi.product_type IS NOT NULL
-GROUP BY e.id, e.event_name, pi.product_type;
+CREATE TABLE IF NOT EXISTS product_event_summary (
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    event_name VARCHAR(200) NOT NULL,
+    product_type VARCHAR(50) NOT NULL,
+    persons_with_product BIGINT NOT NULL,
+    total_items BIGINT NOT NULL,
+    product_share_percent NUMERIC,
+    PRIMARY KEY (event_id, product_type)
+);
+
+-- 1.4.3. brand_month_summary
+-- Rollup mensal de itens por marca (grão: mês × marca × esporte × tipo × local)
+-- Usado pela série temporal do dashboard: o custo depende de meses × marcas, não do nº de eventos.
+-- Calculado de brand_event_summary (eventos × marcas), não de person_items. Tabela mantida
+-- por refresh_dirty_summaries(): só os segmentos (mês × esporte × tipo × local) dos
+-- eventos alterados são apagados e recalculados.
+CREATE TABLE IF NOT EXISTS brand_month_summary (
+    month DATE NOT NULL,
+    sport VARCHAR(50) NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    event_location VARCHAR(200) NOT NULL,
+    brand VARCHAR(200) NOT NULL,
+    total_events BIGINT NOT NULL,
+    total_items BIGINT NOT NULL,
+    PRIMARY KEY (month, sport, event_type, event_location, brand)
+);
+
+CREATE INDEX IF NOT EXISTS idx_brand_month_month ON brand_month_summary(month);
+
+-- 1.4.4. Cubo analítico (GET /api/metrics/cube)
+-- Células por evento, mantidas incrementalmente junto com os resumos (ver 1.6.3).
+-- Faixas etárias iguais às dos relatórios; itens sem pessoa correspondente ficam em 'N/A'.
+CREATE TABLE IF NOT EXISTS event_item_cells (
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    brand VARCHAR(200) NOT NULL,
+    product_type VARCHAR(50) NOT NULL,
+    gender VARCHAR(10) NOT NULL,
+    age_bucket VARCHAR(10) NOT NULL,
+    items BIGINT NOT NULL,
+    PRIMARY KEY (event_id, brand, product_type, gender, age_bucket)
+);
+
+CREATE TABLE IF NOT EXISTS event_person_cells (
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    gender VARCHAR(10) NOT NULL,
+    age_bucket VARCHAR(10) NOT NULL,
+    persons BIGINT NOT NULL,
+    PRIMARY KEY (event_id, gender, age_bucket)
+);
+
+CREATE OR REPLACE FUNCTION age_bucket(p_age INTEGER) RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN p_age IS NULL THEN 'N/A'
+        WHEN p_age <= 25 THEN '18-25'
+        WHEN p_age <= 35 THEN '26-35'
+        WHEN p_age <= 45 THEN '36-45'
+        ELSE '46+'
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Grão: mês × esporte × tipo × local × marca × produto × gênero × faixa etária.
+-- O tamanho depende de eventos × combinações de dimensões, não do número de atletas.
+-- Somas das células por evento, mantidas por segmento como brand_month_summary.
+CREATE TABLE IF NOT EXISTS cube_items (
+    month DATE NOT NULL,
+    sport VARCHAR(50) NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    event_location VARCHAR(200) NOT NULL,
+    brand VARCHAR(200) NOT NULL,
+    product_type VARCHAR(50) NOT NULL,
+    gender VARCHAR(10) NOT NULL,
+    age_bucket VARCHAR(10) NOT NULL,
+    items BIGINT NOT NULL,
+    PRIMARY KEY (month, sport, event_type, event_location, brand, product_type, gender, age_bucket)
+);
+
+-- Pessoas não somam entre marcas/produtos (uma pessoa usa vários itens): cubo próprio sem essas dimensões
+CREATE TABLE IF NOT EXISTS cube_persons (
+    month DATE NOT NULL,
+    sport VARCHAR(50) NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    event_location VARCHAR(200) NOT NULL,
+    gender VARCHAR(10) NOT NULL,
+    age_bucket VARCHAR(10) NOT NULL,
+    persons BIGINT NOT NULL,
+    PRIMARY KEY (month, sport, event_type, event_location, gender, age_bucket)
+);
+
+-- 1.6. Funções usadas pela API (chamadas via RPC)
+
+-- 1.6.1. get_dashboard_metrics
+-- KPIs do dashboard em uma única ida ao banco, para qualquer combinação de filtros
+-- (mesma semântica de DatabaseService._apply_event_filters: listas opcionais,
+--  location como busca parcial case-insensitive, datas inclusivas)
+CREATE OR REPLACE FUNCTION get_dashboard_metrics(
+    p_sports TEXT[] DEFAULT NULL,
+    p_event_types TEXT[] DEFAULT NULL,
+    p_locations TEXT[] DEFAULT NULL,
+    p_date_from DATE DEFAULT NULL,
+    p_date_to DATE DEFAULT NULL
+) RETURNS TABLE (
+    total_events BIGINT,
+    total_photos_analyzed BIGINT,
+    total_athletes_identified BIGINT,
+    total_brands_tracked BIGINT
+) AS $$
+    WITH filtered_events AS (
+        SELECT e.id, e.total_photos
+        FROM events e
+        WHERE (p_sports IS NULL OR e.sport = ANY(p_sports))
+          AND (p_event_types IS NULL OR e.event_type = ANY(p_event_types))
+          AND (p_locations IS NULL OR e.event_location ILIKE ANY (
+                ARRAY(SELECT '%' || loc || '%' FROM unnest(p_locations) AS loc)))
+          AND (p_date_from IS NULL OR e.event_date >= p_date_from)
+          AND (p_date_to IS NULL OR e.event_date <= p_date_to)
+    )
+    SELECT
+        (SELECT COUNT(*) FROM filtered_events),
+        (SELECT COALESCE(SUM(total_photos), 0) FROM filtered_events)::BIGINT,
+        (SELECT COUNT(*) FROM event_persons ep JOIN filtered_events fe ON fe.id = ep.event_id),
+        (SELECT COUNT(DISTINCT pi.brand) FROM person_items pi JOIN filtered_events fe ON fe.id = pi.event_id);
+$$ LANGUAGE sql STABLE;
+
+-- get_dashboard_summary (GET /api/dashboard)
+-- Filtros resolvidos uma única vez (filtered_events) para KPIs, eventos por esporte
+-- (GROUP BY sobre todos os eventos filtrados) e itens por mês e marca. Com
+-- p_use_month_rollup (datas em limites de mês) a série vem de brand_month_summary;
+-- caso contrário, de brand_event_summary dos eventos filtrados (corte exato de datas).
+CREATE OR REPLACE FUNCTION get_dashboard_summary(
+    p_sports TEXT[] DEFAULT NULL,
+    p_event_types TEXT[] DEFAULT NULL,
+    p_locations TEXT[] DEFAULT NULL,
+    p_date_from DATE DEFAULT NULL,
+    p_date_to DATE DEFAULT NULL,
+    p_brands TEXT[] DEFAULT NULL,
+    p_use_month_rollup BOOLEAN DEFAULT FALSE
+) RETURNS JSONB AS $$
+    WITH filtered_events AS (
+        SELECT e.id, e.sport, e.event_date, e.total_photos
+        FROM events e
+        WHERE (p_sports IS NULL OR e.sport = ANY(p_sports))
+          AND (p_event_types IS NULL OR e.event_type = ANY(p_event_types))
+          AND (p_locations IS NULL OR e.event_location ILIKE ANY (
+                ARRAY(SELECT '%' || loc || '%' FROM unnest(p_locations) AS loc)))
+          AND (p_date_from IS NULL OR e.event_date >= p_date_from)
+          AND (p_date_to IS NULL OR e.event_date <= p_date_to)
+    ),
+    sports AS (
+        SELECT COALESCE(sport, 'N/A') AS sport, COUNT(*) AS events
+        FROM filtered_events
+        GROUP BY 1
+    ),
+    brand_months AS (
+        SELECT bms.month, bms.brand, SUM(bms.total_items)::BIGINT AS total_items
+        FROM brand_month_summary bms
+        WHERE p_use_month_rollup
+          AND (p_sports IS NULL OR bms.sport = ANY(p_sports))
+          AND (p_event_types IS NULL OR bms.event_type = ANY(p_event_types))
+          AND (p_locations IS NULL OR bms.event_location ILIKE ANY (
+                ARRAY(SELECT '%' || loc || '%' FROM unnest(p_locations) AS loc)))
+          AND (p_date_from IS NULL OR bms.month >= p_date_from)
+          AND (p_date_to IS NULL OR bms.month <= p_date_to)
+          AND (p_brands IS NULL OR bms.brand = ANY(p_brands))
+        GROUP BY bms.month, bms.brand
+        UNION ALL
+        SELECT DATE_TRUNC('month', fe.event_date)::DATE, bes.brand, SUM(bes.total_items)::BIGINT
+        FROM filtered_events fe
+        JOIN brand_event_summary bes ON bes.event_id = fe.id
+        WHERE NOT p_use_month_rollup
+          AND (p_brands IS NULL OR bes.brand = ANY(p_brands))
+        GROUP BY 1, 2
+    )
+    SELECT jsonb_build_object(
+        'metrics', jsonb_build_object(
+            'total_events', (SELECT COUNT(*) FROM filtered_events),
+            'total_photos_analyzed', (SELECT COALESCE(SUM(total_photos), 0) FROM filtered_events)::BIGINT,
+            'total_athletes_identified',
+                (SELECT COUNT(*) FROM event_persons ep JOIN filtered_events fe ON fe.id = ep.event_id),
+            'total_brands_tracked',
+                (SELECT COUNT(DISTINCT pi.brand) FROM person_items pi JOIN filtered_events fe ON fe.id = pi.event_id)
+        ),
+        'sport_distribution', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('sport', sport, 'events', events)
+                              ORDER BY events DESC, sport) FROM sports),
+            '[]'::JSONB
+        ),
+        'brand_months', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('month', month, 'brand', brand, 'total_items', total_items)
+                              ORDER BY month, brand) FROM brand_months),
+            '[]'::JSONB
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+-- 1.6.2. Versão dos dados (usada pela API para ETags e invalidação de cache)
+-- Muda sempre que a tabela events é alterada ou as views de resumo são atualizadas
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO data_version (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS VOID AS $$
+    UPDATE data_version SET version = version + 1, updated_at = NOW() WHERE id = 1;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE OR REPLACE FUNCTION get_data_version() RETURNS TEXT AS $$
+    SELECT version::TEXT FROM data_version WHERE id = 1;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION trg_events_bump_data_version() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_version();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+DROP TRIGGER IF EXISTS events_bump_data_version ON events;
+CREATE TRIGGER events_bump_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON events
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_events_bump_data_version();
+
+-- 1.6.3. Manutenção incremental dos resumos
+-- Triggers registram em summary_dirty_events os eventos cujas pessoas/itens mudaram;
+-- refresh_dirty_summaries() recalcula apenas esses eventos e, nos rollups (brand_month_summary,
+-- cube_items, cube_persons), apenas os segmentos deles (custo proporcional aos dados novos)
+CREATE TABLE IF NOT EXISTS summary_dirty_events (
+    event_id UUID PRIMARY KEY,
+    marked_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Segmento (mês × esporte × tipo × local) que um evento deixou ao mudar de data, esporte,
+-- tipo ou local, ou ao ser excluído: os rollups desse segmento também são recalculados
+CREATE TABLE IF NOT EXISTS summary_dirty_segments (
+    month DATE NOT NULL,
+    sport VARCHAR(50) NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    event_location VARCHAR(200) NOT NULL,
+    PRIMARY KEY (month, sport, event_type, event_location)
+);
+
+CREATE OR REPLACE FUNCTION trg_mark_summary_dirty() RETURNS TRIGGER AS $$
+BEGIN
+    -- DO UPDATE (e não DO NOTHING) trava a linha: um refresh concorrente espera este
+    -- commit e recalcula o evento já com os dados novos, em vez de perdê-los
+    INSERT INTO summary_dirty_events (event_id)
+    SELECT DISTINCT event_id FROM changed_rows
+    ON CONFLICT (event_id) DO UPDATE SET marked_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- Tabelas de transição exigem um trigger por tipo de operação
+DROP TRIGGER IF EXISTS person_items_dirty_insert ON person_items;
+CREATE TRIGGER person_items_dirty_insert AFTER INSERT ON person_items
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+DROP TRIGGER IF EXISTS person_items_dirty_update_new ON person_items;
+CREATE TRIGGER person_items_dirty_update_new AFTER UPDATE ON person_items
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+DROP TRIGGER IF EXISTS person_items_dirty_update_old ON person_items;
+CREATE TRIGGER person_items_dirty_update_old AFTER UPDATE ON person_items
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+DROP TRIGGER IF EXISTS person_items_dirty_delete ON person_items;
+CREATE TRIGGER person_items_dirty_delete AFTER DELETE ON person_items
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+
+-- event_persons entra no denominador de person_coverage_percent
+DROP TRIGGER IF EXISTS event_persons_dirty_insert ON event_persons;
+CREATE TRIGGER event_persons_dirty_insert AFTER INSERT ON event_persons
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+DROP TRIGGER IF EXISTS event_persons_dirty_update_new ON event_persons;
+CREATE TRIGGER event_persons_dirty_update_new AFTER UPDATE ON event_persons
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+DROP TRIGGER IF EXISTS event_persons_dirty_update_old ON event_persons;
+CREATE TRIGGER event_persons_dirty_update_old AFTER UPDATE ON event_persons
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+DROP TRIGGER IF EXISTS event_persons_dirty_delete ON event_persons;
+CREATE TRIGGER event_persons_dirty_delete AFTER DELETE ON event_persons
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION trg_mark_summary_dirty();
+
+-- Nome e data do evento são copiados para os resumos; data, esporte, tipo e local definem
+-- o segmento do evento nos rollups (o segmento antigo também precisa ser recalculado)
+CREATE OR REPLACE FUNCTION trg_events_mark_summary_dirty() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO summary_dirty_segments (month, sport, event_type, event_location)
+    VALUES (DATE_TRUNC('month', OLD.event_date)::DATE, OLD.sport, OLD.event_type, OLD.event_location)
+    ON CONFLICT DO NOTHING;
+
+    IF TG_OP = 'UPDATE' THEN
+        INSERT INTO summary_dirty_events (event_id) VALUES (NEW.id)
+        ON CONFLICT (event_id) DO UPDATE SET marked_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+DROP TRIGGER IF EXISTS events_mark_summary_dirty ON events;
+CREATE TRIGGER events_mark_summary_dirty
+    AFTER UPDATE OF event_name, event_date, sport, event_type, event_location ON events
+    FOR EACH ROW
+    WHEN (OLD.event_name IS DISTINCT FROM NEW.event_name OR OLD.event_date IS DISTINCT FROM NEW.event_date
+          OR OLD.sport IS DISTINCT FROM NEW.sport OR OLD.event_type IS DISTINCT FROM NEW.event_type
+          OR OLD.event_location IS DISTINCT FROM NEW.event_location)
+    EXECUTE FUNCTION trg_events_mark_summary_dirty();
+
+DROP TRIGGER IF EXISTS events_delete_mark_summary_dirty ON events;
+CREATE TRIGGER events_delete_mark_summary_dirty
+    AFTER DELETE ON events
+    FOR EACH ROW
+    EXECUTE FUNCTION trg_events_mark_summary_dirty();
+
+-- Recalcula os resumos dos eventos marcados e os segmentos dos rollups que eles
+-- tocam, e avança a versão dos dados. Retorna quantos eventos foram processados.
+CREATE OR REPLACE FUNCTION refresh_dirty_summaries() RETURNS INTEGER AS $$
+DECLARE
+    v_event_ids UUID[];
+    v_months DATE[];
+    v_sports TEXT[];
+    v_event_types TEXT[];
+    v_locations TEXT[];
+BEGIN
+    -- Um refresh por vez: chamadas concorrentes esperam a anterior terminar
+    PERFORM pg_advisory_xact_lock(hashtext('refresh_dirty_summaries'));
+
+    WITH claimed AS (
+        DELETE FROM summary_dirty_events RETURNING event_id
+    )
+    SELECT ARRAY_AGG(event_id) INTO v_event_ids FROM claimed;
+
+    -- Segmentos a recalcular: os atuais dos eventos marcados e os deixados por
+    -- eventos que mudaram de segmento ou foram excluídos
+    WITH claimed_segments AS (
+        DELETE FROM summary_dirty_segments RETURNING month, sport, event_type, event_location
+    ),
+    segments AS (
+        SELECT month, sport::TEXT, event_type::TEXT, event_location::TEXT FROM claimed_segments
+        UNION
+        SELECT DATE_TRUNC('month', e.event_date)::DATE, e.sport, e.event_type, e.event_location
+        FROM events e
+        WHERE e.id = ANY(v_event_ids)
+    )
+    SELECT ARRAY_AGG(month), ARRAY_AGG(sport), ARRAY_AGG(event_type), ARRAY_AGG(event_location)
+    INTO v_months, v_sports, v_event_types, v_locations
+    FROM segments;
+
+    IF v_event_ids IS NULL AND v_months IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    DELETE FROM brand_event_summary WHERE event_id = ANY(v_event_ids);
+    DELETE FROM product_event_summary WHERE event_id = ANY(v_event_ids);
+
+    -- Totais por evento calculados uma vez, em vez de subconsultas correlacionadas por grupo
+    WITH event_items AS (
+        SELECT event_id, COUNT(*) AS items
+        FROM person_items
+        WHERE event_id = ANY(v_event_ids)
+        GROUP BY event_id
+    ),
+    event_people AS (
+        SELECT event_id, COUNT(DISTINCT person_id) AS persons
+        FROM event_persons
+        WHERE event_id = ANY(v_event_ids)
+        GROUP BY event_id
+    )
+    INSERT INTO brand_event_summary (
+        event_id, event_name, event_date, brand, persons_with_brand, total_items,
+        brand_share_percent, person_coverage_percent
+    )
+    SELECT 
+        e.id,
+        e.event_name,
+        e.event_date,
+        pi.brand,
+        COUNT(DISTINCT pi.person_id),
+        COUNT(*),
+        ROUND(100.0 * COUNT(*) / NULLIF(MAX(ei.items), 0), 2),
+        ROUND(100.0 * COUNT(DISTINCT pi.person_id) / NULLIF(MAX(ep.persons), 0), 2)
+    FROM events e
+    JOIN person_items pi ON pi.event_id = e.id
+    JOIN event_items ei ON ei.event_id = e.id
+    LEFT JOIN event_people ep ON ep.event_id = e.id
+    WHERE e.id = ANY(v_event_ids)
+      AND pi.brand IS NOT NULL
+    GROUP BY e.id, e.event_name, e.event_date, pi.brand;
+
+    WITH event_items AS (
+        SELECT event_id, COUNT(*) AS items
+        FROM person_items
+        WHERE event_id = ANY(v_event_ids)
+        GROUP BY event_id
+    )
+    INSERT INTO product_event_summary (
+        event_id, event_name, product_type, persons_with_product, total_items, product_share_percent
+    )
+    SELECT 
+        e.id,
+        e.event_name,
+        pi.product_type,
+        COUNT(DISTINCT pi.person_id),
+        COUNT(*),
+        ROUND(100.0 * COUNT(*) / NULLIF(MAX(ei.items), 0), 2)
+    FROM events e
+    JOIN person_items pi ON pi.event_id = e.id
+    JOIN event_items ei ON ei.event_id = e.id
+    WHERE e.id = ANY(v_event_ids)
+      AND pi.product_type IS NOT NULL
+    GROUP BY e.id, e.event_name, pi.product_type;
+
+    -- Células do cubo analítico dos eventos alterados
+    DELETE FROM event_item_cells WHERE event_id = ANY(v_event_ids);
+    DELETE FROM event_person_cells WHERE event_id = ANY(v_event_ids);
+
+    INSERT INTO event_item_cells (event_id, brand, product_type, gender, age_bucket, items)
+    SELECT 
+        pi.event_id,
+        pi.brand,
+        pi.product_type,
+        COALESCE(ep.gender, 'N/A'),
+        age_bucket(ep.age),
+        COUNT(*)
+    FROM person_items pi
+    JOIN events e ON e.id = pi.event_id
+    LEFT JOIN event_persons ep ON ep.event_id = pi.event_id AND ep.person_id = pi.person_id
+    WHERE pi.event_id = ANY(v_event_ids)
+    GROUP BY 1, 2, 3, 4, 5;
+
+    INSERT INTO event_person_cells (event_id, gender, age_bucket, persons)
+    SELECT ep.event_id, ep.gender, age_bucket(ep.age), COUNT(*)
+    FROM event_persons ep
+    JOIN events e ON e.id = ep.event_id
+    WHERE ep.event_id = ANY(v_event_ids)
+    GROUP BY 1, 2, 3;
+
+    -- Rollups: apaga e recalcula só as células dos segmentos tocados, a partir das
+    -- tabelas por evento (o custo depende dos eventos desses segmentos, não do histórico)
+    DELETE FROM brand_month_summary t
+    USING unnest(v_months, v_sports, v_event_types, v_locations) AS s(month, sport, event_type, event_location)
+    WHERE t.month = s.month AND t.sport = s.sport
+      AND t.event_type = s.event_type AND t.event_location = s.event_location;
+
+    DELETE FROM cube_items t
+    USING unnest(v_months, v_sports, v_event_types, v_locations) AS s(month, sport, event_type, event_location)
+    WHERE t.month = s.month AND t.sport = s.sport
+      AND t.event_type = s.event_type AND t.event_location = s.event_location;
+
+    DELETE FROM cube_persons t
+    USING unnest(v_months, v_sports, v_event_types, v_locations) AS s(month, sport, event_type, event_location)
+    WHERE t.month = s.month AND t.sport = s.sport
+      AND t.event_type = s.event_type AND t.event_location = s.event_location;
+
+    WITH segment_events AS (
+        SELECT s.month, e.id, e.sport, e.event_type, e.event_location
+        FROM unnest(v_months, v_sports, v_event_types, v_locations) AS s(month, sport, event_type, event_location)
+        JOIN events e
+          ON e.sport = s.sport AND e.event_type = s.event_type AND e.event_location = s.event_location
+         AND e.event_date >= s.month AND e.event_date < (s.month + INTERVAL '1 month')::DATE
+    )
+    INSERT INTO brand_month_summary (month, sport, event_type, event_location, brand, total_events, total_items)
+    SELECT se.month, se.sport, se.event_type, se.event_location, bes.brand, COUNT(*), SUM(bes.total_items)::BIGINT
+    FROM segment_events se
+    JOIN brand_event_summary bes ON bes.event_id = se.id
+    GROUP BY 1, 2, 3, 4, 5;
+
+    WITH segment_events AS (
+        SELECT s.month, e.id, e.sport, e.event_type, e.event_location
+        FROM unnest(v_months, v_sports, v_event_types, v_locations) AS s(month, sport, event_type, event_location)
+        JOIN events e
+          ON e.sport = s.sport AND e.event_type = s.event_type AND e.event_location = s.event_location
+         AND e.event_date >= s.month AND e.event_date < (s.month + INTERVAL '1 month')::DATE
+    )
+    INSERT INTO cube_items (month, sport, event_type, event_location, brand, product_type, gender, age_bucket, items)
+    SELECT se.month, se.sport, se.event_type, se.event_location, c.brand, c.product_type, c.gender, c.age_bucket,
+           SUM(c.items)::BIGINT
+    FROM segment_events se
+    JOIN event_item_cells c ON c.event_id = se.id
+    GROUP BY 1, 2, 3, 4, 5, 6, 7, 8;
+
+    WITH segment_events AS (
+        SELECT s.month, e.id, e.sport, e.event_type, e.event_location
+        FROM unnest(v_months, v_sports, v_event_types, v_locations) AS s(month, sport, event_type, event_location)
+        JOIN events e
+          ON e.sport = s.sport AND e.event_type = s.event_type AND e.event_location = s.event_location
+         AND e.event_date >= s.month AND e.event_date < (s.month + INTERVAL '1 month')::DATE
+    )
+    INSERT INTO cube_persons (month, sport, event_type, event_location, gender, age_bucket, persons)
+    SELECT se.month, se.sport, se.event_type, se.event_location, c.gender, c.age_bucket, SUM(c.persons)::BIGINT
+    FROM segment_events se
+    JOIN event_person_cells c ON c.event_id = se.id
+    GROUP BY 1, 2, 3, 4, 5, 6;
+
+    PERFORM bump_data_version();
 
-CREATE UNIQUE INDEX IF NOT EXISTS idx_product_summary_unique ON product_event_summary(event_id, product_type);
+    RETURN COALESCE(array_length(v_event_ids, 1), 0);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- 1.6.4. refresh_summary_views
+-- Reconstrução completa (todos os eventos); no dia a dia use refresh_dirty_summaries()
+CREATE OR REPLACE FUNCTION refresh_summary_views() RETURNS VOID AS $$
+BEGIN
+    INSERT INTO summary_dirty_events (event_id)
+    SELECT id FROM events
+    ON CONFLICT (event_id) DO UPDATE SET marked_at = NOW();
+
+    -- Segmentos já nos rollups sem eventos correspondentes também são limpos
+    INSERT INTO summary_dirty_segments (month, sport, event_type, event_location)
+    SELECT month, sport, event_type, event_location FROM brand_month_summary
+    UNION
+    SELECT month, sport, event_type, event_location FROM cube_items
+    UNION
+    SELECT month, sport, event_type, event_location FROM cube_persons
+    ON CONFLICT DO NOTHING;
+    PERFORM refresh_dirty_summaries();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- 1.6.5. query_analytics_cube
+-- Soma as células de um cubo (p_source: 'items' ou 'persons') agrupando por p_dims.
+-- Filtros com a mesma semântica de get_dashboard_metrics; datas aplicadas sobre o mês.
+-- Retorna um objeto JSON por grupo: as dimensões pedidas + items ou persons.
+CREATE OR REPLACE FUNCTION query_analytics_cube(
+    p_source TEXT,
+    p_dims TEXT[] DEFAULT '{}',
+    p_sports TEXT[] DEFAULT NULL,
+    p_event_types TEXT[] DEFAULT NULL,
+    p_locations TEXT[] DEFAULT NULL,
+    p_date_from DATE DEFAULT NULL,
+    p_date_to DATE DEFAULT NULL,
+    p_brands TEXT[] DEFAULT NULL,
+    p_product_types TEXT[] DEFAULT NULL,
+    p_genders TEXT[] DEFAULT NULL,
+    p_age_buckets TEXT[] DEFAULT NULL
+) RETURNS SETOF JSONB AS $$
+DECLARE
+    v_table TEXT;
+    v_measure TEXT;
+    v_allowed TEXT[];
+    v_fields TEXT;
+    v_group TEXT;
+    v_where TEXT[] := ARRAY['TRUE'];
+BEGIN
+    IF p_source = 'items' THEN
+        v_table := 'cube_items';
+        v_measure := 'items';
+        v_allowed := ARRAY['month', 'sport', 'event_type', 'event_location', 'brand', 'product_type', 'gender', 'age_bucket'];
+    ELSIF p_source = 'persons' THEN
+        v_table := 'cube_persons';
+        v_measure := 'persons';
+        v_allowed := ARRAY['month', 'sport', 'event_type', 'event_location', 'gender', 'age_bucket'];
+        IF p_brands IS NOT NULL OR p_product_types IS NOT NULL THEN
+            RAISE EXCEPTION 'O cubo de pessoas não tem marca/produto';
+        END IF;
+    ELSE
+        RAISE EXCEPTION 'Fonte inválida: %', p_source;
+    END IF;
+
+    IF NOT (COALESCE(p_dims, '{}') <@ v_allowed) THEN
+        RAISE EXCEPTION 'Dimensões inválidas para %: %', p_source, p_dims;
+    END IF;
+
+    -- Dimensões vêm da lista permitida: seguras para SQL dinâmico (%I)
+    SELECT
+        string_agg(format('%L, %I', d, d), ', '),
+        string_agg(format('%I', d), ', ')
+    INTO v_fields, v_group
+    FROM unnest(COALESCE(p_dims, '{}')) AS d;
+
+    IF p_sports IS NOT NULL THEN v_where := v_where || 'sport = ANY($1)'; END IF;
+    IF p_event_types IS NOT NULL THEN v_where := v_where || 'event_type = ANY($2)'; END IF;
+    IF p_locations IS NOT NULL THEN
+        v_where := v_where || 'event_location ILIKE ANY (ARRAY(SELECT ''%'' || loc || ''%'' FROM unnest($3) AS loc))';
+    END IF;
+    IF p_date_from IS NOT NULL THEN v_where := v_where || 'month >= DATE_TRUNC(''month'', $4)::DATE'; END IF;
+    IF p_date_to IS NOT NULL THEN v_where := v_where || 'month <= $5'; END IF;
+    IF p_brands IS NOT NULL THEN v_where := v_where || 'brand = ANY($6)'; END IF;
+    IF p_product_types IS NOT NULL THEN v_where := v_where || 'product_type = ANY($7)'; END IF;
+    IF p_genders IS NOT NULL THEN v_where := v_where || 'gender = ANY($8)'; END IF;
+    IF p_age_buckets IS NOT NULL THEN v_where := v_where || 'age_bucket = ANY($9)'; END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT jsonb_build_object(%s%L, SUM(%I)::BIGINT) FROM %I WHERE %s %s',
+        COALESCE(v_fields || ', ', ''),
+        v_measure,
+        v_measure,
+        v_table,
+        array_to_string(v_where, ' AND '),
+        COALESCE('GROUP BY ' || v_group, '')
+    )
+    USING p_sports, p_event_types, p_locations, p_date_from, p_date_to,
+          p_brands, p_product_types, p_genders, p_age_buckets;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- 1.6.6. finish_event_ingestion
+-- Fim da ingestão de um evento (POST /api/events/{id}/ingest): contadores, status
+-- completed e refresh dos resumos. Retorna quantos eventos tiveram resumos recalculados.
+CREATE OR REPLACE FUNCTION finish_event_ingestion(p_event_id UUID) RETURNS INTEGER AS $$
+BEGIN
+    UPDATE events
+    SET total_photos = COALESCE((SELECT SUM(photo_count) FROM event_persons WHERE event_id = p_event_id), 0),
+        total_athletes_estimated = (SELECT COUNT(DISTINCT person_id) FROM event_persons WHERE event_id = p_event_id),
+        status = 'completed',
+        processed_at = NOW()
+    WHERE id = p_event_id;
+
+    RETURN refresh_dirty_summaries();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- 1.6.7. Permissões das funções de escrita
+-- As funções acima rodam como o dono das tabelas (SECURITY DEFINER, com search_path fixo),
+-- então funcionam sem que quem chama seja dono das tabelas de resumo. Por isso só a
+-- service key (role service_role) pode chamá-las via RPC; a chave anônima só lê.
+REVOKE EXECUTE ON FUNCTION
+    finish_event_ingestion(UUID), refresh_dirty_summaries(), refresh_summary_views(), bump_data_version()
+    FROM PUBLIC;
+
+DO $$
+DECLARE
+    v_role TEXT;
+BEGIN
+    -- Roles do Supabase (ausentes em um PostgreSQL comum)
+    FOREACH v_role IN ARRAY ARRAY['anon', 'authenticated'] LOOP
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = v_role) THEN
+            EXECUTE format(
+                'REVOKE EXECUTE ON FUNCTION finish_event_ingestion(UUID), refresh_dirty_summaries(), '
+                'refresh_summary_views(), bump_data_version() FROM %I', v_role
+            );
+        END IF;
+    END LOOP;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION
+            finish_event_ingestion(UUID), refresh_dirty_summaries(), refresh_summary_views(), bump_data_version()
+            TO service_role;
+    END IF;
+END $$;
 
 -- ============================================================================
 -- 2. LIMPAR DADOS EXISTENTES
@@ -156,6 +786,9 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_product_summary_unique ON product_event_su
 TRUNCATE TABLE person_items CASCADE;
 TRUNCATE TABLE event_persons CASCADE;
 TRUNCATE TABLE events CASCADE;
+TRUNCATE TABLE summary_dirty_events;
+TRUNCATE TABLE summary_dirty_segments;
+TRUNCATE TABLE brand_month_summary, cube_items, cube_persons;
 
 -- Atualizar constraint de event_type APÓS limpar dados
 DO $$
@@ -475,11 +1108,10 @@ SET total_athletes_estimated = (
 );
 
 -- ============================================================================
--- 9. ATUALIZAR VIEWS MATERIALIZADAS
+-- 9. ATUALIZAR RESUMOS (tabelas de resumo e rollup mensal)
 -- ============================================================================
 
-REFRESH MATERIALIZED VIEW CONCURRENTLY brand_event_summary;
-REFRESH MATERIALIZED VIEW CONCURRENTLY product_event_summary;
+SELECT refresh_summary_views();
 
 -- ============================================================================
 -- 10. QUERIES DE VALIDAÇÃO
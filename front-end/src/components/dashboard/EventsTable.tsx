@@ -1,4 +1,4 @@
-import { useEvents, type FilterParams } from "@/hooks/useEvents";
+import { useEventsInfinite, type FilterParams } from "@/hooks/useEvents";
 import { Calendar, MapPin, Camera, Users } from "lucide-react";
 import { Badge } from "@/components/ui/badge";
 import type { Event } from "@/services/api/events";
@@ -27,7 +27,8 @@ interface EventsTableProps {
 }
 
 export function EventsTable({ filters }: EventsTableProps) {
-  const { data, isLoading, error } = useEvents(10, 0, filters);
+  const { data, isLoading, error, fetchNextPage, hasNextPage, isFetchingNextPage } =
+    useEventsInfinite(10, filters);
 
   if (isLoading) {
     return (
@@ -47,7 +48,7 @@ export function EventsTable({ filters }: EventsTableProps) {
     );
   }
 
-  const events = data?.events || [];
+  const events = data?.pages.flatMap((page) => page.events) || [];
 
   return (
     <div className="rounded-xl border border-border bg-card animate-fade-in">
@@ -121,11 +122,17 @@ export function EventsTable({ filters }: EventsTableProps) {
         </div>
       )}
 
-      <div className="border-t border-border p-4">
-        <button className="w-full text-center text-sm font-medium text-primary hover:text-primary/80 transition-colors">
-          Ver todos os eventos →
-        </button>
-      </div>
+      {hasNextPage && (
+        <div className="border-t border-border p-4">
+          <button
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            className="w-full text-center text-sm font-medium text-primary hover:text-primary/80 transition-colors disabled:opacity-50"
+          >
+            {isFetchingNextPage ? "Carregando..." : "Carregar mais eventos →"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
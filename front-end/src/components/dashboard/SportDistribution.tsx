@@ -1,7 +1,6 @@
-import { useEvents, type FilterParams } from "@/hooks/useEvents";
 import { PieChart, Pie, Cell, ResponsiveContainer, Tooltip } from "recharts";
 import { useMemo } from "react";
-import type { Event } from "@/services/api/events";
+import type { SportDistributionEntry } from "@/services/api/events";
 
 const COLORS = [
   "hsl(187, 100%, 50%)",
@@ -29,37 +28,21 @@ interface SportData {
 }
 
 interface SportDistributionProps {
-  filters?: FilterParams;
+  // Distribuição calculada no backend (GET /api/dashboard) sobre todos os eventos filtrados
+  distribution?: SportDistributionEntry[];
+  isLoading?: boolean;
 }
 
-export function SportDistribution({ filters }: SportDistributionProps) {
-  const { data: eventsData, isLoading } = useEvents(100, 0, filters);
-  const events = eventsData?.events || [];
-
-  // Calcular distribuição de esportes
-  const sportDistribution = useMemo(() => {
-    if (events.length === 0) return [];
-
-    // Contar eventos por esporte
-    const sportCount: Record<string, number> = {};
-    events.forEach((event: Event) => {
-      const sportType = event.sport;
-      sportCount[sportType] = (sportCount[sportType] || 0) + 1;
-    });
-
-    // Converter para array e calcular porcentagens
-    const total = events.length;
-    const distribution: SportData[] = Object.entries(sportCount).map(
-      ([sport, count]) => ({
-        sport: formatSportName(sport),
-        percentage: Math.round((count / total) * 100),
-        events: count,
-      })
-    );
-
-    // Ordenar por quantidade (maior para menor)
-    return distribution.sort((a, b) => b.events - a.events);
-  }, [events]);
+export function SportDistribution({ distribution, isLoading }: SportDistributionProps) {
+  const sportDistribution = useMemo<SportData[]>(
+    () =>
+      (distribution || []).map((item) => ({
+        sport: formatSportName(item.sport),
+        percentage: Math.round(item.percentage),
+        events: item.events,
+      })),
+    [distribution]
+  );
 
   if (isLoading) {
     return (
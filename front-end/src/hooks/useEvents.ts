@@ -3,20 +3,25 @@
  * Facilita cache, loading states e tratamento de erros
  */
 
-import { useQuery } from '@tanstack/react-query';
+import { useInfiniteQuery, useQuery, useQueryClient } from '@tanstack/react-query';
 import {
   getEvents,
   getEventById,
+  getEventFull,
   getEventBrands,
   getEventProducts,
   getDashboardMetrics,
   getBrandTimeSeries,
+  getDashboard,
   type Event,
   type EventListResponse,
   type BrandSummary,
   type ProductSummary,
+  type EventFullInclude,
+  type EventFullResponse,
   type DashboardMetrics,
   type BrandTimeSeriesResponse,
+  type DashboardResponse,
   type FilterParams,
 } from '@/services/api/events';
 
@@ -34,6 +39,20 @@ export function useEvents(limit: number = 100, offset: number = 0, filters?: Fil
   });
 }
 
+/**
+ * Hook para listar eventos página a página (paginação por cursor)
+ * Cada nova página custa o mesmo que a primeira, independente da profundidade
+ */
+export function useEventsInfinite(limit: number = 10, filters?: FilterParams) {
+  return useInfiniteQuery<EventListResponse, Error>({
+    queryKey: ['events-infinite', limit, filters],
+    queryFn: ({ pageParam }) => getEvents(limit, 0, filters, pageParam as string | undefined),
+    initialPageParam: undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    staleTime: 30000,
+  });
+}
+
 /**
  * Hook para buscar detalhes de um evento
  */
@@ -46,6 +65,18 @@ export function useEvent(eventId: string | null) {
   });
 }
 
+/**
+ * Hook para buscar evento, marcas e produtos em uma única requisição
+ */
+export function useEventFull(eventId: string | null, include: EventFullInclude[] = []) {
+  return useQuery<EventFullResponse, Error>({
+    queryKey: ['event-full', eventId, include],
+    queryFn: () => getEventFull(eventId!, include),
+    enabled: !!eventId,
+    staleTime: 30000,
+  });
+}
+
 /**
  * Hook para buscar marcas de um evento
  */
@@ -91,3 +122,30 @@ export function useBrandTimeSeries(filters?: FilterParams) {
     staleTime: 60000, // 1 minuto
   });
 }
+
+/**
+ * Hook para carregar o dashboard inteiro em uma requisição
+ * 
+ * Além de retornar os dados, preenche o cache das queries individuais
+ * (métricas, série temporal e primeira página de eventos), então os componentes
+ * que usam esses hooks não fazem novas requisições.
+ */
+export function useDashboard(filters?: FilterParams, pageSize: number = 10) {
+  const queryClient = useQueryClient();
+
+  return useQuery<DashboardResponse, Error>({
+    queryKey: ['dashboard', filters, pageSize],
+    queryFn: async () => {
+      const dashboard = await getDashboard(filters, pageSize);
+      queryClient.setQueryData(['dashboard-metrics', filters], dashboard.metrics);
+      queryClient.setQueryData(['brand-time-series', filters], { data: dashboard.brand_time_series });
+      queryClient.setQueryData(['events', pageSize, 0, filters], dashboard.events);
+      queryClient.setQueryData(['events-infinite', pageSize, filters], {
+        pages: [dashboard.events],
+        pageParams: [undefined],
+      });
+      return dashboard;
+    },
+    staleTime: 60000,
+  });
+}
@@ -5,11 +5,13 @@
 
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import {
-  generateReport,
+  generateReportViaJob,
   getReportsStatus,
+  streamReport,
   type GenerateReportRequest,
   type GenerateReportResponse,
   type ReportStatusResponse,
+  type ReportStreamHandlers,
 } from '@/services/api/reports';
 
 /**
@@ -26,6 +28,7 @@ export function useReportsStatus() {
 
 /**
  * Hook para gerar relatório (mutation)
+ * Usa a fila de jobs do backend e consulta o status até o relatório ficar pronto
  * 
  * Uso:
  * ```tsx
@@ -43,7 +46,7 @@ export function useGenerateReport() {
   const queryClient = useQueryClient();
 
   return useMutation<GenerateReportResponse, Error, GenerateReportRequest>({
-    mutationFn: generateReport,
+    mutationFn: (request) => generateReportViaJob(request),
     onSuccess: () => {
       // Invalida cache de status após gerar relatório
       queryClient.invalidateQueries({ queryKey: ['reports-status'] });
@@ -51,13 +54,35 @@ export function useGenerateReport() {
   });
 }
 
+/**
+ * Hook para gerar relatório em streaming (SSE)
+ * Os handlers recebem título/contagens e os trechos do texto antes do fim da geração
+ */
+export function useStreamReport() {
+  const queryClient = useQueryClient();
+
+  return useMutation<
+    GenerateReportResponse,
+    Error,
+    { request: GenerateReportRequest; handlers?: ReportStreamHandlers }
+  >({
+    mutationFn: ({ request, handlers }) => streamReport(request, handlers),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['reports-status'] });
+    },
+  });
+}
+
 /**
  * Re-exportar tipos para conveniência
  */
 export type {
   GenerateReportRequest,
   GenerateReportResponse,
+  ReportJobResponse,
   ReportStatusResponse,
+  ReportStreamMeta,
+  ReportStreamDone,
 } from '@/services/api/reports';
 
 export {
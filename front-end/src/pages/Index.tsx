@@ -7,7 +7,7 @@ import { EventsTable } from "@/components/dashboard/EventsTable";
 import { BrandsRanking } from "@/components/dashboard/BrandsRanking";
 import { SportDistribution } from "@/components/dashboard/SportDistribution";
 import { DashboardFiltersComponent, type DashboardFilters } from "@/components/dashboard/DashboardFilters";
-import { useDashboardMetrics, type FilterParams } from "@/hooks/useEvents";
+import { useDashboard, type FilterParams } from "@/hooks/useEvents";
 import { Camera, Calendar, Tag, Users } from "lucide-react";
 
 const Index = () => {
@@ -41,7 +41,9 @@ const Index = () => {
     return result;
   }, [filters]);
 
-  const { data: metrics, isLoading, error } = useDashboardMetrics(apiFilters);
+  // Uma requisição para a página inteira; os componentes abaixo leem do cache preenchido por ela
+  const { data: dashboard, isLoading, error } = useDashboard(apiFilters);
+  const metrics = dashboard?.metrics;
 
   if (error) {
     return (
@@ -104,16 +106,24 @@ const Index = () => {
           {/* Charts Row */}
           <section className="grid grid-cols-1 lg:grid-cols-3 gap-6">
             <div className="lg:col-span-2">
-              <BrandChart filters={apiFilters} />
+              {dashboard ? (
+                <BrandChart filters={apiFilters} />
+              ) : (
+                <div className="rounded-xl border border-border bg-card p-6 h-full">
+                  <div className="text-center text-muted-foreground">Carregando gráfico...</div>
+                </div>
+              )}
             </div>
-            <SportDistribution filters={apiFilters} />
+            <SportDistribution distribution={dashboard?.sport_distribution} isLoading={isLoading} />
           </section>
 
-          {/* Tables Row */}
-          <section className="grid grid-cols-1 lg:grid-cols-2 gap-6">
-            <EventsTable filters={apiFilters} />
-            <BrandsRanking filters={apiFilters} />
-          </section>
+          {/* Tables Row (renderizadas após o dashboard para reaproveitar o cache) */}
+          {dashboard && (
+            <section className="grid grid-cols-1 lg:grid-cols-2 gap-6">
+              <EventsTable filters={apiFilters} />
+              <BrandsRanking filters={apiFilters} />
+            </section>
+          )}
         </div>
       </main>
     </div>
@@ -27,7 +27,7 @@ import { toast } from "sonner";
 import { useEvents } from "@/hooks/useEvents";
 import { 
   useReportsStatus, 
-  useGenerateReport,
+  useStreamReport,
   type ReportType,
   type ReportFocus,
   getReportTypeName,
@@ -130,13 +130,14 @@ const Reports = () => {
       total_athletes: number;
       tokens_used: number;
       generation_time_ms: number;
+      cached?: boolean;
     };
   } | null>(null);
 
   // Hooks
   const { data: statusData } = useReportsStatus();
   const { data: eventsData } = useEvents(100, 0);
-  const generateMutation = useGenerateReport();
+  const generateMutation = useStreamReport();
 
   // Lista de eventos para o select
   const events = eventsData?.events || [];
@@ -193,9 +194,28 @@ const Reports = () => {
     });
 
     try {
+      setGeneratedReport(null);
       const result = await generateMutation.mutateAsync({
-        type: selectedType,
-        filters: filters as any,
+        request: {
+          type: selectedType,
+          filters: filters as any,
+        },
+        handlers: {
+          // Exibe título e contagens assim que chegam e vai acrescentando o texto
+          onMeta: (meta) => setGeneratedReport({
+            title: meta.title,
+            content: "",
+            metadata: {
+              total_events: meta.total_events,
+              total_athletes: meta.total_athletes,
+              tokens_used: 0,
+              generation_time_ms: 0,
+            },
+          }),
+          onDelta: (content) => setGeneratedReport((current) =>
+            current ? { ...current, content: current.content + content } : current
+          ),
+        },
       });
 
       setGeneratedReport({
@@ -205,7 +225,9 @@ const Reports = () => {
       });
 
       toast.success("Relatório gerado com sucesso!", {
-        description: `Gerado em ${formatGenerationTime(result.metadata.generation_time_ms)}`,
+        description: result.metadata.cached
+          ? "Recuperado do cache"
+          : `Gerado em ${formatGenerationTime(result.metadata.generation_time_ms)}`,
       });
     } catch (error) {
       toast.error("Erro ao gerar relatório", {
@@ -572,7 +594,7 @@ const Reports = () => {
                 </CardDescription>
               </CardHeader>
               <CardContent>
-                {generateMutation.isPending ? (
+                {generateMutation.isPending && !generatedReport ? (
                   <div className="flex flex-col items-center justify-center py-12 text-muted-foreground">
                     <Loader2 className="h-12 w-12 animate-spin mb-4 text-primary" />
                     <p className="text-lg font-medium">Gerando relatório...</p>
@@ -595,6 +617,9 @@ const Reports = () => {
                         <Badge variant="secondary">
                           {generatedReport.metadata.tokens_used} tokens
                         </Badge>
+                        {generatedReport.metadata.cached && (
+                          <Badge variant="outline">cache</Badge>
+                        )}
                       </div>
                     </div>
 
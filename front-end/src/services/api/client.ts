@@ -3,7 +3,7 @@
  * Configuração centralizada de requisições
  */
 
-const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
+export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
 interface RequestOptions extends RequestInit {
   params?: Record<string, string | number>;
@@ -23,10 +23,11 @@ export interface Event {
 
 export interface EventListResponse {
   events: Event[];
-  total: number;
+  total: number | null;  // null em páginas buscadas por cursor
   limit: number;
   offset: number;
   has_more: boolean;
+  next_cursor: string | null;  // cursor da próxima página (null na última)
 }
 
 export interface BrandSummary {
@@ -49,6 +50,28 @@ export interface ProductSummary {
   product_share_percent: number;
 }
 
+export type EventFullInclude = 'persons' | 'demographics';
+
+export interface EventDemographics {
+  total_persons: number;
+  gender_distribution: {
+    male: number;
+    female: number;
+    male_percent: number;
+    female_percent: number;
+  };
+  age_distribution: { age_range: string; count: number; percent: number }[];
+  avg_age: number;
+}
+
+export interface EventFullResponse {
+  event: Event;
+  brands: BrandSummary[];
+  products: ProductSummary[];
+  persons?: Record<string, unknown>[];
+  demographics?: EventDemographics;
+}
+
 export interface DashboardMetrics {
   total_events: number;
   total_photos_analyzed: number;
@@ -65,6 +88,7 @@ export interface FilterParams {
   location?: string;
   date_from?: string;
   date_to?: string;
+  brand?: string;  // usado pela série temporal de marcas
 }
 
 /**
@@ -73,9 +97,11 @@ export interface FilterParams {
 export async function getEvents(
   limit: number = 100,
   offset: number = 0,
-  filters?: FilterParams
+  filters?: FilterParams,
+  cursor?: string
 ): Promise<EventListResponse> {
   const params: Record<string, string | number> = { limit, offset };
+  if (cursor) params.cursor = cursor;
   
   if (filters?.sport) params.sport = filters.sport;
   if (filters?.event_type) params.event_type = filters.event_type;
@@ -93,6 +119,19 @@ export async function getEventById(eventId: string): Promise<Event> {
   return api.get<Event>(`/api/events/${eventId}`);
 }
 
+/**
+ * Busca evento, marcas e produtos em uma única requisição
+ * `include` adiciona blocos opcionais (pessoas e/ou demografia)
+ */
+export async function getEventFull(
+  eventId: string,
+  include: EventFullInclude[] = []
+): Promise<EventFullResponse> {
+  const params: Record<string, string> = {};
+  if (include.length > 0) params.include = include.join(',');
+  return api.get<EventFullResponse>(`/api/events/${eventId}/full`, params);
+}
+
 /**
  * Busca resumo de marcas de um evento
  */
@@ -165,3 +204,36 @@ export async function getBrandTimeSeries(filters?: FilterParams): Promise<BrandT
   
   return api.get<BrandTimeSeriesResponse>('/api/metrics/brands/timeseries', Object.keys(params).length > 0 ? params : undefined);
 }
+
+export interface SportDistributionEntry {
+  sport: string;
+  events: number;
+  percentage: number;
+}
+
+export interface DashboardResponse {
+  metrics: DashboardMetrics;
+  brand_time_series: BrandTimeSeriesEntry[];
+  sport_distribution: SportDistributionEntry[];
+  events: EventListResponse;
+}
+
+/**
+ * Busca KPIs, série temporal, distribuição por esporte e primeira página de eventos
+ * em uma única requisição
+ */
+export async function getDashboard(
+  filters?: FilterParams,
+  pageSize: number = 10
+): Promise<DashboardResponse> {
+  const params: Record<string, string | number> = { page_size: pageSize };
+  
+  if (filters?.sport) params.sport = filters.sport;
+  if (filters?.event_type) params.event_type = filters.event_type;
+  if (filters?.location) params.location = filters.location;
+  if (filters?.date_from) params.date_from = filters.date_from;
+  if (filters?.date_to) params.date_to = filters.date_to;
+  if (filters?.brand) params.brand = filters.brand;
+  
+  return api.get<DashboardResponse>('/api/dashboard', params);
+}
@@ -3,7 +3,7 @@
  * Usa o cliente HTTP centralizado
  */
 
-import { api } from './client';
+import { api, API_BASE_URL } from './client';
 
 // =============================================================================
 // TIPOS
@@ -48,6 +48,7 @@ export interface ReportMetadata {
   tokens_used: number;
   model: string;
   generation_time_ms: number;
+  cached?: boolean;  // true quando o texto veio do cache de relatórios
 }
 
 export interface GenerateReportResponse {
@@ -59,6 +60,43 @@ export interface GenerateReportResponse {
   metadata: ReportMetadata;
 }
 
+export type ReportJobStatus = 'queued' | 'running' | 'done' | 'failed';
+
+export interface ReportJobResponse {
+  job_id: string;
+  type: ReportType;
+  status: ReportJobStatus;
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+  queue_position?: number | null;
+  result?: GenerateReportResponse | null;
+  error?: string | null;
+}
+
+export interface ReportStreamMeta {
+  type: ReportType;
+  generated_at: string;
+  filters_applied: Record<string, unknown>;
+  title: string;
+  total_events: number;
+  total_athletes: number;
+  total_items: number;
+}
+
+export interface ReportStreamDone {
+  tokens_used: number;
+  tokens_estimated?: boolean;
+  model: string;
+  generation_time_ms: number;
+  cached: boolean;
+}
+
+export interface ReportStreamHandlers {
+  onMeta?: (meta: ReportStreamMeta) => void;
+  onDelta?: (content: string) => void;
+}
+
 export interface ReportStatusResponse {
   available: boolean;
   model?: string;
@@ -78,6 +116,124 @@ export async function generateReport(
   return api.post<GenerateReportResponse>('/api/reports/generate', request);
 }
 
+/**
+ * Gera um relatório em streaming (SSE), repassando título e trechos do texto à medida que chegam
+ * Resolve com o relatório completo quando o evento final ("done") é recebido
+ */
+export async function streamReport(
+  request: GenerateReportRequest,
+  handlers: ReportStreamHandlers = {}
+): Promise<GenerateReportResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/reports/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({
+      detail: `Erro HTTP: ${response.status} ${response.statusText}`,
+    }));
+    throw new Error(errorData.detail || `Erro: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let meta: ReportStreamMeta | null = null;
+  let content = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Eventos SSE são separados por linha em branco
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (!data) continue;  // comentários (": ...")
+
+      const payload = JSON.parse(data);
+      if (event === 'meta') {
+        meta = payload as ReportStreamMeta;
+        handlers.onMeta?.(meta);
+      } else if (event === 'delta') {
+        content += payload.content;
+        handlers.onDelta?.(payload.content);
+      } else if (event === 'error') {
+        throw new Error(payload.detail || 'Erro ao gerar relatório');
+      } else if (event === 'done' && meta) {
+        const final = payload as ReportStreamDone;
+        return {
+          type: meta.type,
+          generated_at: meta.generated_at,
+          filters_applied: meta.filters_applied,
+          title: meta.title,
+          content,
+          metadata: {
+            total_events: meta.total_events,
+            total_athletes: meta.total_athletes,
+            total_items: meta.total_items,
+            tokens_used: final.tokens_used,
+            model: final.model,
+            generation_time_ms: final.generation_time_ms,
+            cached: final.cached,
+          },
+        };
+      }
+    }
+  }
+
+  throw new Error('Conexão encerrada antes do fim do relatório');
+}
+
+/**
+ * Enfileira a geração de um relatório (retorna o job sem esperar a LLM)
+ */
+export async function submitReportJob(
+  request: GenerateReportRequest
+): Promise<ReportJobResponse> {
+  return api.post<ReportJobResponse>('/api/reports/jobs', request);
+}
+
+/**
+ * Consulta o estado de um job de relatório
+ */
+export async function getReportJob(jobId: string): Promise<ReportJobResponse> {
+  return api.get<ReportJobResponse>(`/api/reports/jobs/${jobId}`);
+}
+
+/**
+ * Gera um relatório via fila de jobs, consultando o status até terminar
+ * Evita manter uma requisição HTTP aberta durante toda a geração
+ */
+export async function generateReportViaJob(
+  request: GenerateReportRequest,
+  pollIntervalMs = 1500
+): Promise<GenerateReportResponse> {
+  let job = await submitReportJob(request);
+
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+    job = await getReportJob(job.job_id);
+  }
+
+  if (job.status === 'failed' || !job.result) {
+    throw new Error(job.error || 'Erro ao gerar relatório');
+  }
+  return job.result;
+}
+
 /**
  * Verifica se o serviço de relatórios está disponível
  */